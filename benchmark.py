@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Glances - An eye on your system
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Glances benchmark suite.
+
+The system stats are generated (see glances.datasource.PsutilGenerator)
+or replayed from a record file (--replay), so the results do not depend
+on the host activity and can be compared between two commits:
+
+    $ python benchmark.py --json before.json
+    $ git checkout <other commit>
+    $ python benchmark.py --compare before.json
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import timeit
+
+# Glances parses the command line: keep the benchmark options for us
+bench_argv, sys.argv = sys.argv[1:], sys.argv[:1]
+
+from glances import __version__, datasource
+from glances.datasource import psutil
+from glances.main import GlancesMain
+from glances.stats import GlancesStats
+from glances.timings import glances_timings
+
+# Benchmarks
+# ==========
+
+def measure(fct, rounds, warmup=1):
+    """Return the list of durations (in seconds) of rounds calls of fct."""
+    for _ in range(warmup):
+        fct()
+    ret = []
+    for _ in range(rounds):
+        start = timeit.default_timer()
+        fct()
+        ret.append(timeit.default_timer() - start)
+    return ret
+
+
+def bench_stats_update(stats, rounds):
+    """GlancesStats.update (all plugins) and per plugin update."""
+    glances_timings.reset()
+    ret = {'stats.update': measure(stats.update, rounds)}
+    for name, h in glances_timings.get_histograms('update').items():
+        ret['plugin.update.{}'.format(name)] = [h['mean']]
+    return ret
+
+
+def bench_processes_update(rounds):
+    """GlancesProcesses.update on the generated processes table."""
+    from glances.processes import GlancesProcesses
+    processes = GlancesProcesses()
+    # The extended stats use the real psutil.Process
+    processes.disable_extended()
+
+    def update():
+        datasource.tick()
+        processes.update()
+    ret = {'processes.update': measure(update, rounds)}
+
+    # Processes tree (maintained across the updates)
+    processes.enable_tree()
+    ret['processes.update.tree'] = measure(update, rounds)
+    return ret
+
+
+def bench_export(stats, args, rounds):
+    """Flattening of the stats by the export modules (build_export)."""
+    from glances.exports.glances_export import GlancesExport
+    export = GlancesExport(args=args)
+    all_stats = stats.getAllExportsAsDict(plugin_list=export.plugins_to_export(stats))
+
+    def build():
+        for plugin in all_stats:
+            export.build_export(all_stats[plugin])
+    return {'export.build': measure(build, rounds)}
+
+
+def bench_api_all(stats, config, args, rounds):
+    """RESTful API /api/3/all (cached and not cached)."""
+    from glances.outputs.glances_bottle import GlancesBottle
+    webserver = GlancesBottle(config=config, args=args)
+    webserver.stats = stats
+    webserver.plugins_list = stats.getPluginsList()
+    # Never update the stats during the benchmark
+    webserver.timer.set(3600)
+    webserver.timer.start()
+    app = webserver._app
+
+    def get(deflate=False):
+        environ = {'REQUEST_METHOD': 'GET',
+                   'PATH_INFO': '/api/3/all',
+                   'QUERY_STRING': '',
+                   'SERVER_NAME': 'localhost',
+                   'SERVER_PORT': '61208',
+                   'wsgi.url_scheme': 'http',
+                   'wsgi.input': io.BytesIO(),
+                   'wsgi.errors': sys.stderr}
+        if deflate:
+            environ['HTTP_ACCEPT_ENCODING'] = 'deflate'
+        status = []
+        body = b''.join(app(environ, lambda s, h, exc_info=None: status.append(s)))
+        if not status[0].startswith('200'):
+            raise RuntimeError('/api/3/all: {}'.format(status[0]))
+        return body
+
+    def get_new():
+        # New stats generation: serialize again
+        stats.generation += 1
+        get()
+
+    return {'api.all': measure(get_new, rounds),
+            'api.all.cached': measure(get, rounds),
+            'api.all.deflate': measure(lambda: (get_new(), get(deflate=True)), rounds)}
+
+
+def bench_history(rounds, size=28800):
+    """History: append size values then query them."""
+    from glances.attribute import GlancesAttribute
+
+    def append():
+        a = GlancesAttribute('bench', history_max_size=size)
+        for i in range(size):
+            a.history_add((1500000000.0 + i, i % 100))
+        return a
+    a = append()
+    return {'history.append': measure(append, rounds),
+            'history.query': measure(lambda: a.history_query(resolution=60, percentiles=[95]), rounds),
+            'history.trend': measure(lambda: [a.history_trend(nb=6) for _ in range(1000)], rounds)}
+
+
+def bench_events(rounds, nb=1000):
+    """GlancesEvents.add (nb events)."""
+    from glances.events import GlancesEvents
+    proc_list = [p.as_dict() for p in psutil.process_iter()]
+
+    def add():
+        events = GlancesEvents()
+        for i in range(nb):
+            events.add('WARNING' if i % 2 else 'CRITICAL', 'CPU', i % 100,
+                       proc_list=proc_list)
+    return {'events.add': measure(add, rounds)}
+
+
+# Main
+# ====
+
+def summary(durations):
+    """Return the min, median and mean (in ms) of the durations."""
+    d = sorted(durations)
+    return {'min': d[0] * 1000,
+            'median': d[len(d) // 2] * 1000,
+            'mean': sum(d) / len(d) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Glances benchmark suite')
+    parser.add_argument('--processes', type=int, default=1000, help='number of generated processes')
+    parser.add_argument('--nics', type=int, default=16, help='number of generated network interfaces')
+    parser.add_argument('--disks', type=int, default=16, help='number of generated disks')
+    parser.add_argument('--seed', type=int, default=42, help='generated stats seed')
+    parser.add_argument('--replay', help='replay the stats recorded in this file (glances --record)')
+    parser.add_argument('--replay-scale', type=int, default=1, help='replay scale')
+    parser.add_argument('--rounds', type=int, default=10, help='number of rounds per benchmark')
+    parser.add_argument('--json', help='write the results in this JSON file')
+    parser.add_argument('--compare', help='compare with the results of this JSON file')
+    bench_args = parser.parse_args(bench_argv)
+
+    core = GlancesMain()
+    config = core.get_config()
+    args = core.get_args()
+    if bench_args.replay:
+        datasource.set_source(datasource.PsutilReplay(bench_args.replay,
+                                                      scale=bench_args.replay_scale))
+    else:
+        datasource.set_source(datasource.PsutilGenerator(processes=bench_args.processes,
+                                                         nics=bench_args.nics,
+                                                         disks=bench_args.disks,
+                                                         seed=bench_args.seed))
+
+    results = {}
+    # Serial update: the per plugin timings do not depend on the scheduler
+    stats = GlancesStats(config=config, args=args, workers=0)
+    rounds = bench_args.rounds
+    results.update(bench_stats_update(stats, rounds))
+    results.update(bench_processes_update(rounds))
+    results.update(bench_export(stats, args, rounds))
+    results.update(bench_api_all(stats, config, args, rounds))
+    results.update(bench_history(rounds))
+    results.update(bench_events(rounds))
+    stats.end()
+    results = {k: summary(v) for k, v in results.items()}
+
+    reference = {}
+    if bench_args.compare:
+        with open(bench_args.compare) as f:
+            reference = json.load(f)['results']
+
+    print('Glances {} benchmark (Python {}, {}, {} rounds)'.format(
+        __version__, platform.python_version(),
+        bench_args.replay or '{} processes'.format(bench_args.processes), bench_args.rounds))
+    print('{:40} {:>10} {:>10} {:>10} {:>8}'.format('BENCHMARK', 'MIN ms', 'MEDIAN ms', 'MEAN ms', 'RATIO'))
+    for k in sorted(results):
+        r = results[k]
+        ratio = ''
+        if k in reference and reference[k]['median']:
+            ratio = '{:.2f}'.format(r['median'] / reference[k]['median'])
+        print('{:40} {:>10.3f} {:>10.3f} {:>10.3f} {:>8}'.format(k, r['min'], r['median'], r['mean'], ratio))
+
+    if bench_args.json:
+        with open(bench_args.json, 'w') as f:
+            json.dump({'version': __version__,
+                       'python': platform.python_version(),
+                       'parameters': vars(bench_args),
+                       'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
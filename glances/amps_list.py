@@ -20,13 +20,13 @@
 """Manage the AMPs list."""
 
 import os
-import re
 import threading
 
 from glances.compat import listkeys, iteritems
 from glances.logger import logger
 from glances.globals import amps_path
 from glances.processes import glances_processes
+from glances.rules import GlancesRule
 
 
 class AmpsList(object):
@@ -48,6 +48,12 @@ class AmpsList(object):
         self.args = args
         self.config = config
 
+        # Compiled regex of the AMPs: {amp name: GlancesRule}
+        self._rules = {}
+        # Processes matching (or not) the AMPs regex
+        # {amp name: {(pid, create_time): True or False}}
+        self._verdicts = {}
+
         # Load the AMP configurations / scripts
         self.load_configs()
 
@@ -104,8 +110,7 @@ class AmpsList(object):
 
     def update(self):
         """Update the command result attributed."""
-        # Get the current processes list (once)
-        processlist = glances_processes.getlist()
+        processlist = None
 
         # Iter upon the AMPs dict
         for k, v in iteritems(self.get()):
@@ -113,6 +118,13 @@ class AmpsList(object):
                 # Do not update if the enable tag is set
                 continue
 
+            if processlist is None:
+                # Get the needed columns of the current processes table (once)
+                table = glances_processes.gettable()
+                processlist = list(zip(*[table.tolist(c) for c in ('pid', 'create_time', 'name',
+                                                                   'cmdline', 'cpu_percent',
+                                                                   'memory_percent')])) if len(table) else []
+
             amps_list = self._build_amps_list(v, processlist)
 
             if len(amps_list) > 0:
@@ -132,31 +144,47 @@ class AmpsList(object):
 
         return self.__amps_dict
 
+    def _get_rule(self, amp_value):
+        """Return the compiled regex of the AMP (GlancesRule)."""
+        name = amp_value.amp_name
+        rule = self._rules.get(name)
+        if rule is None or rule.patterns != [amp_value.regex()]:
+            rule = self._rules[name] = GlancesRule([amp_value.regex()], mode='search')
+            self._verdicts[name] = {}
+        return rule
+
     def _build_amps_list(self, amp_value, processlist):
         """Return the AMPS process list according to the amp_value
 
         Search application monitored processes by a regular expression
+        The result is cached per process (pid, creation time and name).
+        processlist is a list of (pid, create_time, name, cmdline,
+        cpu_percent, memory_percent) tuples.
         """
         ret = []
+        rule = self._get_rule(amp_value)
+        old_verdicts = self._verdicts[amp_value.amp_name]
+        verdicts = {}
         try:
             # Search in both cmdline and name (for kernel thread, see #1261)
-            for p in processlist:
-                add_it = False
-                if (re.search(amp_value.regex(), p['name']) is not None):
-                    add_it = True
-                else:
-                    for c in p['cmdline']:
-                        if (re.search(amp_value.regex(), c) is not None):
-                            add_it = True
-                            break
+            for pid, create_time, name, cmdline, cpu_percent, memory_percent in processlist:
+                key = (pid, create_time, name)
+                try:
+                    add_it = old_verdicts[key]
+                except KeyError:
+                    add_it = rule.match(name or '') or \
+                        any(rule.match(c) for c in cmdline or [])
+                verdicts[key] = add_it
                 if add_it:
-                    ret.append({'pid': p['pid'],
-                                'cpu_percent': p['cpu_percent'],
-                                'memory_percent': p['memory_percent']})
+                    ret.append({'pid': pid,
+                                'cpu_percent': cpu_percent,
+                                'memory_percent': memory_percent})
 
         except (TypeError, KeyError) as e:
             logger.debug("Can not build AMPS list ({})".format(e))
 
+        # Only keep the verdicts of the current processes
+        self._verdicts[amp_value.amp_name] = verdicts
         return ret
 
     def getList(self):
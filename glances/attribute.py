@@ -19,7 +19,21 @@
 
 """Attribute class."""
 
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
 from datetime import datetime
+from time import mktime, time
+
+from glances.compat import long
+from glances.logger import logger
+
+# NumPy is optional: used to compute the history queries
+try:
+    import numpy as np
+except ImportError:
+    logger.debug("NumPy not found, history queries are computed without it")
+    np = None
 
 
 class GlancesAttribute(object):
@@ -30,13 +44,19 @@ class GlancesAttribute(object):
         description: Attribute human reading description (string)
         history_max_size: Maximum size of the history list (default is no limit)
 
-        History is stored as a list for tuple: [(date, value), ...]
+        History is stored in a ring buffer of two float arrays (timestamps
+        and values) and is given as a list for tuple: [(date, value), ...]
+        The values are given back as int if only int values have been
+        added (exact up to 2**53), as float otherwise.
         """
         self._name = name
         self._description = description
         self._value = None
-        self._history_max_size = history_max_size
-        self._history = []
+        if history_max_size is None:
+            self._history_max_size = None
+        else:
+            self._history_max_size = int(history_max_size)
+        self.history_reset()
 
     def __repr__(self):
         return self.value
@@ -81,7 +101,7 @@ class GlancesAttribute(object):
         """Set a value.
         Value is a tuple: (<timestamp>, <new_value>)
         """
-        self._value = (datetime.now(), new_value)
+        self._value = (time(), new_value)
         self.history_add(self._value)
 
     """
@@ -89,53 +109,255 @@ class GlancesAttribute(object):
     """
     @property
     def history(self):
-        return self._history
+        return self.history_raw()
 
     @history.setter
     def history(self, new_history):
-        self._history = new_history
+        self.history_reset()
+        for d, v in new_history:
+            self.history_add((_timestamp(d), v))
 
     @history.deleter
     def history(self):
-        del self._history
+        self.history_reset()
 
     def history_reset(self):
-        self._history = []
+        self._timestamps = array('d')
+        self._values = array('d')
+        # True while only int values (or None) have been added
+        self._ints = True
+        # Position of the oldest value (once the ring buffer is full)
+        self._start = 0
+        # Running aggregates of the last values (see history_trend)
+        # {nb: _TrendWindow}
+        self._trend_windows = {}
 
     def history_add(self, value):
         """Add a value in the history
+        Value is a tuple: (<timestamp>, <value>)
         """
+        t, v = value
+        if v is not None and not isinstance(v, (int, long)):
+            self._ints = False
+        try:
+            v = float(v)
+        except (TypeError, ValueError):
+            v = float('nan')
         if self._history_max_size is None or self.history_len() < self._history_max_size:
-            self._history.append(value)
-        else:
-            self._history = self._history[1:] + [value]
+            self._timestamps.append(t)
+            self._values.append(v)
+        elif self._history_max_size > 0:
+            # Overwrite the oldest value
+            self._timestamps[self._start] = t
+            self._values[self._start] = v
+            self._start = (self._start + 1) % self._history_max_size
+        for w in self._trend_windows.values():
+            w.push(v)
 
     def history_size(self):
         """Return the history size (maximum nuber of value in the history)
         """
-        return len(self._history)
+        return len(self._values)
 
     def history_len(self):
         """Return the current history lenght
         """
-        return len(self._history)
+        return len(self._values)
+
+    def _history_index(self, pos):
+        """Return the array index of the value in position pos
+        (1 is the latest value added to the history)."""
+        if pos < 1 or pos > self.history_len():
+            raise IndexError('history index out of range')
+        return (self._start - pos) % self.history_len()
+
+    def _history_slice(self, nb=0):
+        """Return the (timestamps, values) arrays of the <nb> last values
+        (all the history if nb=0), from the oldest to the newest."""
+        length = self.history_len()
+        if nb <= 0 or nb > length:
+            nb = length
+        first = (self._start - nb) % length if length else 0
+        if first + nb <= length:
+            return (self._timestamps[first:first + nb],
+                    self._values[first:first + nb])
+        return (self._timestamps[first:] + self._timestamps[:self._start],
+                self._values[first:] + self._values[:self._start])
 
     def history_value(self, pos=1):
         """Return the value in position pos in the history.
         Default is to return the latest value added to the history.
         """
-        return self._history[-pos]
+        i = self._history_index(pos)
+        return (datetime.fromtimestamp(self._timestamps[i]), _value(self._values[i], self._ints))
 
     def history_raw(self, nb=0):
-        """Return the history in ISO JSON format"""
-        return self._history[-nb:]
+        """Return the history as a list of (datetime, value)"""
+        t, v = self._history_slice(nb)
+        return [(datetime.fromtimestamp(d), _value(i, self._ints)) for d, i in zip(t, v)]
 
     def history_json(self, nb=0):
         """Return the history in ISO JSON format"""
-        return [(i[0].isoformat(), i[1]) for i in self._history[-nb:]]
+        return [(d.isoformat(), i) for d, i in self.history_raw(nb)]
+
+    def history_trend(self, nb=6):
+        """Return the trend regarding to the last nb values.
+
+        The trend is the diff between the current value and the mean of
+        the nb - 1 previous ones (None if the history is too short or
+        if one of these values is not a number).
+
+        The sum of the last nb values is updated on each add, so the
+        cost does not depend on nb (except for the first call).
+        """
+        if nb < 2 or self.history_len() < nb:
+            return None
+        if nb not in self._trend_windows:
+            self._trend_windows[nb] = _TrendWindow(nb, self._history_slice(nb)[1])
+        return self._trend_windows[nb].trend()
+
+    def history_query(self, start=None, end=None, resolution=60, percentiles=None):
+        """Return the history between start and end (timestamps), downsampled
+        in buckets of resolution seconds.
+
+        Return a dict of list (one item per non empty bucket):
+        {'time': [<bucket start in ISO format>, ...],
+         'count': [...], 'min': [...], 'max': [...], 'mean': [...],
+         'p<percentile>': [...]}
+        """
+        percentiles = percentiles or []
+        t, v = self._history_slice()
+        # History is sorted by time: only keep the requested window
+        first = 0 if start is None else bisect_left(t, start)
+        last = len(t) if end is None else bisect_right(t, end)
+        t, v = t[first:last], v[first:last]
+        if start is None:
+            start = t[0] if len(t) > 0 else 0
+        if resolution is None or resolution <= 0:
+            resolution = float('inf')
+
+        if np is not None:
+            buckets = _buckets_numpy(t, v, start, resolution, percentiles)
+        else:
+            buckets = _buckets_python(t, v, start, resolution, percentiles)
+
+        times = [start + b * resolution if b else start for b in buckets.pop('bucket')]
+        ret = {'time': [datetime.fromtimestamp(d).isoformat() for d in times]}
+        ret.update(buckets)
+        return ret
 
     def history_mean(self, nb=5):
         """Return the mean on the <nb> values in the history.
         """
-        _, v = zip(*self._history)
+        _, v = self._history_slice()
         return sum(v[-nb:]) / float(v[-1] - v[-nb])
+
+
+class _TrendWindow(object):
+
+    """Running sum of the last nb values of an attribute."""
+
+    # Compute the sum again from time to time (float rounding errors)
+    resum = 1000
+
+    def __init__(self, nb, values):
+        self.values = deque(values, maxlen=nb)
+        self._resum()
+
+    def _resum(self):
+        self.sum = sum(v for v in self.values if v == v)
+        self.nan = sum(1 for v in self.values if v != v)
+        self.count = 0
+
+    def push(self, v):
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            if old == old:
+                self.sum -= old
+            else:
+                self.nan -= 1
+        self.values.append(v)
+        if v == v:
+            self.sum += v
+        else:
+            self.nan += 1
+        self.count += 1
+        if self.count >= self.resum:
+            self._resum()
+
+    def trend(self):
+        if self.nan or len(self.values) < self.values.maxlen:
+            return None
+        last = self.values[-1]
+        return last - (self.sum - last) / (len(self.values) - 1)
+
+
+def _timestamp(d):
+    """Return the timestamp of the datetime d."""
+    if isinstance(d, datetime):
+        return mktime(d.timetuple()) + d.microsecond / 1e6
+    return d
+
+
+def _value(v, ints=False):
+    """Return the history value v (None if not a number)."""
+    if v != v:
+        return None
+    return int(v) if ints else v
+
+
+def _percentile(sorted_values, p):
+    """Return the p percentile (linear interpolation) of the sorted list."""
+    k = (len(sorted_values) - 1) * p / 100.0
+    f = int(k)
+    c = min(f + 1, len(sorted_values) - 1)
+    return sorted_values[f] + (sorted_values[c] - sorted_values[f]) * (k - f)
+
+
+def _buckets_python(t, v, start, resolution, percentiles):
+    """Compute the history buckets (see history_query) without NumPy."""
+    ret = {'bucket': [], 'count': [], 'min': [], 'max': [], 'mean': []}
+    for p in percentiles:
+        ret['p{:g}'.format(p)] = []
+    current = None
+    values = []
+    for d, i in zip(list(t) + [None], list(v) + [None]):
+        b = None if d is None else int((d - start) // resolution)
+        if b != current and values:
+            values.sort()
+            ret['bucket'].append(current)
+            ret['count'].append(len(values))
+            ret['min'].append(values[0])
+            ret['max'].append(values[-1])
+            ret['mean'].append(sum(values) / len(values))
+            for p in percentiles:
+                ret['p{:g}'.format(p)].append(_percentile(values, p))
+            values = []
+        current = b
+        if i is not None and i == i:
+            values.append(i)
+    return ret
+
+
+def _buckets_numpy(t, v, start, resolution, percentiles):
+    """Compute the history buckets (see history_query) with NumPy."""
+    t = np.frombuffer(t, dtype=np.float64) if len(t) else np.empty(0)
+    v = np.frombuffer(v, dtype=np.float64) if len(v) else np.empty(0)
+    # Ignore the not a number values
+    mask = ~np.isnan(v)
+    t, v = t[mask], v[mask]
+    if resolution == float('inf'):
+        b = np.zeros(len(t), dtype=np.int64)
+    else:
+        b = ((t - start) // resolution).astype(np.int64)
+    # b is sorted: first index of each bucket
+    idx = np.flatnonzero(np.r_[True, b[1:] != b[:-1]]) if len(b) else np.empty(0, dtype=np.int64)
+    count = np.diff(np.r_[idx, len(v)])
+    ret = {'bucket': b[idx].tolist(),
+           'count': count.tolist(),
+           'min': np.minimum.reduceat(v, idx).tolist() if len(v) else [],
+           'max': np.maximum.reduceat(v, idx).tolist() if len(v) else [],
+           'mean': (np.add.reduceat(v, idx) / count).tolist() if len(v) else []}
+    for p in percentiles:
+        ret['p{:g}'.format(p)] = [float(np.percentile(s, p)) for s in np.split(v, idx[1:])] if len(v) else []
+    return ret
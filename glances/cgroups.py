@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Linux cgroups (v1 and v2) stats reader.
+
+The CPU, memory and IO stats of a cgroup (container, pod...) are read
+from the cgroup accounting files, and the network stats from the network
+namespace of one of its processes:
+
+========= ============================== ===================================
+Stats     cgroup v2                      cgroup v1
+========= ============================== ===================================
+cpu       cpu.stat (usage_usec)          cpuacct.usage
+memory    memory.current, memory.max,    memory.usage_in_bytes,
+          memory.peak                    memory.limit_in_bytes,
+                                         memory.max_usage_in_bytes
+io        io.stat (rbytes, wbytes)       blkio.throttle.io_service_bytes_recursive
+network   /proc/<pid>/net/dev            /proc/<pid>/net/dev
+========= ============================== ===================================
+
+The cgroup of a process is read from the /proc/<pid>/cgroup file.
+"""
+
+import os
+from time import time
+
+import psutil
+
+from glances.compat import u
+from glances.globals import LINUX
+from glances.logger import logger
+from glances.procfs import read_file
+
+# Unlimited memory (cgroup v1 limit is a huge value, v2 is 'max')
+unlimited = 1 << 62
+
+
+def read_int(path):
+    """Return the integer value of a cgroup file (None for 'max')."""
+    value = read_file(path).strip()
+    return None if value == b'max' else int(value)
+
+
+class GlancesCgroups(object):
+
+    """Read the cgroups stats of the processes (containers)."""
+
+    def __init__(self, cgroup_path='/sys/fs/cgroup', procfs_path='/proc'):
+        self.cgroup_path = cgroup_path
+        self.procfs_path = procfs_path
+        # Unified hierarchy (cgroup v2) or one hierarchy per controller (v1)
+        self.version = 2 if os.path.exists(os.path.join(cgroup_path, 'cgroup.controllers')) else 1
+        # Cgroups paths of the processes (key: pid, value: (start time,
+        # paths)), the start time detects the reused PIDs
+        self._paths = {}
+        self.total_memory = psutil.virtual_memory().total
+
+    @staticmethod
+    def is_available(cgroup_path='/sys/fs/cgroup', procfs_path='/proc'):
+        """Return True if the cgroups files can be used."""
+        return LINUX and os.path.isdir(cgroup_path) and \
+            os.path.exists(os.path.join(procfs_path, 'self', 'cgroup'))
+
+    def paths(self, pid):
+        """Return the cgroups directories of a process.
+
+        {controller: directory} for cgroup v1, {'': directory} for v2.
+        """
+        start_time = self._start_time(pid)
+        if pid in self._paths and self._paths[pid][0] == start_time:
+            return self._paths[pid][1]
+        ret = {}
+        data = u(read_file(os.path.join(self.procfs_path, str(pid), 'cgroup')))
+        for line in data.splitlines():
+            # hierarchy-ID:controller-list:cgroup-path
+            fields = line.split(':', 2)
+            if len(fields) != 3:
+                continue
+            if self.version == 2:
+                if fields[0] == '0':
+                    ret[''] = os.path.join(self.cgroup_path, fields[2].lstrip('/'))
+            else:
+                for controller in fields[1].split(','):
+                    if controller:
+                        # name=systemd is mounted in the systemd directory
+                        ret[controller] = os.path.join(self.cgroup_path,
+                                                       controller.replace('name=', ''),
+                                                       fields[2].lstrip('/'))
+        self._paths[pid] = (start_time, ret)
+        return ret
+
+    def _start_time(self, pid):
+        """Return the start time of a process (in clock ticks since boot)."""
+        data = read_file(os.path.join(self.procfs_path, str(pid), 'stat'))
+        # The name (comm) is between parenthesis and can contain spaces
+        return data[data.rfind(b')') + 2:].split()[19]
+
+    def forget(self, pid):
+        """Forget the cgroups directories of a process (ended process)."""
+        self._paths.pop(pid, None)
+
+    def read(self, pid):
+        """Return the stats of the cgroup of the given process.
+
+        {'time': timestamp,
+         'cpu': CPU time (in nanoseconds),
+         'memory': {'usage': ..., 'limit': ..., 'max_usage': ...},
+         'io': {'read': ..., 'write': ...} (in bytes),
+         'network': {'rx': ..., 'tx': ...} (in bytes)}
+
+        None if the process (or its cgroup) does not exist anymore.
+        A stats which can not be read is None.
+        """
+        try:
+            paths = self.paths(pid)
+        except (IOError, OSError) as e:
+            logger.debug("Can not read the cgroups of process {} ({})".format(pid, e))
+            self.forget(pid)
+            return None
+        ret = {'time': time()}
+        for name in ('cpu', 'memory', 'io', 'network'):
+            try:
+                ret[name] = getattr(self, '_get_' + name)(pid, paths)
+            except (IOError, OSError, KeyError, ValueError, IndexError) as e:
+                logger.debug("Can not read the {} cgroup stats of process {} ({})".format(name, pid, e))
+                ret[name] = None
+        if ret['cpu'] is None and not os.path.exists(os.path.join(self.procfs_path, str(pid))):
+            # The process does not exist anymore
+            self.forget(pid)
+            return None
+        return ret
+
+    def _get_cpu(self, pid, paths):
+        if self.version == 2:
+            for line in read_file(os.path.join(paths[''], 'cpu.stat')).splitlines():
+                if line.startswith(b'usage_usec '):
+                    return int(line.split()[1]) * 1000
+            raise ValueError('usage_usec not found')
+        return read_int(os.path.join(paths['cpuacct'], 'cpuacct.usage'))
+
+    def _get_memory(self, pid, paths):
+        if self.version == 2:
+            path = paths['']
+            ret = {'usage': read_int(os.path.join(path, 'memory.current')),
+                   'limit': read_int(os.path.join(path, 'memory.max'))}
+            try:
+                # Linux >= 5.19
+                ret['max_usage'] = read_int(os.path.join(path, 'memory.peak'))
+            except (IOError, OSError):
+                ret['max_usage'] = None
+        else:
+            path = paths['memory']
+            ret = {'usage': read_int(os.path.join(path, 'memory.usage_in_bytes')),
+                   'limit': read_int(os.path.join(path, 'memory.limit_in_bytes')),
+                   'max_usage': read_int(os.path.join(path, 'memory.max_usage_in_bytes'))}
+        # Same as the Docker API: the limit is the host memory if unlimited
+        if ret['limit'] is None or ret['limit'] >= unlimited:
+            ret['limit'] = self.total_memory
+        return ret
+
+    def _get_io(self, pid, paths):
+        read = write = 0
+        if self.version == 2:
+            # 8:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=0 dios=0
+            for line in read_file(os.path.join(paths[''], 'io.stat')).splitlines():
+                for field in line.split()[1:]:
+                    key, value = field.split(b'=')
+                    if key == b'rbytes':
+                        read += int(value)
+                    elif key == b'wbytes':
+                        write += int(value)
+        else:
+            # 8:0 Read 1
+            for line in read_file(os.path.join(paths['blkio'],
+                                               'blkio.throttle.io_service_bytes_recursive')).splitlines():
+                fields = line.split()
+                if len(fields) != 3:
+                    continue
+                if fields[1] == b'Read':
+                    read += int(fields[2])
+                elif fields[1] == b'Write':
+                    write += int(fields[2])
+        return {'read': read, 'write': write}
+
+    def _get_network(self, pid, paths):
+        """Network stats of the network namespace of the process (without lo)."""
+        rx = tx = 0
+        data = read_file(os.path.join(self.procfs_path, str(pid), 'net', 'dev'))
+        for line in data.splitlines()[2:]:
+            interface, counters = line.split(b':', 1)
+            if interface.strip() == b'lo':
+                continue
+            counters = counters.split()
+            rx += int(counters[0])
+            tx += int(counters[8])
+        return {'rx': rx, 'tx': tx}
+
+
+def get_collector():
+    """Return a new GlancesCgroups reader (or None if not available)."""
+    if not GlancesCgroups.is_available():
+        logger.warning("The cgroups files can not be used, the Docker API is used to grab the containers stats")
+        return None
+    return GlancesCgroups()
@@ -52,6 +52,9 @@ class GlancesClient(object):
         # Default client mode
         self._client_mode = 'glances'
 
+        # Ask the server for the stats changes only (if supported)
+        self._delta = True
+
         # Return to browser or exit
         self.return_to_browser = return_to_browser
 
@@ -202,16 +205,29 @@ class GlancesClient(object):
         """
         # Update the stats
         try:
-            server_stats = json.loads(self.client.getAll())
+            if self._delta:
+                server_delta = json.loads(self.client.getAllDelta(self.stats.server_generation))
+            else:
+                server_stats = json.loads(self.client.getAll())
         except socket.error:
             # Client cannot get server stats
             return "Disconnected"
         except Fault:
+            if self._delta:
+                # Server does not support deltas, fallback to getAll
+                logger.info("Glances server does not support deltas, use full stats")
+                self._delta = False
+                return self.update_glances()
             # Client cannot get server stats (issue #375)
             return "Disconnected"
         else:
             # Put it in the internal dict
-            self.stats.update(server_stats)
+            if self._delta:
+                if not self.stats.update_delta(server_delta):
+                    # Server restarted: ask for the full stats
+                    return self.update_glances()
+            else:
+                self.stats.update(server_stats)
             return "Connected"
 
     def update_snmp(self):
@@ -34,7 +34,7 @@ PY3 = sys.version_info[0] == 3
 
 if PY3:
     import queue
-    from configparser import ConfigParser, NoOptionError, NoSectionError
+    from configparser import ConfigParser, RawConfigParser, NoOptionError, NoSectionError
     from statistics import mean
     from xmlrpc.client import Fault, ProtocolError, ServerProxy, Transport, Server
     from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
@@ -115,7 +115,7 @@ if PY3:
 else:
     import Queue as queue
     from itertools import imap as map
-    from ConfigParser import SafeConfigParser as ConfigParser, NoOptionError, NoSectionError
+    from ConfigParser import SafeConfigParser as ConfigParser, RawConfigParser, NoOptionError, NoSectionError
     from SimpleXMLRPCServer import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
     from xmlrpclib import Fault, ProtocolError, ServerProxy, Transport, Server
     from urllib2 import urlopen, HTTPError, URLError
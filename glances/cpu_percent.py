@@ -19,9 +19,11 @@
 
 """CPU percent stats shared between CPU and Quicklook plugins."""
 
+import threading
+
 from glances.timer import Timer
 
-import psutil
+from glances.datasource import psutil
 
 
 class CpuPercent(object):
@@ -38,6 +40,9 @@ class CpuPercent(object):
         self.timer_percpu = Timer(0)
         self.cached_time = cached_time
 
+        # Plugins can be updated in parallel
+        self._lock = threading.Lock()
+
     def get_key(self):
         """Return the key of the per CPU list."""
         return 'cpu_number'
@@ -45,10 +50,11 @@ class CpuPercent(object):
     def get(self, percpu=False):
         """Update and/or return the CPU using the psutil library.
         If percpu, return the percpu stats"""
-        if percpu:
-            return self.__get_percpu()
-        else:
-            return self.__get_cpu()
+        with self._lock:
+            if percpu:
+                return self.__get_percpu()
+            else:
+                return self.__get_cpu()
 
     def __get_cpu(self):
         """Update and/or return the CPU using the psutil library."""
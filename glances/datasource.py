@@ -0,0 +1,470 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Data sources of the local stats.
+
+The collectors get the system stats with:
+
+    from glances.datasource import psutil
+
+By default, this is the psutil library. The data source can be replaced
+(see set_source) by:
+- PsutilRecorder: the psutil library, results are recorded in a file
+- PsutilReplay: results are read from a recorded file
+- PsutilGenerator: generated stats (deterministic, any scale)
+
+The psutil functions not given by the data source (and the psutil
+exceptions/constants) are the ones of the psutil library.
+
+A record file is a gzipped JSON lines file. The first line is a header,
+next lines are frames (all the calls between two stats updates):
+{'time': ..., 'types': {namedtuple name: fields (if new)},
+ 'calls': {call key: result}, 'processes': [process attributes]}
+"""
+
+import collections
+import gzip
+import json
+import random
+import sys
+from time import time
+
+import psutil as psutil_lib
+
+from glances import __version__
+from glances.compat import b, iteritems, nativestr
+from glances.logger import logger
+
+# Recorded psutil functions
+recorded_functions = ['boot_time', 'cpu_count', 'cpu_percent', 'cpu_stats',
+                      'cpu_times_percent', 'disk_io_counters',
+                      'disk_partitions', 'disk_usage', 'net_if_stats',
+                      'net_io_counters', 'sensors_battery', 'sensors_fans',
+                      'sensors_temperatures', 'swap_memory', 'virtual_memory']
+
+# Functions returning a {device: stats} dict (scaled by PsutilReplay)
+device_functions = ['disk_io_counters', 'net_if_stats', 'net_io_counters']
+
+# Offset between the PIDs of the copies of a process (see PsutilReplay)
+pid_offset = 1 << 22
+
+
+def call_key(name, args, kwargs):
+    """Return the key of a psutil function call (in a record file)."""
+    return '{}{}'.format(name, json.dumps([list(args), kwargs], sort_keys=True))
+
+
+class FakeProcess(object):
+
+    """Process (as given by psutil.process_iter) from a data source."""
+
+    def __init__(self, stats, attrs=None, ad_value=None):
+        self.stats = stats
+        self.pid = stats['pid']
+        self.info = self.as_dict(attrs=attrs, ad_value=ad_value)
+
+    def as_dict(self, attrs=None, ad_value=None):
+        if attrs is None:
+            return dict(self.stats)
+        return {a: self.stats.get(a, ad_value) for a in attrs}
+
+    def memory_maps(self, grouped=True):
+        return []
+
+    def connections(self, kind='inet'):
+        return []
+
+
+class DataSource(object):
+
+    """Base class of the data sources."""
+
+    def function(self, name):
+        """Return the function used instead of psutil.<name> (or None)."""
+        return None
+
+    def tick(self):
+        """Called before each stats update."""
+        pass
+
+    def close(self):
+        """Called at the end of Glances."""
+        pass
+
+
+class PsutilRecorder(DataSource):
+
+    """Stats given by psutil and recorded in a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'wb')
+        self._write({'version': 1,
+                     'glances': __version__,
+                     'psutil': psutil_lib.__version__,
+                     'platform': sys.platform})
+        self._types = {}
+        self._functions = {}
+        self._new_frame()
+
+    def _new_frame(self):
+        self._frame = {'time': time(), 'types': {}, 'calls': {}}
+
+    def _write(self, data):
+        self._file.write(b(json.dumps(data, separators=(',', ':'))) + b'\n')
+
+    def encode(self, value):
+        """Return the value in a JSON serializable form."""
+        if isinstance(value, tuple) and hasattr(value, '_fields'):
+            # Namedtuples are saved as {'_t': name, 'v': values}
+            name = type(value).__name__
+            if name not in self._types:
+                self._types[name] = list(value._fields)
+                self._frame['types'][name] = self._types[name]
+            return {'_t': name, 'v': [self.encode(v) for v in value]}
+        if isinstance(value, dict):
+            return {k: self.encode(v) for k, v in iteritems(value)}
+        if isinstance(value, (list, tuple)):
+            return [self.encode(v) for v in value]
+        return value
+
+    def function(self, name):
+        if name == 'process_iter':
+            return self._process_iter
+        if name not in recorded_functions:
+            return None
+        if name not in self._functions:
+            self._functions[name] = self._recorded(name)
+        return self._functions[name]
+
+    def _recorded(self, name):
+        fct = getattr(psutil_lib, name)
+
+        def wrapper(*args, **kwargs):
+            key = call_key(name, args, kwargs)
+            try:
+                ret = fct(*args, **kwargs)
+            except Exception as e:
+                self._frame['calls'][key] = {'_e': type(e).__name__, 'm': str(e)}
+                raise
+            self._frame['calls'][key] = self.encode(ret)
+            return ret
+        return wrapper
+
+    def _process_iter(self, attrs=None, ad_value=None):
+        records = self._frame['processes'] = []
+        for p in psutil_lib.process_iter(attrs=attrs, ad_value=ad_value):
+            record = self.encode(p.info) if attrs is not None else {}
+            record['pid'] = p.pid
+            records.append(record)
+            yield RecordedProcess(p, record, self.encode)
+
+    def tick(self):
+        self._write(self._frame)
+        self._file.flush()
+        self._new_frame()
+
+    def close(self):
+        self.tick()
+        self._file.close()
+        logger.info("Stats recorded in {}".format(self.path))
+
+
+class RecordedProcess(object):
+
+    """psutil.Process whose as_dict results are recorded."""
+
+    def __init__(self, process, record, encode):
+        self._process = process
+        self._record = record
+        self._encode = encode
+        self.pid = process.pid
+        self.info = getattr(process, 'info', None)
+
+    def as_dict(self, attrs=None, ad_value=None):
+        ret = self._process.as_dict(attrs=attrs, ad_value=ad_value)
+        self._record.update(self._encode(ret))
+        return ret
+
+    def __getattr__(self, name):
+        return getattr(self._process, name)
+
+
+class PsutilReplay(DataSource):
+
+    """Stats read from a file recorded by PsutilRecorder.
+
+    Each stats update replays the next frame (from the first one at the
+    end of the file if loop is True). With scale > 1, the processes,
+    network interfaces and disks are replayed scale times.
+    """
+
+    def __init__(self, path, scale=1, loop=True):
+        self.path = path
+        self.scale = scale
+        self.loop = loop
+        with gzip.open(path, 'rb') as f:
+            lines = [json.loads(nativestr(l)) for l in f if l.strip()]
+        self.header = lines[0]
+        self._frames = lines[1:]
+        if not self._frames:
+            raise ValueError('No stats recorded in {}'.format(path))
+        self._types = {}
+        for frame in self._frames:
+            for name, fields in iteritems(frame.get('types', {})):
+                self._types[name] = collections.namedtuple(name, fields)
+        self._functions = {}
+        # Last result of each call (a frame only has the calls done
+        # during its update)
+        self._calls = {}
+        # Processes of the current frame {pid: stats}
+        self._processes = collections.OrderedDict()
+        self._index = 0
+        self._load()
+
+    def decode(self, value):
+        """Return the value as returned by psutil."""
+        if isinstance(value, dict):
+            if '_t' in value:
+                return self._types[value['_t']](*[self.decode(v) for v in value['v']])
+            return {k: self.decode(v) for k, v in iteritems(value)}
+        if isinstance(value, list):
+            return [self.decode(v) for v in value]
+        return value
+
+    def _load(self):
+        frame = self._frames[self._index]
+        self._calls.update(frame['calls'])
+        if 'processes' in frame:
+            # Attributes not read during this update (for example, the
+            # static ones) are the previous ones
+            processes = collections.OrderedDict()
+            for record in frame['processes']:
+                stats = self._processes.get(record['pid'], {}).copy()
+                stats.update(self.decode(record))
+                processes[record['pid']] = stats
+            self._processes = processes
+
+    def tick(self):
+        if self._index + 1 < len(self._frames):
+            self._index += 1
+        elif self.loop and len(self._frames) > 1:
+            # Skip the first frame (calls done at Glances startup)
+            self._index = 1
+        else:
+            return
+        self._load()
+
+    def function(self, name):
+        if name == 'process_iter':
+            return self._process_iter
+        if name == 'Process':
+            return self._process
+        if name not in recorded_functions:
+            return None
+        if name not in self._functions:
+            self._functions[name] = self._replayed(name)
+        return self._functions[name]
+
+    def _replayed(self, name):
+        fct = getattr(psutil_lib, name)
+
+        def wrapper(*args, **kwargs):
+            key = call_key(name, args, kwargs)
+            if key not in self._calls:
+                # Not recorded: use psutil
+                return fct(*args, **kwargs)
+            ret = self._calls[key]
+            if isinstance(ret, dict) and '_e' in ret:
+                raise getattr(psutil_lib, ret['_e'], Exception)(ret['m'])
+            ret = self.decode(ret)
+            if self.scale > 1 and name in device_functions and isinstance(ret, dict):
+                for k, v in list(ret.items()):
+                    for i in range(1, self.scale):
+                        ret['{}_{}'.format(k, i)] = v
+            return ret
+        return wrapper
+
+    def _process_iter(self, attrs=None, ad_value=None):
+        for i in range(self.scale):
+            for stats in self._processes.values():
+                if i:
+                    stats = dict(stats, pid=stats['pid'] + i * pid_offset)
+                yield FakeProcess(stats, attrs=attrs, ad_value=ad_value)
+
+    def _process(self, pid=None):
+        stats = self._processes.get(pid % pid_offset)
+        if stats is None:
+            raise psutil_lib.NoSuchProcess(pid)
+        return FakeProcess(dict(stats, pid=pid))
+
+
+# Namedtuples of the generated stats
+scputimes = collections.namedtuple('scputimes', ['user', 'nice', 'system', 'idle', 'iowait',
+                                                 'irq', 'softirq', 'steal', 'guest', 'guest_nice'])
+scpustats = collections.namedtuple('scpustats', ['ctx_switches', 'interrupts', 'soft_interrupts', 'syscalls'])
+svmem = collections.namedtuple('svmem', ['total', 'available', 'percent', 'used', 'free', 'active',
+                                         'inactive', 'buffers', 'cached', 'shared'])
+sswap = collections.namedtuple('sswap', ['total', 'used', 'free', 'percent', 'sin', 'sout'])
+snetio = collections.namedtuple('snetio', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                                           'errin', 'errout', 'dropin', 'dropout'])
+snicstats = collections.namedtuple('snicstats', ['isup', 'duplex', 'speed', 'mtu'])
+sdiskio = collections.namedtuple('sdiskio', ['read_count', 'write_count', 'read_bytes', 'write_bytes',
+                                             'read_time', 'write_time'])
+pcputimes = collections.namedtuple('pcputimes', ['user', 'system', 'children_user', 'children_system'])
+pmem = collections.namedtuple('pmem', ['rss', 'vms', 'shared', 'text', 'lib', 'data', 'dirty'])
+pio = collections.namedtuple('pio', ['read_count', 'write_count', 'read_bytes', 'write_bytes'])
+pgids = collections.namedtuple('pgids', ['real', 'effective', 'saved'])
+
+
+class PsutilGenerator(DataSource):
+
+    """Generated stats (the same seed gives the same stats).
+
+    The stats change at each update (tick).
+    """
+
+    functions = ['Process', 'cpu_percent', 'cpu_stats', 'cpu_times_percent',
+                 'disk_io_counters', 'net_if_stats', 'net_io_counters',
+                 'process_iter', 'swap_memory', 'virtual_memory']
+
+    def __init__(self, processes=1000, nics=16, disks=16, seed=42):
+        self.random = random.Random(seed)
+        self.processes = collections.OrderedDict()
+        for pid in range(1, processes + 1):
+            self.processes[pid] = self._process(pid)
+        self.nics = ['eth{}'.format(i) for i in range(nics)]
+        self.disks = ['sd{}'.format(i) for i in range(disks)]
+        self.ticks = 0
+        self.tick()
+
+    def _process(self, pid):
+        r = self.random
+        name = r.choice(['python', 'bash', 'nginx', 'postgres', 'java', 'sshd',
+                         'kworker/{}'.format(pid)])
+        return {'pid': pid,
+                'ppid': max(1, pid // 10),
+                'name': name,
+                'cmdline': ['/usr/bin/' + name, '--option', str(pid)],
+                'username': r.choice(['root', 'www-data', 'postgres', 'glances']),
+                'status': r.choice(['running', 'sleeping', 'sleeping', 'sleeping']),
+                'nice': 0,
+                'num_threads': r.randint(1, 32),
+                'create_time': 1500000000.0 + pid,
+                'gids': pgids(1000, 1000, 1000),
+                'memory_percent': r.random() * 2,
+                'memory_info': pmem(*[r.randint(1, 1 << 30) for _ in pmem._fields])}
+
+    def function(self, name):
+        if name in self.functions:
+            return getattr(self, name)
+        return None
+
+    def tick(self):
+        self.ticks += 1
+        r = self.random
+        for pid, p in iteritems(self.processes):
+            p['cpu_percent'] = r.random() * 100
+            p['cpu_times'] = pcputimes(self.ticks * pid * 0.01, self.ticks * 0.01, 0, 0)
+            p['io_counters'] = pio(self.ticks, self.ticks, self.ticks * pid, self.ticks * 2 * pid)
+
+    def process_iter(self, attrs=None, ad_value=None):
+        for p in self.processes.values():
+            yield FakeProcess(p, attrs=attrs, ad_value=ad_value)
+
+    def Process(self, pid=None):
+        if pid not in self.processes:
+            raise psutil_lib.NoSuchProcess(pid)
+        return FakeProcess(self.processes[pid])
+
+    def cpu_percent(self, interval=None, percpu=False):
+        if percpu:
+            return [self.random.random() * 100 for _ in range(4)]
+        return self.random.random() * 100
+
+    def cpu_times_percent(self, interval=None, percpu=False):
+        if percpu:
+            return [self.cpu_times_percent() for _ in range(4)]
+        return scputimes(*[self.random.random() * 10 for _ in scputimes._fields])
+
+    def cpu_stats(self):
+        return scpustats(*[self.ticks * 1000 for _ in scpustats._fields])
+
+    def virtual_memory(self):
+        return svmem(16 << 30, 8 << 30, 50.0, 8 << 30, 4 << 30, 6 << 30, 2 << 30, 1 << 30, 3 << 30, 1 << 28)
+
+    def swap_memory(self):
+        return sswap(4 << 30, 1 << 30, 3 << 30, 25.0, 0, 0)
+
+    def net_io_counters(self, pernic=False, nowrap=True):
+        ret = {n: snetio(*[self.ticks * (i + 1) * 1000 for _ in snetio._fields])
+               for i, n in enumerate(self.nics)}
+        if pernic:
+            return ret
+        return snetio(*[sum(v) for v in zip(*ret.values())])
+
+    def net_if_stats(self):
+        return {n: snicstats(True, 2, 1000, 1500) for n in self.nics}
+
+    def disk_io_counters(self, perdisk=False, nowrap=True):
+        ret = {d: sdiskio(*[self.ticks * (i + 1) * 100 for _ in sdiskio._fields])
+               for i, d in enumerate(self.disks)}
+        if perdisk:
+            return ret
+        return sdiskio(*[sum(v) for v in zip(*ret.values())])
+
+
+class PsutilProxy(object):
+
+    """The psutil library, as seen through the current data source."""
+
+    def __getattr__(self, name):
+        fct = None
+        if _source is not None:
+            fct = _source.function(name)
+        if fct is None:
+            return getattr(psutil_lib, name)
+        return fct
+
+
+# Current data source (None for psutil)
+_source = None
+
+psutil = PsutilProxy()
+
+
+def set_source(source):
+    """Set the data source (None for psutil)."""
+    global _source
+    if _source is not None:
+        _source.close()
+    _source = source
+    if source is not None:
+        logger.info("Stats data source: {}".format(type(source).__name__))
+
+
+def get_source():
+    """Return the current data source (None for psutil)."""
+    return _source
+
+
+def tick():
+    """Tell the data source that a new stats update starts."""
+    if _source is not None:
+        _source.tick()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Compute and apply stats deltas (used by the client/server modes).
+
+A delta between two stats dicts ({plugin: stats}) is a dict:
+{'set': {plugin: patch, ...}, 'del': [removed plugins]}
+
+The patch of a plugin depends on its stats type:
+- dict: {'set': {changed or added keys}, 'del': [removed keys]}
+- list of dicts with a key (see GlancesPlugin.get_key):
+  {'key': key of the items,
+   'add': [new or replaced items],
+   'set': [[item key, {changed fields}], ...],
+   'del': [removed item keys],
+   'order': [item keys]}  (only if the items order has changed)
+- others: {'value': new stats}
+"""
+
+
+def _is_keyed_list(stats, key):
+    """Return True if stats is a list of dicts with a unique key."""
+    if key is None or not isinstance(stats, list):
+        return False
+    if not all(isinstance(i, dict) and key in i for i in stats):
+        return False
+    return len(set(i[key] for i in stats)) == len(stats)
+
+
+def _diff_dict(old, new):
+    """Return the patch between the old and new dicts (None if equal)."""
+    ret = {}
+    changed = {k: v for k, v in new.items() if k not in old or old[k] != v}
+    if changed:
+        ret['set'] = changed
+    removed = [k for k in old if k not in new]
+    if removed:
+        ret['del'] = removed
+    return ret or None
+
+
+def _diff_list(old, new, key):
+    """Return the patch between the old and new keyed lists (None if equal)."""
+    old_items = {i[key]: i for i in old}
+    ret = {'add': [], 'set': []}
+    for i in new:
+        k = i[key]
+        if k not in old_items or set(old_items[k]) != set(i):
+            # New item (or fields list changed): send the full item
+            ret['add'].append(i)
+        else:
+            d = _diff_dict(old_items[k], i)
+            if d is not None:
+                ret['set'].append([k, d['set']])
+    new_keys = [i[key] for i in new]
+    new_keys_set = set(new_keys)
+    ret['del'] = [k for k in old_items if k not in new_keys_set]
+    # Order given by patch_plugin: old items then the new ones
+    patched_keys = [i[key] for i in old if i[key] in new_keys_set]
+    patched_keys += [k for k in new_keys if k not in old_items]
+    if new_keys != patched_keys:
+        ret['order'] = new_keys
+    ret = {k: v for k, v in ret.items() if v}
+    if not ret:
+        return None
+    # The key is given with the patch (the plugin may be unknown on the
+    # patch side)
+    ret['key'] = key
+    return ret
+
+
+def diff_plugin(old, new, key=None):
+    """Return the patch between the old and new stats of a plugin.
+
+    Return None if stats are equal.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        return _diff_dict(old, new)
+    if _is_keyed_list(old, key) and _is_keyed_list(new, key):
+        return _diff_list(old, new, key)
+    if old == new:
+        return None
+    return {'value': new}
+
+
+def patch_plugin(stats, patch, key=None):
+    """Return the stats of a plugin patched with the given patch.
+
+    key is only used if the patch does not give it.
+    """
+    if 'value' in patch:
+        return patch['value']
+    if isinstance(stats, dict):
+        ret = dict(stats)
+        ret.update(patch.get('set', {}))
+        for k in patch.get('del', []):
+            ret.pop(k, None)
+        return ret
+    # Keyed list
+    key = patch.get('key', key)
+    items = {i[key]: i for i in stats}
+    order = [i[key] for i in stats]
+    for k in patch.get('del', []):
+        items.pop(k, None)
+    for k, fields in patch.get('set', []):
+        items[k] = dict(items[k])
+        items[k].update(fields)
+    for i in patch.get('add', []):
+        if i[key] not in items:
+            order.append(i[key])
+        items[i[key]] = i
+    if 'order' in patch:
+        order = patch['order']
+    return [items[k] for k in order if k in items]
+
+
+def diff_stats(old, new, keys=None):
+    """Return the delta between the old and new stats dicts.
+
+    keys is a dict: {plugin: key of the plugin list (or None)}
+    """
+    keys = keys or {}
+    ret = {'set': {}, 'del': [p for p in old if p not in new]}
+    for p in new:
+        if p not in old:
+            ret['set'][p] = {'value': new[p]}
+        else:
+            d = diff_plugin(old[p], new[p], keys.get(p))
+            if d is not None:
+                ret['set'][p] = d
+    return ret
+
+
+def patch_stats(stats, delta, keys=None):
+    """Return the stats dict patched with the given delta."""
+    keys = keys or {}
+    ret = {p: v for p, v in stats.items() if p not in delta.get('del', [])}
+    for p, patch in delta.get('set', {}).items():
+        ret[p] = patch_plugin(ret.get(p), patch, keys.get(p))
+    return ret
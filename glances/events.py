@@ -23,7 +23,7 @@ import time
 from datetime import datetime
 
 from glances.compat import range
-from glances.processes import glances_processes, sort_stats
+from glances.processes import glances_processes, top_stats
 
 
 class GlancesEvents(object):
@@ -198,8 +198,8 @@ class GlancesEvents(object):
             if event_state == "CRITICAL":
                 events_sort_key = self.get_event_sort_key(event_type)
                 # Sort the current process list to retreive the TOP 3 processes
-                self.events_list[event_index][9] = sort_stats(proc_list,
-                                                              events_sort_key)[0:3]
+                self.events_list[event_index][9] = top_stats(proc_list, 3,
+                                                             events_sort_key)
                 self.events_list[event_index][11] = events_sort_key
 
             # MONITORED PROCESSES DESC
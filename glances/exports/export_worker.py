@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Export workers: run each export module in its own persistent thread."""
+
+import copy
+import threading
+from time import time
+
+from glances.compat import queue
+from glances.logger import logger
+from glances.timings import glances_timings
+
+
+class GlancesStatsSnapshot(object):
+
+    """Frozen copy of the stats given to the export modules.
+
+    The stats are copied once (on the collect side). Each getter returns
+    a new copy, so an export module can modify it (for example to add the
+    limits) without side effect on the other modules.
+    Only the getters below are available (the live stats are not).
+    """
+
+    def __init__(self, stats, plugin_list=None):
+        if plugin_list is None:
+            plugin_list = stats.getPluginsList()
+        self._plugins_list = list(stats.getPluginsList())
+        self._loaded_list = list(stats.getPluginsList(enable=False))
+        self._exports = copy.deepcopy(stats.getAllExportsAsDict(plugin_list=plugin_list))
+        self._limits = copy.deepcopy(stats.getAllLimitsAsDict(plugin_list=plugin_list))
+        # Live plugins (see get_plugin)
+        self._plugins = dict((p, stats.get_plugin(p)) for p in self._loaded_list)
+        self.time = time()
+
+    def getPluginsList(self, enable=True):
+        """Return the enabled (or loaded) plugins list (at the snapshot time)."""
+        if enable:
+            return list(self._plugins_list)
+        return list(self._loaded_list)
+
+    def get_plugin(self, plugin_name):
+        """Return the live plugin (None if not loaded).
+
+        Not a copy: only used to read the plugin history (graph module).
+        """
+        return self._plugins.get(plugin_name)
+
+    def getAllExportsAsDict(self, plugin_list=None):
+        """Return a copy of the stats to be exported (dict)."""
+        if plugin_list is None:
+            plugin_list = self._exports
+        return {p: copy.deepcopy(self._exports.get(p)) for p in plugin_list}
+
+    def getAllLimitsAsDict(self, plugin_list=None):
+        """Return a copy of the stats limits (dict)."""
+        if plugin_list is None:
+            plugin_list = self._limits
+        return {p: copy.deepcopy(self._limits.get(p)) for p in plugin_list}
+
+
+class GlancesExportWorker(object):
+
+    """Persistent thread running the update of one export module.
+
+    The snapshots are put in a bounded queue. If the queue is full (the
+    backend is too slow), the policy gives the snapshot to drop:
+    - 'coalesce': the oldest queued snapshot (the newest is exported)
+    - 'drop': the new snapshot
+    """
+
+    policies = ('coalesce', 'drop')
+
+    def __init__(self, name, export, queue_size=1, policy='coalesce'):
+        self.name = name
+        self.export = export
+        if policy not in self.policies:
+            logger.error("Unknown export policy {} (use coalesce)".format(policy))
+            policy = 'coalesce'
+        self.policy = policy
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_latency = None
+        self.max_latency = None
+        self._total_latency = 0.0
+
+        self._thread = threading.Thread(target=self._run,
+                                         name='export_{}'.format(name))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, snapshot):
+        """Queue the snapshot (never block). Return False if a snapshot is dropped."""
+        try:
+            self._queue.put_nowait(snapshot)
+            return True
+        except queue.Full:
+            pass
+        if self.policy == 'coalesce':
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(snapshot)
+            except queue.Full:
+                pass
+        with self._lock:
+            self.dropped += 1
+        logger.debug("Export {} is late, one snapshot dropped ({} policy)".format(self.name, self.policy))
+        return False
+
+    def _run(self):
+        """Worker loop: export the snapshots until a None one is received."""
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                break
+            start = time()
+            try:
+                self.export.update(snapshot)
+            except Exception as e:
+                logger.error("Error while exporting stats with the {} module ({})".format(self.name, e))
+                with self._lock:
+                    self.errors += 1
+            latency = time() - start
+            glances_timings.add(self.name, 'export', latency)
+            with self._lock:
+                self.exported += 1
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency or 0, latency)
+                self._total_latency += latency
+
+    def get_stats(self):
+        """Return the worker metrics (dict)."""
+        with self._lock:
+            return {'queue': self._queue.qsize(),
+                    'queue_size': self._queue.maxsize,
+                    'policy': self.policy,
+                    'exported': self.exported,
+                    'dropped': self.dropped,
+                    'errors': self.errors,
+                    'last_latency': self.last_latency,
+                    'max_latency': self.max_latency,
+                    'mean_latency': self._total_latency / self.exported if self.exported else None}
+
+    def end(self, timeout=5):
+        """Stop the worker once the queued snapshots are exported."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Export {} is still busy, queued snapshots are lost".format(self.name))
+            return
+        self._thread.join(timeout)
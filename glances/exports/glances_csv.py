@@ -64,7 +64,8 @@ class Export(GlancesExport):
     def update(self, stats):
         """Update stats in the CSV output file."""
         # Get the stats
-        all_stats = stats.getAllExportsAsDict(plugin_list=self.plugins_to_export())
+        plugins = self.plugins_to_export(stats)
+        all_stats = stats.getAllExportsAsDict(plugin_list=plugins)
 
         # Init data with timestamp (issue#708)
         if self.first_line:
@@ -72,7 +73,7 @@ class Export(GlancesExport):
         csv_data = [time.strftime('%Y-%m-%d %H:%M:%S')]
 
         # Loop over plugins to export
-        for plugin in self.plugins_to_export():
+        for plugin in plugins:
             if isinstance(all_stats[plugin], list):
                 for stat in all_stats[plugin]:
                     # First line: header
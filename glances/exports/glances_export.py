@@ -44,6 +44,7 @@ class GlancesExport(object):
                           'diskio',
                           'fs',
                           'processcount',
+                          'processtree',
                           'ip',
                           'system',
                           'uptime',
@@ -84,8 +85,16 @@ class GlancesExport(object):
                 ret.remove(p)
         return ret
 
-    def plugins_to_export(self):
-        return self.export_list
+    def plugins_to_export(self, stats=None):
+        """Return the list of plugins to export.
+
+        If stats is given, only the plugins loaded by stats are returned
+        (see glances.registry).
+        """
+        if stats is None:
+            return self.export_list
+        loaded = stats.getPluginsList(enable=False)
+        return [p for p in self.export_list if p in loaded]
 
     def load_conf(self, section, mandatories=['host', 'port'], options=None):
         """Load the export <section> configuration in the Glances configuration file.
@@ -166,11 +175,12 @@ class GlancesExport(object):
             return False
 
         # Get all the stats & limits
-        all_stats = stats.getAllExportsAsDict(plugin_list=self.plugins_to_export())
-        all_limits = stats.getAllLimitsAsDict(plugin_list=self.plugins_to_export())
+        plugins = self.plugins_to_export(stats)
+        all_stats = stats.getAllExportsAsDict(plugin_list=plugins)
+        all_limits = stats.getAllLimitsAsDict(plugin_list=plugins)
 
         # Loop over plugins to export
-        for plugin in self.plugins_to_export():
+        for plugin in plugins:
             if isinstance(all_stats[plugin], dict):
                 all_stats[plugin].update(all_limits[plugin])
             elif isinstance(all_stats[plugin], list):
@@ -179,13 +189,13 @@ class GlancesExport(object):
                     i.update(all_limits[plugin])
             else:
                 continue
-            export_names, export_values = self.__build_export(all_stats[plugin])
+            export_names, export_values = self.build_export(all_stats[plugin])
             self.export(plugin, export_names, export_values)
 
         return True
 
-    def __build_export(self, stats):
-        """Build the export lists."""
+    def build_export(self, stats):
+        """Return the export lists (names, values) of the stats of a plugin."""
         export_names = []
         export_values = []
 
@@ -201,12 +211,18 @@ class GlancesExport(object):
                 if isinstance(value, bool):
                     value = json.dumps(value)
                 if isinstance(value, list):
+                    if value and all(isinstance(i, dict) and 'key' in i for i in value):
+                        # List of items with a key: export all the items
+                        item_names, item_values = self.build_export(value)
+                        export_names += [pre_key + key.lower() + i for i in item_names]
+                        export_values += item_values
+                        continue
                     try:
                         value = value[0]
                     except IndexError:
                         value = ''
                 if isinstance(value, dict):
-                    item_names, item_values = self.__build_export(value)
+                    item_names, item_values = self.build_export(value)
                     item_names = [pre_key + key.lower() + str(i) for i in item_names]
                     export_names += item_names
                     export_values += item_values
@@ -217,7 +233,7 @@ class GlancesExport(object):
             # Stats is a list (of dict)
             # Recursive loop through the list
             for item in stats:
-                item_names, item_values = self.__build_export(item)
+                item_names, item_values = self.build_export(item)
                 export_names += item_names
                 export_values += item_values
         return export_names, export_values
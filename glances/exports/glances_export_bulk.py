@@ -55,18 +55,26 @@ class GlancesExportBulk(object):
         """Close the export module."""
         logger.debug("Finalise export interface %s" % self.export_name)
 
-    def plugins_to_export(self):
-        """Return the list of plugins to export."""
-        return ['percpu',
-                'cloud',
-                'diskio',
-                'load',
-                'mem',
-                'memswap',
-                'processcount',
-                'processlist',
-                'network',
-                'system']
+    def plugins_to_export(self, stats=None):
+        """Return the list of plugins to export.
+
+        If stats is given, only the plugins loaded by stats are returned
+        (see glances.registry).
+        """
+        ret = ['percpu',
+               'cloud',
+               'diskio',
+               'load',
+               'mem',
+               'memswap',
+               'processcount',
+               'processlist',
+               'network',
+               'system']
+        if stats is None:
+            return ret
+        loaded = stats.getPluginsList(enable=False)
+        return [p for p in ret if p in loaded]
 
     def load_conf(self, section, mandatories=['host', 'port'], options=None):
         """Load the export <section> configuration in the Glances configuration file.
@@ -147,11 +155,12 @@ class GlancesExportBulk(object):
             return False
 
         # Get all the stats & limits
-        all_stats = stats.getAllExportsAsDict(plugin_list=self.plugins_to_export())
-        all_limits = stats.getAllLimitsAsDict(plugin_list=self.plugins_to_export())
+        plugins = self.plugins_to_export(stats)
+        all_stats = stats.getAllExportsAsDict(plugin_list=plugins)
+        all_limits = stats.getAllLimitsAsDict(plugin_list=plugins)
 
         # Loop over plugins to export
-        for plugin in self.plugins_to_export():
+        for plugin in plugins:
           self.export_stats(plugin, all_stats[plugin])
         self.flush()
         return True
@@ -97,7 +97,7 @@ class Export(GlancesExport):
 
         plugins = stats.getPluginsList()
         for plugin_name in plugins:
-            plugin = stats._plugins[plugin_name]
+            plugin = stats.get_plugin(plugin_name)
             if plugin_name in self.plugins_to_export():
                 self.export(plugin_name, plugin.get_export_history())
 
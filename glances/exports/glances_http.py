@@ -23,31 +23,48 @@ import csv
 import sys
 import time
 import json
+import zlib
 import urllib3
 import datetime
-import ConfigParser
+import threading
 from numbers import Number
 
 from glances import __version__
-from glances.compat import PY3, iterkeys, itervalues
+from glances.compat import PY3, RawConfigParser, NoOptionError, NoSectionError, iterkeys, itervalues, queue
 from glances.logger import logger
 from glances.exports.glances_export_bulk import GlancesExportBulk
 
 class Export(GlancesExportBulk):
 
-    """This class manages the CSV export module."""
+    """This class manages the CloudAdmin HTTP export module.
+
+    The bulks are sent by a background thread using a persistent
+    (keep-alive) connection. When the endpoint can not be reached, the
+    bulks are spooled on disk and sent again later (with a backoff).
+    """
+
+    # Optional keys of the [CloudAdmin] section: (name, type, default)
+    options = [('Timeout', float, 10.0),
+               ('Gzip', bool, False),
+               ('SpoolDir', str, '/var/spool/cloudadmin'),
+               ('SpoolSize', int, 100),
+               ('QueueSize', int, 10),
+               ('RetryInterval', float, 30.0),
+               ('RetryMax', float, 600.0)]
 
     def __init__(self, config=None, args=None):
-        """Init the CSV export IF."""
+        """Init the CloudAdmin HTTP export IF."""
         super(Export, self).__init__(config=config, args=args)
 
         self.version = __version__
         #parse our config file
-        config = ConfigParser.RawConfigParser()
+        config = RawConfigParser()
         config.read('/etc/cloudadmin/cloudadmin.conf')
         self.api_key = config.get('CloudAdmin','APIKey')
         self.http_endpoint = config.get('CloudAdmin','URL')
         self.host = config.get('CloudAdmin','Host')
+        for opt, opt_type, default in self.options:
+            setattr(self, opt.lower(), self._get_option(config, opt, opt_type, default))
 
         metadata = {
           #so we actually know which user is sending us this data
@@ -60,30 +77,199 @@ class Export(GlancesExportBulk):
           'host' : self.host,
           'Content-Type': 'application/json'
         }
+        if self.gzip:
+            headers['Content-Encoding'] = 'gzip'
 
         self.metadata = metadata
         self.headers = headers
 
         self.bulk = {}
 
+        # Long-lived connection pool (one keep-alive connection is enough)
+        self.http = urllib3.PoolManager(maxsize=1,
+                                        timeout=self.timeout,
+                                        retries=False)
+
+        # Bulks waiting to be sent by the background thread
+        self._bulks = queue.Queue(maxsize=self.queuesize)
+        # Number of consecutive failures and time of the next retry
+        self._failures = 0
+        self._next_try = 0
+        self._spool_seq = 0
+        self._sender = threading.Thread(target=self._send_loop)
+        self._sender.daemon = True
+        self._sender.start()
+
         self.export_enable = True
 
+    def _get_option(self, config, opt, opt_type, default):
+        """Return the optional opt of the [CloudAdmin] section."""
+        try:
+            if opt_type is bool:
+                return config.getboolean('CloudAdmin', opt)
+            return opt_type(config.get('CloudAdmin', opt))
+        except (NoOptionError, NoSectionError):
+            return default
+        except ValueError as e:
+            logger.error('export http - Bad {} value ({}), use {}'.format(opt, e, default))
+            return default
+
+    def exit(self):
+        """Stop the sender and spool the bulks not sent yet."""
+        self._bulks.put(None)
+        self._sender.join(self.timeout)
+        super(Export, self).exit()
+
     def export_stats(self, name, data):
-      self.bulk[name] = data
+        self.bulk[name] = data
 
     def flush(self):
-      self.bulk['metadata'] = self.metadata
-      self.bulk['sent_at'] = str(datetime.datetime.utcnow())
-      if 'TEST' in os.environ:
-        f = open('/tmp/glances-out', 'w')
-        f.write(json.dumps(self.bulk))
-        f.close()
-        os._exit(0)
-      else:
+        self.bulk['metadata'] = self.metadata
+        self.bulk['sent_at'] = str(datetime.datetime.utcnow())
+        if 'TEST' in os.environ:
+            f = open('/tmp/glances-out', 'w')
+            f.write(json.dumps(self.bulk))
+            f.close()
+            os._exit(0)
+        # Hand over the bulk to the sender (never wait for the endpoint)
+        try:
+            self._bulks.put_nowait(self.bulk)
+        except queue.Full:
+            # The sender is late: drop the oldest bulk
+            try:
+                self._bulks.get_nowait()
+            except queue.Empty:
+                pass
+            logger.warning('export http - Sender is late, oldest bulk dropped')
+            self._bulks.put_nowait(self.bulk)
+        self.bulk = {}
+
+    def _encode(self, bulk):
+        """Return the request body of the given bulk."""
+        body = json.dumps(bulk).encode('utf-8')
+        if self.gzip:
+            # wbits=31: gzip container (zlib.compress is Python 2 compatible)
+            c = zlib.compressobj(6, zlib.DEFLATED, 31)
+            body = c.compress(body) + c.flush()
+        return body
+
+    def _post(self, body, gzip=None):
+        """POST the body to the endpoint. Return True on success."""
+        headers = dict(self.headers)
+        if gzip is False:
+            headers.pop('Content-Encoding', None)
+        elif gzip:
+            headers['Content-Encoding'] = 'gzip'
         try:
-            http = urllib3.PoolManager()
-            encoded_body = json.dumps(self.bulk)
-            http.request('POST', self.http_endpoint, headers=self.headers, body=encoded_body, timeout=timeout)
+            r = self.http.request('POST', self.http_endpoint,
+                                  headers=headers, body=body)
         except Exception as e:
             logger.debug('export http - Cannot connect to the endpoint {}: {}'.format(self.http_endpoint, e))
-      self.bulk = {}
+            return False
+        if r.status >= 500 or r.status == 429:
+            logger.debug('export http - Endpoint {} returns {}'.format(self.http_endpoint, r.status))
+            return False
+        if r.status >= 400:
+            # The bulk is rejected: sending it again will not help
+            logger.warning('export http - Bulk rejected by {} ({})'.format(self.http_endpoint, r.status))
+        return True
+
+    def _send_loop(self):
+        """Sender thread: send the bulks, spool them on failure."""
+        while True:
+            try:
+                bulk = self._bulks.get(timeout=self.retryinterval)
+            except queue.Empty:
+                bulk = None
+            else:
+                if bulk is None:
+                    # Exit: keep the bulks not sent yet
+                    self._spool_pending()
+                    break
+            if time.time() < self._next_try:
+                # Backoff: do not try to connect
+                if bulk is not None:
+                    self._spool(self._encode(bulk))
+                continue
+            if bulk is not None and self._spool_files():
+                # Older bulks are pending: spool this one to keep the order
+                self._spool(self._encode(bulk))
+                bulk = None
+            # Send the spooled bulks first, then the new one
+            if not self._flush_spool():
+                self._failed()
+                if bulk is not None:
+                    self._spool(self._encode(bulk))
+                continue
+            if bulk is not None and not self._post(self._encode(bulk)):
+                self._failed()
+                self._spool(self._encode(bulk))
+                continue
+            self._failures = 0
+            self._next_try = 0
+
+    def _failed(self):
+        """Compute the next retry time (exponential backoff)."""
+        self._failures += 1
+        delay = min(self.retrymax, self.retryinterval * 2 ** (self._failures - 1))
+        self._next_try = time.time() + delay
+        logger.debug('export http - Next retry in {} seconds'.format(delay))
+
+    def _spool_files(self):
+        """Return the spooled files (oldest first)."""
+        try:
+            return sorted(f for f in os.listdir(self.spooldir)
+                          if f.endswith('.json') or f.endswith('.json.gz'))
+        except OSError:
+            return []
+
+    def _spool(self, body):
+        """Write the body in the spool directory (bounded)."""
+        if self.spoolsize <= 0:
+            return
+        self._spool_seq += 1
+        # The extension gives the body encoding
+        name = '{:.6f}-{:06d}.{}'.format(time.time(), self._spool_seq % 1000000,
+                                         'json.gz' if self.gzip else 'json')
+        try:
+            if not os.path.isdir(self.spooldir):
+                os.makedirs(self.spooldir)
+            with open(os.path.join(self.spooldir, name), 'wb') as f:
+                f.write(body)
+        except (IOError, OSError) as e:
+            logger.debug('export http - Cannot spool the bulk in {}: {}'.format(self.spooldir, e))
+            return
+        # Remove the oldest bulks
+        files = self._spool_files()
+        for f in files[:max(0, len(files) - self.spoolsize)]:
+            logger.debug('export http - Spool is full, drop {}'.format(f))
+            self._remove(f)
+
+    def _spool_pending(self):
+        """Spool the bulks still in the queue."""
+        while True:
+            try:
+                bulk = self._bulks.get_nowait()
+            except queue.Empty:
+                break
+            if bulk is not None:
+                self._spool(self._encode(bulk))
+
+    def _flush_spool(self):
+        """Send the spooled bulks (oldest first). Return False on failure."""
+        for f in self._spool_files():
+            try:
+                with open(os.path.join(self.spooldir, f), 'rb') as fd:
+                    body = fd.read()
+            except (IOError, OSError):
+                continue
+            if not self._post(body, gzip=f.endswith('.gz')):
+                return False
+            self._remove(f)
+        return True
+
+    def _remove(self, f):
+        try:
+            os.remove(os.path.join(self.spooldir, f))
+        except OSError:
+            pass
@@ -20,6 +20,7 @@
 """InfluxDB interface class."""
 
 import sys
+from time import time
 
 from glances.logger import logger
 from glances.exports.glances_export import GlancesExport
@@ -43,15 +44,38 @@ class Export(GlancesExport):
         # Optionals configuration keys
         self.prefix = None
         self.tags = None
+        # Points are written by batch (one request):
+        # - batch_size: flush when this number of points is reached
+        # - batch_age: or when the oldest point is older (in seconds)
+        # (0 for both: flush once per refresh)
+        self.batch_size = 0
+        self.batch_age = 0
+        # Maximum number of points kept while InfluxDB is not reachable
+        self.backlog = 10000
 
         # Load the InfluxDB configuration file
         self.export_enable = self.load_conf('influxdb',
                                             mandatories=['host', 'port',
                                                          'user', 'password',
                                                          'db'],
-                                            options=['prefix', 'tags'])
+                                            options=['prefix', 'tags',
+                                                     'batch_size', 'batch_age',
+                                                     'backlog'])
         if not self.export_enable:
             sys.exit(2)
+        try:
+            self.batch_size = int(self.batch_size)
+            self.batch_age = float(self.batch_age)
+            self.backlog = int(self.backlog)
+        except ValueError as e:
+            logger.critical("Bad batch configuration for InfluxDB ({})".format(e))
+            sys.exit(2)
+
+        # Points waiting to be written (oldest first)
+        self._batch = []
+        self._batch_time = None
+        # Time of the stats being exported (in ms)
+        self._time = None
 
         # Init the InfluxDB client
         self.client = self.init()
@@ -107,18 +131,63 @@ class Export(GlancesExport):
 
         return [{'measurement': name,
                  'tags': self.parse_tags(self.tags),
+                 'time': self._time,
                  'fields': dict(zip(columns, points))}]
 
+    def update(self, stats):
+        """Add the stats to the batch and write it if needed."""
+        # Use the stats snapshot time (see GlancesStatsSnapshot)
+        self._time = int(getattr(stats, 'time', time()) * 1000)
+        ret = super(Export, self).update(stats)
+        if self.is_flush_needed():
+            self.flush()
+        return ret
+
     def export(self, name, columns, points):
-        """Write the points to the InfluxDB server."""
+        """Add the points to the batch."""
         # Manage prefix
         if self.prefix is not None:
             name = self.prefix + '.' + name
-        # Write input to the InfluxDB database
+        if self._batch_time is None:
+            self._batch_time = time()
+        self._batch += self._normalize(name, columns, points)
+
+    def is_flush_needed(self):
+        """Return True if the batch should be written."""
+        if not self._batch:
+            return False
+        if self.batch_size <= 0 and self.batch_age <= 0:
+            return True
+        if 0 < self.batch_size <= len(self._batch):
+            return True
+        return 0 < self.batch_age <= time() - self._batch_time
+
+    def flush(self):
+        """Write the batch to the InfluxDB server (in one request).
+
+        If the write fails, the points are kept (up to backlog points)
+        and written with the next batch. With backlog <= 0, they are
+        dropped.
+        """
         try:
-            self.client.write_points(self._normalize(name, columns, points))
+            self.client.write_points(self._batch, time_precision='ms')
         except Exception as e:
-            logger.error("Cannot export {} stats to InfluxDB ({})".format(name,
-                                                                          e))
-        else:
-            logger.debug("Export {} stats to InfluxDB".format(name))
+            logger.error("Cannot export {} points to InfluxDB ({})".format(len(self._batch), e))
+            if self.backlog <= 0:
+                # No backlog ([-0:] would keep all the points)
+                self._batch = []
+                self._batch_time = None
+            elif len(self._batch) > self.backlog:
+                logger.warning("InfluxDB backlog is full, drop {} points".format(len(self._batch) - self.backlog))
+                self._batch = self._batch[-self.backlog:]
+            return False
+        logger.debug("Export {} points to InfluxDB".format(len(self._batch)))
+        self._batch = []
+        self._batch_time = None
+        return True
+
+    def exit(self):
+        """Write the last points and close the export module."""
+        if self._batch:
+            self.flush()
+        super(Export, self).exit()
@@ -56,3 +56,19 @@ class GlancesHistory(object):
     def get_json(self, nb=0):
         """Get the history as a dict of list (with list JSON compliant)"""
         return {i: self.stats_history[i].history_json(nb=nb) for i in self.stats_history}
+
+    def get_trend(self, key, nb=6):
+        """Get the trend of the given stats (see GlancesAttribute.history_trend)
+        Return None if the stats is not in the history"""
+        if key not in self.stats_history:
+            return None
+        return self.stats_history[key].history_trend(nb=nb)
+
+    def get_query(self, start=None, end=None, resolution=60, percentiles=None):
+        """Get the history between start and end, downsampled in buckets
+        of resolution seconds (see GlancesAttribute.history_query)"""
+        return {i: self.stats_history[i].history_query(start=start,
+                                                       end=end,
+                                                       resolution=resolution,
+                                                       percentiles=percentiles)
+                for i in self.stats_history}
@@ -100,6 +100,10 @@ Examples of use:
 
   Disable some plugins (any modes):
     $ glances --disable-plugin network,ports
+
+  Record the system stats, then replay them with 10 times more processes:
+    $ glances --record /tmp/glances.rec.gz
+    $ glances --replay /tmp/glances.rec.gz --replay-scale 10
 """
 
     def __init__(self):
@@ -162,6 +166,8 @@ Examples of use:
                             dest='enable_irq', help='enable IRQ module'),
         parser.add_argument('--enable-process-extended', action='store_true', default=False,
                             dest='enable_process_extended', help='enable extended stats on top process')
+        parser.add_argument('--enable-process-tree', action='store_true', default=False,
+                            dest='enable_process_tree', help='enable the processes tree (subtrees and cgroups stats)')
         # Export modules feature
         parser.add_argument('--export', dest='export',
                             help='enable export module (comma separed list)')
@@ -244,6 +250,15 @@ Examples of use:
                             dest='fs_free_space', help='display FS free space instead of used')
         parser.add_argument('--theme-white', action='store_true', default=False,
                             dest='theme_white', help='optimize display colors for white background')
+        # Data source options (see glances/datasource.py)
+        parser.add_argument('--record', default=None, dest='record_file',
+                            help='record the system stats to the given file')
+        parser.add_argument('--replay', default=None, dest='replay_file',
+                            help='replay the system stats recorded in the given file')
+        parser.add_argument('--replay-scale', default=1, type=int, dest='replay_scale',
+                            help='replay N times the processes, network interfaces and disks')
+        parser.add_argument('--generate', default=None, dest='generate',
+                            help='use generated system stats (PROCESSES[,NICS[,DISKS]], ex: 10000,500,200)')
         # Globals options
         parser.add_argument('--disable-check-update', action='store_true', default=False,
                             dest='disable_check_update', help='disable online Glances version ckeck')
@@ -353,6 +368,9 @@ Examples of use:
         # By default help is hidden
         args.help_tag = False
 
+        # By default the Glances self stats are hidden
+        args.selfstats_tag = False
+
         # Display Rx and Tx, not the sum for the network
         args.network_sum = False
         args.network_cumul = False
@@ -409,6 +427,9 @@ Examples of use:
                 "Process filter is only available in standalone mode")
             sys.exit(2)
 
+        # Data source (only for the local stats)
+        self.set_datasource(args)
+
         # Disable HDDTemp if sensors are disabled
         if getattr(args, 'disable_sensors', False):
             disable(args, 'hddtemp')
@@ -416,6 +437,22 @@ Examples of use:
 
         return args
 
+    def set_datasource(self, args):
+        """Set the data source of the local stats (default is psutil)."""
+        from glances import datasource
+        try:
+            if args.replay_file is not None:
+                datasource.set_source(datasource.PsutilReplay(args.replay_file,
+                                                              scale=args.replay_scale))
+            elif args.generate is not None:
+                scale = [int(i) for i in args.generate.split(',')]
+                datasource.set_source(datasource.PsutilGenerator(*scale[:3]))
+            elif args.record_file is not None:
+                datasource.set_source(datasource.PsutilRecorder(args.record_file))
+        except (IOError, OSError, ValueError) as e:
+            logger.critical("Can not set the stats data source ({})".format(e))
+            sys.exit(2)
+
     def is_standalone(self):
         """Return True if Glances is running in standalone mode."""
         return (not self.args.client and
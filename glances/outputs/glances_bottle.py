@@ -19,6 +19,7 @@
 
 """Web interface class."""
 
+import hashlib
 import json
 import os
 import sys
@@ -29,6 +30,7 @@ import zlib
 
 from glances.compat import b
 from glances.timer import Timer
+from glances.timings import glances_timings
 from glances.logger import logger
 
 try:
@@ -39,7 +41,11 @@ except ImportError:
 
 
 def compress(func):
-    """Compress result with deflate algorithm if the client ask for it."""
+    """Compress result with deflate algorithm if the client ask for it.
+
+    If the result is a GlancesSnapshot, its ETag is sent and a 304 status
+    is returned when it matches the If-None-Match header of the request.
+    """
     def wrapper(*args, **kwargs):
         """Wrapper that take one function and return the compressed result."""
         ret = func(*args, **kwargs)
@@ -48,26 +54,60 @@ def compress(func):
             request.url,
             ['{}: {}'.format(h, request.headers.get(h)) for h in request.headers.keys()]
         ))
-        if 'deflate' in request.headers.get('Accept-Encoding', ''):
-            response.headers['Content-Encoding'] = 'deflate'
+        deflate = 'deflate' in request.headers.get('Accept-Encoding', '')
+        if isinstance(ret, GlancesSnapshot):
+            response.headers['ETag'] = ret.etag
+            if ret.match(request.headers.get('If-None-Match')):
+                response.status = 304
+                return ''
+            ret = ret.deflated() if deflate else ret.data
+        elif deflate:
             ret = deflate_compress(ret)
+        if deflate:
+            response.headers['Content-Encoding'] = 'deflate'
         else:
             response.headers['Content-Encoding'] = 'identity'
         return ret
 
-    def deflate_compress(data, compress_level=6):
-        """Compress given data using the DEFLATE algorithm"""
-        # Init compression
-        zobj = zlib.compressobj(compress_level,
-                                zlib.DEFLATED,
-                                zlib.MAX_WBITS,
-                                zlib.DEF_MEM_LEVEL,
-                                zlib.Z_DEFAULT_STRATEGY)
+    return wrapper
+
 
-        # Return compressed object
-        return zobj.compress(b(data)) + zobj.flush()
+def deflate_compress(data, compress_level=6):
+    """Compress given data using the DEFLATE algorithm"""
+    # Init compression
+    zobj = zlib.compressobj(compress_level,
+                            zlib.DEFLATED,
+                            zlib.MAX_WBITS,
+                            zlib.DEF_MEM_LEVEL,
+                            zlib.Z_DEFAULT_STRATEGY)
 
-    return wrapper
+    # Return compressed object
+    return zobj.compress(b(data)) + zobj.flush()
+
+
+class GlancesSnapshot(object):
+    """An API response serialized once per stats update.
+
+    The compressed version is computed on the first request asking for it.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.etag = '"{}"'.format(hashlib.sha1(b(data)).hexdigest())
+        self._deflated = None
+
+    def deflated(self):
+        """Return the DEFLATE compressed data."""
+        if self._deflated is None:
+            self._deflated = deflate_compress(self.data)
+        return self._deflated
+
+    def match(self, if_none_match):
+        """Return True if the ETag is in the If-None-Match header."""
+        if not if_none_match:
+            return False
+        etags = [e.strip() for e in if_none_match.split(',')]
+        return '*' in etags or self.etag in etags or 'W/' + self.etag in etags
 
 
 class GlancesBottle(object):
@@ -91,6 +131,11 @@ class GlancesBottle(object):
         # since last update is passed (will retrieve old cached info instead)
         self.timer = Timer(0)
 
+        # Serialized responses cache (for the current stats generation)
+        # {key: GlancesSnapshot}
+        self._snapshots = {}
+        self._snapshots_generation = None
+
         # Load configuration file
         self.load_config(config)
 
@@ -102,6 +147,8 @@ class GlancesBottle(object):
         self._app = Bottle()
         # Enable CORS (issue #479)
         self._app.install(EnableCors())
+        # Routes latency (see /api/3/selfstats)
+        self._app.install(EnableTimings())
         # Password
         if args.password != '':
             self._app.install(auth_basic(self.check_auth))
@@ -128,6 +175,20 @@ class GlancesBottle(object):
             self.stats.update()
             self.timer = Timer(self.args.cached_time)
 
+    def _snapshot(self, key, fct):
+        """Return the GlancesSnapshot of the JSON string returned by fct.
+
+        The snapshot is only rebuilt when the stats have been updated
+        since the last call (same key).
+        """
+        if self._snapshots_generation != self.stats.generation:
+            # Stats have been updated: drop the old snapshots
+            self._snapshots = {}
+            self._snapshots_generation = self.stats.generation
+        if key not in self._snapshots:
+            self._snapshots[key] = GlancesSnapshot(fct())
+        return self._snapshots[key]
+
     def app(self):
         return self._app()
 
@@ -155,8 +216,14 @@ class GlancesBottle(object):
                         callback=self._api_help)
         self._app.route('/api/%s/pluginslist' % self.API_VERSION, method="GET",
                         callback=self._api_plugins)
+        self._app.route('/api/%s/selfstats' % self.API_VERSION, method="GET",
+                        callback=self._api_selfstats)
         self._app.route('/api/%s/all' % self.API_VERSION, method="GET",
                         callback=self._api_all)
+        self._app.route('/api/%s/all/delta' % self.API_VERSION, method="GET",
+                        callback=self._api_all_delta)
+        self._app.route('/api/%s/all/delta/<generation:int>' % self.API_VERSION, method="GET",
+                        callback=self._api_all_delta)
         self._app.route('/api/%s/all/limits' % self.API_VERSION, method="GET",
                         callback=self._api_all_limits)
         self._app.route('/api/%s/all/views' % self.API_VERSION, method="GET",
@@ -292,6 +359,25 @@ class GlancesBottle(object):
             abort(404, "Cannot get plugin list (%s)" % str(e))
         return plist
 
+    @compress
+    def _api_selfstats(self):
+        """Glances API RESTful implementation.
+
+        Return the JSON representation of the Glances self stats:
+        latency histograms of the plugins (update, update_views,
+        get_stats_display), exports and API routes, and the export
+        workers metrics (see GlancesStats.getSelfStats)
+        HTTP/200 if OK
+        HTTP/404 if others error
+        """
+        response.content_type = 'application/json; charset=utf-8'
+
+        try:
+            statval = json.dumps(self.stats.getSelfStats())
+        except Exception as e:
+            abort(404, "Cannot get self stats (%s)" % str(e))
+        return statval
+
     @compress
     def _api_all(self):
         """Glances API RESTful implementation.
@@ -316,12 +402,41 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat ID
-            statval = json.dumps(self.stats.getAllAsDict())
+            statval = self._snapshot('all', lambda: json.dumps(self.stats.getAllAsDict()))
         except Exception as e:
             abort(404, "Cannot get stats (%s)" % str(e))
 
         return statval
 
+    @compress
+    def _api_all_delta(self, generation=None):
+        """Glances API RESTful implementation.
+
+        Return the JSON representation of the changes of the enabled
+        plugins stats since the given stats generation
+        (see GlancesStats.getAllDelta)
+        HTTP/200 if OK
+        HTTP/404 if others error
+        """
+        response.content_type = 'application/json; charset=utf-8'
+
+        # Update the stat
+        self.__update__()
+
+        if generation is not None and \
+           not 0 <= self.stats.generation - generation < self.stats.delta_history_size:
+            # Too old (or unknown) generation: return all the stats
+            generation = None
+
+        try:
+            # Get the JSON value of the stats delta
+            statval = self._snapshot('all/delta/%s' % generation,
+                                     lambda: json.dumps(self.stats.getAllDelta(generation)))
+        except Exception as e:
+            abort(404, "Cannot get stats delta (%s)" % str(e))
+
+        return statval
+
     @compress
     def _api_all_limits(self):
         """Glances API RESTful implementation.
@@ -335,7 +450,7 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat limits
-            limits = json.dumps(self.stats.getAllLimitsAsDict())
+            limits = self._snapshot('all/limits', lambda: json.dumps(self.stats.getAllLimitsAsDict()))
         except Exception as e:
             abort(404, "Cannot get limits (%s)" % (str(e)))
         return limits
@@ -353,7 +468,7 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat view
-            limits = json.dumps(self.stats.getAllViewsAsDict())
+            limits = self._snapshot('all/views', lambda: json.dumps(self.stats.getAllViewsAsDict()))
         except Exception as e:
             abort(404, "Cannot get views (%s)" % (str(e)))
         return limits
@@ -377,17 +492,44 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat ID
-            statval = self.stats.get_plugin(plugin).get_stats()
+            statval = self._snapshot(plugin, self.stats.get_plugin(plugin).get_stats)
         except Exception as e:
             abort(404, "Cannot get plugin %s (%s)" % (plugin, str(e)))
         return statval
 
+    def _history_query(self):
+        """Return the history query (dict) given in the request parameters.
+
+        - window: only the last window seconds of the history
+        - resolution: size (in seconds) of the buckets (default is 60)
+        - percentiles: comma separated list of percentiles between 0
+          and 100 (ex: 50,95)
+
+        Return None if no window/resolution is given.
+        """
+        if 'window' not in request.query and 'resolution' not in request.query:
+            return None
+        try:
+            window = request.query.get('window')
+            percentiles = request.query.get('percentiles')
+            query = {'window': float(window) if window else None,
+                     'resolution': float(request.query.get('resolution', 60)),
+                     'percentiles': [float(p) for p in percentiles.split(',')] if percentiles else None}
+        except ValueError as e:
+            abort(400, "Bad history query (%s)" % str(e))
+        for p in query['percentiles'] or []:
+            if not 0 <= p <= 100:
+                abort(400, "Bad history query (percentile %s not between 0 and 100)" % p)
+        return query
+
     @compress
     def _api_history(self, plugin, nb=0):
         """Glances API RESTful implementation.
 
         Return the JSON representation of a given plugin history
         Limit to the last nb items (all if nb=0)
+        If window and/or resolution parameters are given, return the
+        history downsampled in buckets (see _history_query)
         HTTP/200 if OK
         HTTP/400 if plugin is not found
         HTTP/404 if others error
@@ -397,12 +539,17 @@ class GlancesBottle(object):
         if plugin not in self.plugins_list:
             abort(400, "Unknown plugin %s (available plugins: %s)" % (plugin, self.plugins_list))
 
+        query = self._history_query()
+
         # Update the stat
         self.__update__()
 
         try:
             # Get the JSON value of the stat ID
-            statval = self.stats.get_plugin(plugin).get_stats_history(nb=int(nb))
+            if query is None:
+                statval = self.stats.get_plugin(plugin).get_stats_history(nb=int(nb))
+            else:
+                statval = self.stats.get_plugin(plugin).get_stats_history_query(**query)
         except Exception as e:
             abort(404, "Cannot get plugin history %s (%s)" % (plugin, str(e)))
         return statval
@@ -426,7 +573,8 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat limits
-            ret = self.stats.get_plugin(plugin).limits
+            ret = self._snapshot(plugin + '/limits',
+                                 lambda: json.dumps(self.stats.get_plugin(plugin).limits))
         except Exception as e:
             abort(404, "Cannot get limits for plugin %s (%s)" % (plugin, str(e)))
         return ret
@@ -450,7 +598,7 @@ class GlancesBottle(object):
 
         try:
             # Get the JSON value of the stat views
-            ret = self.stats.get_plugin(plugin).get_views()
+            ret = self._snapshot(plugin + '/views', self.stats.get_plugin(plugin).get_json_views)
         except Exception as e:
             abort(404, "Cannot get views for plugin %s (%s)" % (plugin, str(e)))
         return ret
@@ -468,7 +616,11 @@ class GlancesBottle(object):
 
         if value is None:
             if history:
-                ret = self.stats.get_plugin(plugin).get_stats_history(item, nb=int(nb))
+                query = self._history_query()
+                if query is None:
+                    ret = self.stats.get_plugin(plugin).get_stats_history(item, nb=int(nb))
+                else:
+                    ret = self.stats.get_plugin(plugin).get_stats_history_query(item, **query)
             else:
                 ret = self.stats.get_plugin(plugin).get_stats_item(item)
 
@@ -619,3 +771,16 @@ class EnableCors(object):
                 return fn(*args, **kwargs)
 
         return _enable_cors
+
+
+class EnableTimings(object):
+    """Store the latency of the API routes (see glances.timings)."""
+    name = 'enable_timings'
+    api = 2
+
+    def apply(self, fn, context):
+        def _enable_timings(*args, **kwargs):
+            with glances_timings.timer(context.rule, 'route'):
+                return fn(*args, **kwargs)
+
+        return _enable_timings
@@ -22,12 +22,14 @@
 import re
 import sys
 
-from glances.compat import u, itervalues
+from glances import registry
+from glances.compat import u, itervalues, iteritems
 from glances.globals import MACOS, WINDOWS
 from glances.logger import logger
 from glances.events import glances_events
 from glances.processes import glances_processes
 from glances.timer import Timer
+from glances.timings import glances_timings
 
 # Import curses library for "normal" operating system
 if not WINDOWS:
@@ -72,6 +74,7 @@ class _GlancesCurses(object):
         'P': {'switch': 'disable_ports'},
         'Q': {'switch': 'enable_irq'},
         'R': {'switch': 'disable_raid'},
+        'S': {'switch': 'selfstats_tag'},
         's': {'switch': 'disable_sensors'},
         'T': {'switch': 'network_sum'},
         'U': {'switch': 'network_cumul'},
@@ -102,6 +105,9 @@ class _GlancesCurses(object):
     # Define right sidebar
     _right_sidebar = ['docker', 'processcount', 'amps', 'processlist', 'alert']
 
+    # Display of a plugin which is not loaded
+    empty_stats_display = {'display': False, 'msgdict': [], 'align': 'left'}
+
     def __init__(self, config=None, args=None):
         # Init
         self.config = config
@@ -375,6 +381,13 @@ class _GlancesCurses(object):
                 glances_processes.disable_extended()
             else:
                 glances_processes.enable_extended()
+        elif self.pressedkey == ord('V'):
+            # 'V' > Enable/Disable the processes tree
+            self.args.enable_process_tree = not self.args.enable_process_tree
+            if not self.args.enable_process_tree:
+                glances_processes.disable_tree()
+            else:
+                glances_processes.enable_tree()
         elif self.pressedkey == ord('E'):
             # 'E' > Erase the process filter
             glances_processes.process_filter = None
@@ -503,8 +516,13 @@ class _GlancesCurses(object):
                                        plugin_max_width)
 
             # Get the view
-            ret[p] = stats.get_plugin(p).get_stats_display(args=self.args,
-                                                           max_width=plugin_max_width)
+            with glances_timings.timer(p, 'get_stats_display'):
+                ret[p] = stats.get_plugin(p).get_stats_display(args=self.args,
+                                                               max_width=plugin_max_width)
+
+        # Plugins not loaded (disabled at startup or not available)
+        for p in registry.plugins:
+            ret.setdefault(p, self.empty_stats_display)
 
         return ret
 
@@ -557,8 +575,12 @@ class _GlancesCurses(object):
             glances_processes.max_processes = max_processes_displayed
 
         # Get the processlist
-        __stat_display["processlist"] = stats.get_plugin(
-            'processlist').get_stats_display(args=self.args)
+        if stats.get_plugin('processlist') is None:
+            __stat_display["processlist"] = self.empty_stats_display
+        else:
+            with glances_timings.timer('processlist', 'get_stats_display'):
+                __stat_display["processlist"] = stats.get_plugin(
+                    'processlist').get_stats_display(args=self.args)
 
         # Display the stats on the curses interface
         ###########################################
@@ -620,8 +642,26 @@ class _GlancesCurses(object):
         if self.args.generate_graph:
             self.display_popup('Generate graph in {}'.format(self.args.export_graph_path))
 
+        # Display the Glances self stats (overlay)
+        if getattr(self.args, 'selfstats_tag', False):
+            self.display_popup(self.selfstats_msg(), duration=0)
+
         return True
 
+    def selfstats_msg(self, nb=15):
+        """Return the Glances self stats message (slowest functions first)."""
+        histograms = glances_timings.get_histograms()
+        lines = [(h['mean'], f, n, h)
+                 for f in histograms for n, h in iteritems(histograms[f])]
+        lines.sort(key=lambda l: l[0], reverse=True)
+        msg = '{:18} {:18} {:>7} {:>8} {:>8} {:>8}'.format(
+            'FUNCTION', 'NAME', 'COUNT', 'MEAN ms', 'P95 ms', 'MAX ms')
+        for _, f, n, h in lines[:nb]:
+            msg += '\n{:18} {:18} {:>7} {:>8.2f} {:>8.2f} {:>8.2f}'.format(
+                f[:18], n[:18], h['count'],
+                h['mean'] * 1000, h['p95'] * 1000, h['max'] * 1000)
+        return msg
+
     def __display_header(self, stat_display):
         """Display the firsts lines (header) in the Curses interface.
 
@@ -679,8 +719,9 @@ class _GlancesCurses(object):
                 quicklook_width = min(self.screen.getmaxyx()[1] - (stats_width + 8 + stats_number * self.space_between_column),
                                       self._quicklook_max_width - 5)
             try:
-                stat_display["quicklook"] = stats.get_plugin(
-                    'quicklook').get_stats_display(max_width=quicklook_width, args=self.args)
+                with glances_timings.timer('quicklook', 'get_stats_display'):
+                    stat_display["quicklook"] = stats.get_plugin(
+                        'quicklook').get_stats_display(max_width=quicklook_width, args=self.args)
             except AttributeError as e:
                 logger.debug("Quicklook plugin not available (%s)" % e)
             else:
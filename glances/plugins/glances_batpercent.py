@@ -19,7 +19,7 @@
 
 """Battery plugin."""
 
-import psutil
+from glances.datasource import psutil
 
 from glances.logger import logger
 from glances.plugins.glances_plugin import GlancesPlugin
@@ -21,7 +21,7 @@
 
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 
 class Plugin(GlancesPlugin):
@@ -26,7 +26,7 @@ from glances.globals import LINUX
 from glances.plugins.glances_core import Plugin as CorePlugin
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 # SNMP OID
 # percentage of user CPU time: .1.3.6.1.4.1.2021.11.9.0
@@ -23,7 +23,7 @@ from glances.compat import nativestr
 from glances.timer import getTimeSinceLastUpdate
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 
 # Define the history items list
@@ -19,12 +19,14 @@
 
 """Docker plugin."""
 
+import heapq
 import os
 import threading
 import time
 
+from glances import cgroups
 from glances.logger import logger
-from glances.compat import iterkeys, itervalues, nativestr
+from glances.compat import itervalues, nativestr, range
 from glances.timer import getTimeSinceLastUpdate
 from glances.plugins.glances_plugin import GlancesPlugin
 from glances.processes import sort_stats as sort_stats_processes, weighted, glances_processes
@@ -83,18 +85,29 @@ class Plugin(GlancesPlugin):
         # We want to display the stat in the curse interface
         self.display_curse = True
 
-        # Init the Docker API
-        self.docker_client = self.connect()
-
-        # Dict of thread (to grab stats asynchroniously, one thread is created by container)
-        # key: Container Id
-        # value: instance of ThreadDockerGrabber
-        self.thread_list = {}
+        # Docker API client (see init_deferred)
+        self.docker_client = None
+
+        # Thread to maintain the containers list (Docker events)
+        # and threads to grab the containers stats (started on the
+        # first update, when the configuration is loaded)
+        self.watcher = None
+        self.stats_pool = None
+        # Reader of the cgroups files (if the cgroup collector is used)
+        # and last stats read (key: container Id, value: (pid, stats))
+        self.cgroups = None
+        self.cgroups_stats = {}
+        # Last computed stats of the containers (key: container Id,
+        # value: (grabbed stats, computed stats)), only computed again
+        # when the stats pool has grabbed new stats
+        self.containers_stats = {}
 
     def exit(self):
         """Overwrite the exit method to close threads."""
-        for t in itervalues(self.thread_list):
-            t.stop()
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.stats_pool is not None:
+            self.stats_pool.stop()
         # Call the father class
         super(Plugin, self).exit()
 
@@ -115,6 +128,11 @@ class Plugin(GlancesPlugin):
             logger.debug("docker plugin - Docker export error {}".format(e))
         return ret
 
+    def init_deferred(self):
+        """Init the Docker API (in background)."""
+        if not import_error_tag:
+            self.docker_client = self.connect()
+
     def connect(self):
         """Connect to the Docker server."""
         try:
@@ -125,6 +143,34 @@ class Plugin(GlancesPlugin):
 
         return ret
 
+    def _stats_workers(self):
+        """Return the number of threads used to grab the containers stats.
+
+        # Number of simultaneous requests to the Docker server (default is 4)
+        stats_workers=4
+        """
+        workers = self.get_conf_value('stats_workers')
+        try:
+            return max(1, int(workers[0]))
+        except (IndexError, ValueError):
+            return 4
+
+    def _start_threads(self):
+        """Start the events watcher and the stats pool threads.
+
+        # Containers stats collector: api (Docker API, default) or
+        # cgroup (Linux cgroups files, the Docker API is only used
+        # for the containers list)
+        collector=cgroup
+        """
+        self.watcher = DockerEventsWatcher(self.docker_client, all_tag=self._all_tag())
+        self.watcher.start()
+        if self.get_conf_value('collector') == ['cgroup']:
+            self.cgroups = cgroups.get_collector()
+        if self.cgroups is None:
+            refresh = getattr(self.args, 'time', 2) if self.args is not None else 2
+            self.stats_pool = DockerStatsPool(workers=self._stats_workers(), refresh=refresh)
+
     def _all_tag(self):
         """Return the all tag of the Glances/Docker configuration file.
 
@@ -151,8 +197,12 @@ class Plugin(GlancesPlugin):
 
         if self.input_method == 'local':
             # Update stats
+            if self.docker_client is None:
+                return self.stats
+            if self.watcher is None:
+                self._start_threads()
 
-            # Docker version
+            # Docker version (grabbed by the events watcher)
             # Exemple: {
             #     "KernelVersion": "3.16.4-tinycore64",
             #     "Arch": "amd64",
@@ -162,44 +212,31 @@ class Plugin(GlancesPlugin):
             #     "Os": "linux",
             #     "GoVersion": "go1.3.3"
             # }
-            try:
-                stats['version'] = self.docker_client.version()
-            except Exception as e:
+            if self.watcher.version is None:
                 # Correct issue#649
-                logger.error("{} plugin - Cannot get Docker version ({})".format(self.plugin_name, e))
-                return self.stats
-
-            # Update current containers list
-            try:
-                # Issue #1152: Docker module doesn't export details about stopped containers
-                # The Docker/all key of the configuration file should be set to True
-                containers = self.docker_client.containers.list(all=self._all_tag()) or []
-            except Exception as e:
-                logger.error("{} plugin - Cannot get containers list ({})".format(self.plugin_name, e))
+                logger.debug("{} plugin - Docker version not available".format(self.plugin_name))
                 return self.stats
-
-            # Start new thread for new container
-            for container in containers:
-                if container.id not in self.thread_list:
-                    # Thread did not exist in the internal dict
-                    # Create it and add it to the internal dict
-                    logger.debug("{} plugin - Create thread for container {}".format(self.plugin_name, container.id[:12]))
-                    t = ThreadDockerGrabber(container)
-                    self.thread_list[container.id] = t
-                    t.start()
-
-            # Stop threads for non-existing containers
-            nonexisting_containers = set(iterkeys(self.thread_list)) - set([c.id for c in containers])
-            for container_id in nonexisting_containers:
-                # Stop the thread
-                logger.debug("{} plugin - Stop thread for old container {}".format(self.plugin_name, container_id[:12]))
-                self.thread_list[container_id].stop()
-                # Delete the item from the dict
-                del self.thread_list[container_id]
+            stats['version'] = self.watcher.version
+
+            # Current containers list (maintained by the events watcher)
+            # Issue #1152: Docker module doesn't export details about stopped containers
+            # The Docker/all key of the configuration file should be set to True
+            containers = self.watcher.containers
+            if self.stats_pool is not None:
+                self.stats_pool.set_containers([c for c, _ in containers])
+            current = set(c.id for c, _ in containers)
+            for container_id in [i for i in self.containers_stats if i not in current]:
+                del self.containers_stats[container_id]
+            # Previous counters of the removed containers
+            for old in [getattr(self, n, {}) for n in ('cpu_old', 'netcounters_old', 'iocounters_old')]:
+                for container_id in [i for i in old if i not in current]:
+                    del old[container_id]
+            for container_id in [i for i in self.cgroups_stats if i not in current]:
+                self.cgroups.forget(self.cgroups_stats.pop(container_id)[0])
 
             # Get stats for all containers
             stats['containers'] = []
-            for container in containers:
+            for container, image_tags in containers:
                 # Init the stats for the current container
                 container_stats = {}
                 # The key is the container name and not the Id
@@ -211,20 +248,20 @@ class Plugin(GlancesPlugin):
                 # Container Id
                 container_stats['Id'] = container.id
                 # Container Image
-                container_stats['Image'] = container.image.tags
+                container_stats['Image'] = image_tags
                 # Global stats (from attrs)
                 container_stats['Status'] = container.attrs['State']['Status']
                 container_stats['Command'] = container.attrs['Config']['Entrypoint']
                 # Standards stats
                 if container_stats['Status'] in ('running', 'paused'):
-                    container_stats['cpu'] = self.get_docker_cpu(container.id, self.thread_list[container.id].stats)
+                    if self.cgroups is not None:
+                        container_stats.update(self.get_cgroup_stats(container))
+                    else:
+                        container_stats.update(self.get_docker_stats(container.id))
                     container_stats['cpu_percent'] = container_stats['cpu'].get('total', None)
-                    container_stats['memory'] = self.get_docker_memory(container.id, self.thread_list[container.id].stats)
                     container_stats['memory_usage'] = container_stats['memory'].get('usage', None)
-                    container_stats['io'] = self.get_docker_io(container.id, self.thread_list[container.id].stats)
                     container_stats['io_r'] = container_stats['io'].get('ior', None)
                     container_stats['io_w'] = container_stats['io'].get('iow', None)
-                    container_stats['network'] = self.get_docker_network(container.id, self.thread_list[container.id].stats)
                     container_stats['network_rx'] = container_stats['network'].get('rx', None)
                     container_stats['network_tx'] = container_stats['network'].get('tx', None)
                 else:
@@ -251,6 +288,67 @@ class Plugin(GlancesPlugin):
 
         return self.stats
 
+    def get_docker_stats(self, container_id):
+        """Return the container cpu, memory, io and network stats.
+
+        The stats are only computed when new stats have been grabbed
+        for the container (the rates are computed between two grabs).
+        """
+        all_stats = self.stats_pool.get(container_id)
+        last = self.containers_stats.get(container_id)
+        if last is not None and last[0] is all_stats:
+            return last[1]
+        ret = {'cpu': self.get_docker_cpu(container_id, all_stats),
+               'memory': self.get_docker_memory(container_id, all_stats),
+               'io': self.get_docker_io(container_id, all_stats),
+               'network': self.get_docker_network(container_id, all_stats)}
+        self.containers_stats[container_id] = (all_stats, ret)
+        return ret
+
+    def get_cgroup_stats(self, container):
+        """Return the container cpu, memory, io and network stats.
+
+        The stats are read from the cgroups files of the container main
+        process (same keys as the ones computed from the Docker API).
+        """
+        ret = {'cpu': {'total': 0.0}, 'memory': {}, 'io': {}, 'network': {}}
+        pid = container.attrs['State'].get('Pid')
+        if not pid:
+            return ret
+        last = self.cgroups_stats.get(container.id)
+        if last is not None and last[0] != pid:
+            # Container restarted
+            self.cgroups.forget(last[0])
+            last = None
+        new = self.cgroups.read(pid)
+        if new is None:
+            self.cgroups_stats.pop(container.id, None)
+            return ret
+        self.cgroups_stats[container.id] = (pid, new)
+        if new['memory'] is not None:
+            ret['memory'] = new['memory']
+        if last is None:
+            return ret
+        old = last[1]
+        time_since_update = new['time'] - old['time']
+        if time_since_update <= 0:
+            return ret
+        if new['cpu'] is not None and old['cpu'] is not None:
+            ret['cpu']['total'] = max(0.0, (new['cpu'] - old['cpu']) / (time_since_update * 1e9) * 100)
+        if new['io'] is not None and old['io'] is not None:
+            ret['io'] = {'time_since_update': time_since_update,
+                         'ior': new['io']['read'] - old['io']['read'],
+                         'iow': new['io']['write'] - old['io']['write'],
+                         'cumulative_ior': new['io']['read'],
+                         'cumulative_iow': new['io']['write']}
+        if new['network'] is not None and old['network'] is not None:
+            ret['network'] = {'time_since_update': time_since_update,
+                              'rx': new['network']['rx'] - old['network']['rx'],
+                              'tx': new['network']['tx'] - old['network']['tx'],
+                              'cumulative_rx': new['network']['rx'],
+                              'cumulative_tx': new['network']['tx']}
+        return ret
+
     def get_docker_cpu(self, container_id, all_stats):
         """Return the container CPU usage.
 
@@ -275,6 +373,17 @@ class Plugin(GlancesPlugin):
             logger.debug("docker plugin - Cannot grab CPU usage for container {} ({})".format(container_id, e))
             logger.debug(all_stats)
         else:
+            # The stats may contain the previous CPU stats (grabbed by the
+            # Docker server just before), not the one shot stats (empty
+            # precpu_stats)
+            precpu = all_stats.get('precpu_stats') or {}
+            if precpu.get('system_cpu_usage'):
+                cpu_delta = float(cpu_new['total'] - precpu['cpu_usage']['total_usage'])
+                system_delta = float(cpu_new['system'] - precpu['system_cpu_usage'])
+                if cpu_delta > 0.0 and system_delta > 0.0:
+                    ret['total'] = (cpu_delta / system_delta) * float(cpu_new['nb_core']) * 100
+                return ret
+
             # Previous CPU stats stored in the cpu_old variable
             if not hasattr(self, 'cpu_old'):
                 # First call, we init the cpu_old variable
@@ -289,6 +398,9 @@ class Plugin(GlancesPlugin):
                     self.cpu_old[container_id] = cpu_new
                 except (IOError, UnboundLocalError):
                     pass
+            elif cpu_new['system'] == self.cpu_old[container_id]['system']:
+                # Same stats (not refreshed yet by the stats pool)
+                ret['total'] = self.cpu_old[container_id].get('percent', 0.0)
             else:
                 #
                 cpu_delta = float(cpu_new['total'] - self.cpu_old[container_id]['total'])
@@ -297,6 +409,7 @@ class Plugin(GlancesPlugin):
                     ret['total'] = (cpu_delta / system_delta) * float(cpu_new['nb_core']) * 100
 
                 # Save stats to compute next stats
+                cpu_new['percent'] = ret['total']
                 self.cpu_old[container_id] = cpu_new
 
         # Return the stats
@@ -349,7 +462,7 @@ class Plugin(GlancesPlugin):
             return network_new
 
         # Previous network interface stats are stored in the network_old variable
-        if not hasattr(self, 'inetcounters_old'):
+        if not hasattr(self, 'netcounters_old'):
             # First call, we init the network_old var
             self.netcounters_old = {}
             try:
@@ -626,57 +739,258 @@ class Plugin(GlancesPlugin):
             return 'CAREFUL'
 
 
-class ThreadDockerGrabber(threading.Thread):
+class DockerEventsWatcher(threading.Thread):
     """
-    Specific thread to grab docker stats.
+    Specific thread to maintain the containers list.
 
-    stats is a dict
+    The containers list (and the Docker version) is grabbed once, then
+    it is updated with the Docker events stream: a container is only
+    inspected again when an event is received for it.
     """
 
-    def __init__(self, container):
+    # Events which change the container attributes (status, name...)
+    refresh_actions = ('create', 'start', 'restart', 'die', 'stop', 'kill',
+                       'pause', 'unpause', 'rename', 'update', 'oom')
+
+    def __init__(self, client, all_tag=False):
         """Init the class.
 
-        container: instance of Docker-py Container
+        client: instance of Docker-py DockerClient
+        all_tag: True to list all the containers (not only the running ones)
         """
-        super(ThreadDockerGrabber, self).__init__()
+        super(DockerEventsWatcher, self).__init__()
+        # Do not block Glances on exit
+        self.daemon = True
         # Event needed to stop properly the thread
         self._stopper = threading.Event()
-        # The docker-py return stats as a stream
-        self._container = container
-        self._stats_stream = container.stats(decode=True)
-        # The class return the stats as a dict
-        self._stats = {}
-        logger.debug("docker plugin - Create thread for container {}".format(self._container.name))
+        self._client = client
+        self._all_tag = all_tag
+        self._events = None
+        self._lock = threading.Lock()
+        # Containers (key: container Id, value: (Container, image tags))
+        self._containers = {}
+        # Image tags (key: image Id)
+        self._images = {}
+        # Docker version (None if the Docker server is not available)
+        self.version = None
 
     def run(self):
-        """Grab the stats.
+        """Grab the containers list then follow the events stream.
 
         Infinite loop, should be stopped by calling the stop() method
         """
-        for i in self._stats_stream:
-            self._stats = i
-            time.sleep(0.1)
-            if self.stopped():
-                break
+        while not self.stopped():
+            try:
+                # Events are followed since the beginning of the full grab
+                since = int(time.time())
+                self.refresh()
+                self._events = self._client.events(decode=True,
+                                                   since=since,
+                                                   filters={'type': 'container'})
+                for event in self._events:
+                    if self.stopped():
+                        break
+                    self.on_event(event)
+            except Exception as e:
+                if self.stopped():
+                    break
+                logger.debug("docker plugin - Events stream error ({})".format(e))
+                self.version = None
+                # Try again later
+                self._stopper.wait(5)
+
+    def refresh(self):
+        """Grab the Docker version and the full containers list."""
+        self.version = self._client.version()
+        containers = {}
+        self._images = {}
+        for container in self._client.containers.list(all=self._all_tag) or []:
+            containers[container.id] = (container, self.image_tags(container))
+        with self._lock:
+            self._containers = containers
+        logger.debug("docker plugin - {} containers found".format(len(containers)))
+
+    def image_tags(self, container):
+        """Return the image tags of the container (cached by image Id)."""
+        image_id = container.attrs.get('Image')
+        if image_id not in self._images:
+            try:
+                self._images[image_id] = container.image.tags
+            except Exception as e:
+                logger.debug("docker plugin - Cannot get image of container {} ({})".format(container.id[:12], e))
+                return [container.attrs['Config']['Image']]
+        return self._images[image_id]
+
+    def on_event(self, event):
+        """Update the containers list with a Docker event."""
+        container_id = event.get('id')
+        action = event.get('Action', event.get('status', ''))
+        if container_id is None:
+            return
+        if action == 'destroy':
+            self.remove(container_id)
+        elif action in self.refresh_actions:
+            try:
+                container = self._client.containers.get(container_id)
+            except docker.errors.NotFound:
+                self.remove(container_id)
+                return
+            if not self._all_tag and container.status not in ('running', 'paused', 'restarting'):
+                self.remove(container_id)
+                return
+            with self._lock:
+                self._containers[container_id] = (container, self.image_tags(container))
+
+    def remove(self, container_id):
+        """Remove a container from the list."""
+        with self._lock:
+            self._containers.pop(container_id, None)
 
     @property
-    def stats(self):
-        """Stats getter."""
-        return self._stats
-
-    @stats.setter
-    def stats(self, value):
-        """Stats setter."""
-        self._stats = value
+    def containers(self):
+        """Return the current containers list [(Container, image tags), ...]."""
+        with self._lock:
+            return list(itervalues(self._containers))
 
     def stop(self, timeout=None):
         """Stop the thread."""
-        logger.debug("docker plugin - Close thread for container {}".format(self._container.name))
+        logger.debug("docker plugin - Stop the events watcher")
         self._stopper.set()
+        if self._events is not None:
+            try:
+                # Unblock the events stream
+                self._events.close()
+            except Exception:
+                pass
 
     def stopped(self):
         """Return True is the thread is stopped."""
-        return self._stopper.isSet()
+        return self._stopper.is_set()
+
+
+class DockerStatsPool(object):
+    """
+    Bounded pool of threads to grab the containers stats.
+
+    The stats of the containers are grabbed with one shot requests (not
+    a stream per container): each thread grabs the stats of the next
+    container to refresh. A container is refreshed at most once per
+    refresh time: with N containers, W workers and a request time T, the
+    real refresh period of a container is max(refresh, N * T / W).
+    """
+
+    def __init__(self, workers=4, refresh=2):
+        """Init the class.
+
+        workers: number of threads (number of simultaneous requests)
+        refresh: minimum time between two grabs of a container (in seconds)
+        """
+        self.refresh = refresh
+        # Event needed to stop properly the threads
+        self._stopper = threading.Event()
+        # Containers to refresh, heap of (next refresh time, container Id)
+        self._queue = []
+        # Current containers (key: container Id, value: Container)
+        self._containers = {}
+        # Last stats grabbed (key: container Id)
+        self._stats = {}
+        # Containers Id in the queue (a container is queued only once)
+        self._queued = set()
+        # Lock for the queue, containers, stats and queued Id; the threads
+        # sleep on the condition until the first container is due
+        self._lock = threading.Lock()
+        self._due = threading.Condition(self._lock)
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._run)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def set_containers(self, containers):
+        """Set the containers list (Docker-py Container instances)."""
+        current = dict((c.id, c) for c in containers)
+        with self._lock:
+            for container_id in current:
+                if container_id not in self._queued:
+                    # New container: grab its stats as soon as possible
+                    self._queued.add(container_id)
+                    heapq.heappush(self._queue, (0, container_id))
+                    self._due.notify()
+            self._containers = current
+            for container_id in [i for i in self._stats if i not in current]:
+                self._stats.pop(container_id, None)
+
+    def get(self, container_id):
+        """Return the last stats of the container (dict)."""
+        with self._lock:
+            return self._stats.get(container_id, {})
+
+    def _next(self):
+        """Wait for the next container to refresh.
+
+        Return the container (None if the pool is stopped).
+        """
+        with self._due:
+            while not self._stopper.is_set():
+                if not self._queue:
+                    self._due.wait()
+                    continue
+                due, container_id = self._queue[0]
+                container = self._containers.get(container_id)
+                if container is None:
+                    # The container does not exist anymore
+                    heapq.heappop(self._queue)
+                    self._queued.discard(container_id)
+                    continue
+                wait = due - time.time()
+                if wait > 0:
+                    # Too early: sleep until it is due (or a new container)
+                    self._due.wait(wait)
+                    continue
+                heapq.heappop(self._queue)
+                return container
+        return None
+
+    def _run(self):
+        while True:
+            container = self._next()
+            if container is None:
+                break
+            start = time.time()
+            try:
+                stats = self._grab(container)
+            except Exception as e:
+                logger.debug("docker plugin - Cannot grab stats of container {} ({})".format(container.id[:12], e))
+                stats = None
+            with self._due:
+                if container.id in self._containers:
+                    if stats is not None:
+                        self._stats[container.id] = stats
+                    heapq.heappush(self._queue, (start + self.refresh, container.id))
+                    self._due.notify()
+                else:
+                    self._queued.discard(container.id)
+
+    def _grab(self, container):
+        """Grab the stats of the container (one shot request).
+
+        With one_shot, the Docker server does not wait for a second CPU
+        sample (precpu_stats is empty): the CPU usage is computed from the
+        previous grab (see get_docker_cpu).
+        """
+        try:
+            return container.stats(stream=False, one_shot=True)
+        except TypeError:
+            # Docker-py < 4.4 (no one_shot parameter)
+            return container.stats(stream=False)
+
+    def stop(self):
+        """Stop the threads."""
+        logger.debug("docker plugin - Stop the stats pool")
+        self._stopper.set()
+        with self._due:
+            self._due.notify_all()
 
 
 def sort_stats(stats):
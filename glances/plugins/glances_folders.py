@@ -30,6 +30,9 @@ from glances.logger import logger
 class Plugin(GlancesPlugin):
     """Glances folder plugin."""
 
+    # Default refresh period (in seconds)
+    default_refresh = 30
+
     def __init__(self, args=None, config=None):
         """Init the plugin."""
         super(Plugin, self).__init__(args=args,
@@ -24,7 +24,7 @@ import operator
 from glances.compat import u, nativestr
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 # SNMP OID
 # The snmpd.conf needs to be edited.
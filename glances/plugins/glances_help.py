@@ -100,6 +100,8 @@ class Plugin(GlancesPlugin):
         self.view_data['show_hide_top_menu'] = msg_col2.format('5', 'Show/hide top menu (QL, CPU, MEM, SWAP and LOAD)')
         self.view_data['enable_disable_gpu'] = msg_col.format('G', 'Enable/disable gpu plugin')
         self.view_data['enable_disable_mean_gpu'] = msg_col2.format('6', 'Enable/disable mean gpu')
+        self.view_data['show_hide_selfstats'] = msg_col.format('S', 'Show/hide Glances self stats')
+        self.view_data['enable_disable_process_tree'] = msg_col2.format('V', 'Enable/disable processes tree')
         self.view_data['edit_pattern_filter'] = 'ENTER: Edit the process filter pattern'
 
     def get_view_data(self, args=None):
@@ -180,6 +182,9 @@ class Plugin(GlancesPlugin):
         ret.append(self.curse_add_line(self.view_data['enable_disable_irix']))
         ret.append(self.curse_add_line(self.view_data['quit']))
         ret.append(self.curse_new_line())
+        ret.append(self.curse_add_line(self.view_data['show_hide_selfstats']))
+        ret.append(self.curse_add_line(self.view_data['enable_disable_process_tree']))
+        ret.append(self.curse_new_line())
 
         ret.append(self.curse_new_line())
 
@@ -53,6 +53,9 @@ class Plugin(GlancesPlugin):
     stats is a dict
     """
 
+    # Default refresh period (in seconds)
+    default_refresh = 60
+
     def __init__(self, args=None):
         """Init the plugin."""
         super(Plugin, self).__init__(args=args)
@@ -60,7 +63,14 @@ class Plugin(GlancesPlugin):
         # We want to display the stat in the curse interface
         self.display_curse = True
 
-        # Get the public IP address once (not for each refresh)
+        # Public IP address (see init_deferred)
+        self.public_address = None
+
+    def init_deferred(self):
+        """Get the public IP address once (not for each refresh).
+
+        Online services are requested: done in background.
+        """
         if not self.is_disable():
             self.public_address = PublicIpAddress().get()
 
@@ -169,8 +179,11 @@ class PublicIpAddress(object):
         timer = Timer(self.timeout)
         ip = None
         while not timer.finished() and ip is None:
-            if q.qsize() > 0:
-                ip = q.get()
+            # Wait for the answers (without polling the queue)
+            try:
+                ip = q.get(timeout=max(self.timeout - timer.get(), 0.01))
+            except queue.Empty:
+                break
 
         return ip
 
@@ -22,7 +22,7 @@
 from glances.compat import iterkeys
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 # SNMP OID
 # Total RAM in machine: .1.3.6.1.4.1.2021.4.5.0
@@ -25,7 +25,7 @@ import operator
 from glances.timer import getTimeSinceLastUpdate
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 # SNMP OID
 # http://www.net-snmp.org/docs/mibs/interfaces.html
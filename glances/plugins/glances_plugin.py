@@ -26,12 +26,16 @@ I am your father...
 import re
 import json
 import copy
+import logging
+import threading
 from operator import itemgetter
+from time import time
 
-from glances.compat import iterkeys, itervalues, listkeys, map, mean, nativestr
+from glances.compat import iterkeys, itervalues, listkeys, map, nativestr
 from glances.actions import GlancesActions
 from glances.history import GlancesHistory
 from glances.logger import logger
+from glances.rules import GlancesRule
 from glances.events import glances_events
 from glances.thresholds import glances_thresholds
 
@@ -39,6 +43,11 @@ from glances.thresholds import glances_thresholds
 class GlancesPlugin(object):
     """Main class for Glances plugin."""
 
+    # Default refresh period (in seconds) of the stats
+    # None means that the stats are updated on every Glances refresh
+    # Can be overwritten with the refresh key of the plugin section
+    default_refresh = None
+
     def __init__(self,
                  args=None,
                  items_history_list=None,
@@ -57,6 +66,7 @@ class GlancesPlugin(object):
         - the reset method: to set your self.stats variable to {} or []
         - the update method: where your self.stats variable is set
         and optionnaly:
+        - the init_deferred method: slow part of the init (run in background)
         - the get_key method: set the key of the dict (only for list of dict)
         - the update_view method: only if you need to trick your output
         - the msg_curse: define the curse (UI) message (if display_curse is True)
@@ -86,12 +96,26 @@ class GlancesPlugin(object):
         # Init the limits dictionnary
         self._limits = dict()
 
+        # Compiled rules and aliases of the limits (see get_rule/has_alias)
+        # Cleared when the limits change
+        self._rules = dict()
+        self._aliases = dict()
+
         # Init the actions
         self.actions = GlancesActions(args=args)
 
         # Init the views
         self.views = dict()
 
+        # Stale is True if the last update did not end in time
+        # (set by the stats update scheduler)
+        self.stale = False
+
+        # Set when the deferred init is over (see init_deferred)
+        self._ready = threading.Event()
+        if self.__class__.init_deferred == GlancesPlugin.init_deferred:
+            self._ready.set()
+
         # Init the stats
         self.stats_init_value = stats_init_value
         self.stats = None
@@ -120,6 +144,31 @@ class GlancesPlugin(object):
         """Just log an event when Glances exit."""
         logger.debug("Stop the {} plugin".format(self.plugin_name))
 
+    def init_deferred(self):
+        """Slow part of the plugin init (network requests, connections...).
+
+        Run in a background thread by GlancesStats (see init_plugins), so
+        the plugin is registered and updated without waiting for it: the
+        update method should work before the end of this method.
+        This method should be overwrited by childs' classes.
+        """
+        pass
+
+    def run_init_deferred(self):
+        """Run the deferred init then flag the plugin as ready."""
+        try:
+            self.init_deferred()
+        finally:
+            self._ready.set()
+
+    def is_ready(self):
+        """Return True if the deferred init of the plugin is over."""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout=None):
+        """Wait for the end of the deferred init (return True if over)."""
+        return self._ready.wait(timeout)
+
     def get_key(self):
         """Return the key of the list."""
         return None
@@ -259,17 +308,35 @@ class GlancesPlugin(object):
         else:
             return None
 
+    def get_stats_history_query(self, item=None, window=None, resolution=60, percentiles=None):
+        """Return the stats history of the last window seconds (all the
+        history if window is None) downsampled in buckets of resolution
+        seconds (JSON format).
+
+        Each bucket gives the count, min, max, mean and the asked
+        percentiles of the values.
+        """
+        start = None if window is None else time() - window
+        s = self.stats_history.get_query(start=start,
+                                         resolution=resolution,
+                                         percentiles=percentiles)
+
+        if item is None:
+            return self._json_dumps(s)
+
+        try:
+            return self._json_dumps({item: s[item]})
+        except KeyError as e:
+            logger.error("Cannot get item history {} ({})".format(item, e))
+            return None
+
     def get_trend(self, item, nb=6):
         """Get the trend regarding to the last nb values.
 
         The trend is the diff between the mean of the last nb values
         and the current one.
         """
-        raw_history = self.get_raw_history(item=item, nb=nb)
-        if raw_history is None or len(raw_history) < nb:
-            return None
-        last_nb = [v[1] for v in raw_history]
-        return last_nb[-1] - mean(last_nb[:-1])
+        return self.stats_history.get_trend(item, nb=nb)
 
     @property
     def input_method(self):
@@ -489,6 +556,7 @@ class GlancesPlugin(object):
         """Load limits from the configuration file, if it exists."""
         # By default set the history length to 3 points per second during one day
         self._limits['history_size'] = 28800
+        self.reset_rules()
 
         if not hasattr(config, 'has_section'):
             return False
@@ -511,6 +579,16 @@ class GlancesPlugin(object):
 
         return True
 
+    def get_refresh(self):
+        """Return the refresh period (in seconds) of the plugin stats.
+
+        None if the plugin should be updated on every Glances refresh.
+        """
+        try:
+            return self._limits[self.plugin_name + '_refresh']
+        except KeyError:
+            return self.default_refresh
+
     @property
     def limits(self):
         """Return the limits object."""
@@ -520,6 +598,12 @@ class GlancesPlugin(object):
     def limits(self, input_limits):
         """Set the limits to input_limits."""
         self._limits = input_limits
+        self.reset_rules()
+
+    def reset_rules(self):
+        """Clear the compiled rules and aliases (limits have changed)."""
+        self._rules = dict()
+        self._aliases = dict()
 
     def get_stats_action(self):
         """Return stats for the action.
@@ -751,17 +835,36 @@ class GlancesPlugin(object):
         Example for diskio:
         hide=sda2,sda5,loop.*
         """
-        # TODO: possible optimisation: create a re.compile list
-        return not all(j is None for j in [re.match(i, value.lower()) for i in self.get_conf_value('hide', header=header)])
+        return self.get_rule('hide', header=header).match(value)
+
+    def get_rule(self, value, header=""):
+        """Return the compiled rule (GlancesRule) of the (header_) value
+        regexp list of the configuration file.
+
+        The rule is compiled once (until the limits change).
+        """
+        key = (value, header)
+        if key not in self._rules:
+            self._rules[key] = GlancesRule(self.get_conf_value(value, header=header),
+                                           lower=True)
+        return self._rules[key]
 
     def has_alias(self, header):
         """Return the alias name for the relative header or None if nonexist."""
+        try:
+            return self._aliases[header]
+        except KeyError:
+            pass
         try:
             # Force to lower case (issue #1126)
-            return self._limits[self.plugin_name + '_' + header.lower() + '_' + 'alias'][0]
+            ret = self._limits[self.plugin_name + '_' + header.lower() + '_' + 'alias'][0]
         except (KeyError, IndexError):
             # logger.debug("No alias found for {}".format(header))
-            return None
+            ret = None
+        if len(self._aliases) >= GlancesRule.cache_size:
+            self._aliases = dict()
+        self._aliases[header] = ret
+        return ret
 
     def msg_curse(self, args=None, max_width=None):
         """Return default string to display in the curse interface."""
@@ -918,13 +1021,19 @@ class GlancesPlugin(object):
         return wrapper
 
     def _log_result_decorator(fct):
-        """Log (DEBUG) the result of the function fct."""
+        """Log (DEBUG) the result of the function fct.
+
+        The result is only formatted if the DEBUG level is enabled.
+        Note: the update timings are stored by GlancesStats.update
+        (see glances.timings).
+        """
         def wrapper(*args, **kw):
             ret = fct(*args, **kw)
-            logger.debug("%s %s %s return %s" % (
-                args[0].__class__.__name__,
-                args[0].__class__.__module__[len('glances_'):],
-                fct.__name__, ret))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s %s return %s",
+                             args[0].__class__.__name__,
+                             args[0].__class__.__module__[len('glances_'):],
+                             fct.__name__, ret)
             return ret
         return wrapper
 
@@ -71,6 +71,13 @@ class Plugin(GlancesPlugin):
         # Call the father class
         super(Plugin, self).exit()
 
+    def get_refresh(self):
+        """Return None: the refresh key is the scan interval.
+
+        Scans are scheduled by the plugin itself (see update).
+        """
+        return None
+
     @GlancesPlugin._log_result_decorator
     def update(self):
         """Update the ports list."""
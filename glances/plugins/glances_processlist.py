@@ -26,7 +26,7 @@ from datetime import timedelta
 
 from glances.logger import logger
 from glances.globals import WINDOWS
-from glances.processes import glances_processes, sort_stats
+from glances.processes import glances_processes, top_stats
 from glances.plugins.glances_core import Plugin as CorePlugin
 from glances.plugins.glances_plugin import GlancesPlugin
 
@@ -102,11 +102,9 @@ class Plugin(GlancesPlugin):
         # Trying to display proc time
         self.tag_proc_time = True
 
-        # Call CorePlugin to get the core number (needed when not in IRIX mode / Solaris mode)
-        try:
-            self.nb_log_core = CorePlugin(args=self.args).update()["log"]
-        except Exception:
-            self.nb_log_core = 0
+        # Core number (needed when not in IRIX mode / Solaris mode)
+        # 0 until the end of the deferred init
+        self.nb_log_core = 0
 
         # Get the max values (dict)
         self.max_values = copy.deepcopy(glances_processes.max_values())
@@ -117,6 +115,13 @@ class Plugin(GlancesPlugin):
 
         # Note: 'glances_processes' is already init in the processes.py script
 
+    def init_deferred(self):
+        """Call CorePlugin to get the core number."""
+        try:
+            self.nb_log_core = CorePlugin(args=self.args).update()["log"]
+        except Exception:
+            self.nb_log_core = 0
+
     def get_key(self):
         """Return the key of the list."""
         return 'pid'
@@ -129,7 +134,8 @@ class Plugin(GlancesPlugin):
         if self.input_method == 'local':
             # Update stats using the standard system lib
             # Note: Update is done in the processcount plugin
-            # Just return the processes list
+            # Just return the processes list (not sorted, the consumers
+            # needing an order use get_sorted_stats)
             stats = glances_processes.getlist()
 
         elif self.input_method == 'snmp':
@@ -145,6 +151,26 @@ class Plugin(GlancesPlugin):
 
         return self.stats
 
+    def get_sorted_stats(self):
+        """Return the processes list sorted by the current sort key.
+
+        The sorted list is built on demand (only once per update for the
+        local processes, see GlancesProcesses.getlist).
+        """
+        if self.input_method == 'local' and self.stats is glances_processes.getlist():
+            return glances_processes.getlist(sortedby=glances_processes.sort_key)
+        return top_stats(self.stats, None,
+                         sortedby=glances_processes.sort_key,
+                         reverse=glances_processes.sort_reverse)
+
+    def get_export(self):
+        """Return the processes list to export (sorted)."""
+        return self.get_sorted_stats()
+
+    def get_stats(self):
+        """Return the processes list (sorted) in JSON format."""
+        return self._json_dumps(self.get_sorted_stats())
+
     def get_nice_alert(self, value):
         """Return the alert relative to the Nice configuration list"""
         value = str(value)
@@ -306,6 +332,13 @@ class Plugin(GlancesPlugin):
             msg = self.layout_header['iow'].format("?")
             ret.append(self.curse_add_line(msg, optional=True, additional=True))
 
+        # Processes tree: indentation and number of children
+        if 'tree_depth' in p:
+            msg = '  ' * p['tree_depth']
+            if p['tree_nprocs'] > 1:
+                msg += '+{} '.format(p['tree_nprocs'] - 1)
+            ret.append(self.curse_add_line(msg, splittable=True))
+
         # Command line
         # If no command line for the process is available, fallback to
         # the bare process name instead
@@ -423,7 +456,11 @@ class Plugin(GlancesPlugin):
         # Process list
         # Loop over processes (sorted by the sort key previously compute)
         first = True
-        for p in self.__sort_stats(process_sort_key):
+        if getattr(args, 'enable_process_tree', False) and glances_processes.gettree() is not None:
+            processes = self.__tree_stats(process_sort_key)
+        else:
+            processes = self.__sort_stats(process_sort_key)
+        for p in processes:
             ret.extend(self.get_process_curses_data(p, first, args))
             # End of extended stats
             first = False
@@ -628,9 +665,31 @@ class Plugin(GlancesPlugin):
         return ret
 
     def __sort_stats(self, sortedby=None):
-        """Return the stats (dict) sorted by (sortedby)."""
-        return sort_stats(self.stats, sortedby,
-                          reverse=glances_processes.sort_reverse)
+        """Return the displayed stats (dict) sorted by (sortedby).
+
+        Only the max_processes top processes are sorted.
+        """
+        return top_stats(self.stats, glances_processes.max_processes,
+                         sortedby=sortedby,
+                         reverse=glances_processes.sort_reverse)
+
+    def __tree_stats(self, sortedby=None):
+        """Return the displayed stats (dict) in the processes tree order.
+
+        The CPU, MEM and IO stats are the ones of the subtrees.
+        """
+        ret = []
+        for node, depth in glances_processes.gettree().walk(sortedby=sortedby,
+                                                            reverse=glances_processes.sort_reverse,
+                                                            nb=glances_processes.max_processes):
+            p = node.process.copy()
+            p['cpu_percent'], p['memory_percent'] = node.totals[0], node.totals[1]
+            if p.get('io_counters') is not None:
+                p['io_counters'] = [node.totals[3], node.totals[4], 0, 0, 1]
+            p['tree_depth'] = depth
+            p['tree_nprocs'] = node.nprocs
+            ret.append(p)
+        return ret
 
     def __max_pid_size(self):
         """Return the maximum PID size in number of char."""
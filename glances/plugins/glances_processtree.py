@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Process tree plugin."""
+
+from glances.processes import glances_processes
+from glances.plugins.glances_plugin import GlancesPlugin
+
+
+class Plugin(GlancesPlugin):
+    """Glances process tree plugin.
+
+    stats is a dict:
+    - processes: the stats of the subtrees with children (list of dict),
+      parents before children (the other processes are in the processlist)
+    - cgroups: the cgroups stats (list of dict)
+
+    The CPU, memory and IO stats of a subtree are the sums of the
+    process and of all its children. The tree is only maintained if it
+    is enabled (--enable-process-tree option or 'V' hotkey).
+    """
+
+    def __init__(self, args=None):
+        """Init the plugin."""
+        super(Plugin, self).__init__(args=args,
+                                     stats_init_value={})
+
+        # The tree is displayed by the processlist plugin
+        self.display_curse = False
+
+        if args is not None and getattr(args, 'enable_process_tree', False):
+            glances_processes.enable_tree()
+
+    @GlancesPlugin._check_decorator
+    @GlancesPlugin._log_result_decorator
+    def update(self):
+        """Update processes tree stats using the input method."""
+        # Init new stats
+        stats = self.get_init_value()
+
+        tree = glances_processes.gettree()
+        if self.input_method == 'local' and tree is not None:
+            # Update stats using the standard system lib
+            # Note: the tree is updated with the processes list
+            stats = {'processes': tree.get_tree(sortedby=glances_processes.sort_key,
+                                                reverse=glances_processes.sort_reverse,
+                                                parents_only=True),
+                     'cgroups': tree.get_cgroups()}
+
+        elif self.input_method == 'snmp':
+            # No SNMP grab for processes
+            pass
+
+        # Update the stats
+        self.stats = stats
+
+        return self.stats
+
+    def get_export(self):
+        """Return the stats object to export.
+
+        Same dict as the stats, the items are copied with a key field.
+        """
+        return {'processes': [dict(p, key='pid')
+                              for p in self.stats.get('processes', [])],
+                'cgroups': [dict(c, key='cgroup')
+                            for c in self.stats.get('cgroups', [])]}
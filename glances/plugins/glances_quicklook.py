@@ -24,7 +24,7 @@ from glances.logger import logger
 from glances.outputs.glances_bars import Bar
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 
 # Import plugin specific dependency
 try:
@@ -39,6 +39,9 @@ class Plugin(GlancesPlugin):
     stats is a dict (see pymdstat documentation)
     """
 
+    # Default refresh period (in seconds)
+    default_refresh = 30
+
     def __init__(self, args=None):
         """Init the plugin."""
         super(Plugin, self).__init__(args=args)
@@ -19,7 +19,7 @@
 
 """Sensors plugin."""
 
-import psutil
+from glances.datasource import psutil
 import warnings
 
 from glances.logger import logger
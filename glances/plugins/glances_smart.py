@@ -150,6 +150,9 @@ class Plugin(GlancesPlugin):
     stats is a list of dicts
     """
 
+    # Default refresh period (in seconds)
+    default_refresh = 60
+
     def __init__(self,
                  args=None,
                  stats_init_value=[]):
@@ -25,7 +25,7 @@ from glances.compat import nativestr, PY3
 from glances.logger import logger
 from glances.plugins.glances_plugin import GlancesPlugin
 
-import psutil
+from glances.datasource import psutil
 # Use the Wifi Python lib (https://pypi.python.org/pypi/wifi)
 # Linux-only
 try:
@@ -17,16 +17,20 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import heapq
 import operator
 import os
 
-from glances.compat import iteritems, itervalues, listitems, iterkeys
+from glances.compat import itervalues, listitems
 from glances.globals import BSD, LINUX, MACOS, SUNOS, WINDOWS
 from glances.timer import Timer, getTimeSinceLastUpdate
 from glances.filter import GlancesFilter
 from glances.logger import logger
+from glances.proctable import GlancesProcessTable
+from glances.processtree import GlancesProcessTree
 
-import psutil
+from glances import datasource
+from glances.datasource import psutil
 
 
 class GlancesProcesses(object):
@@ -35,24 +39,28 @@ class GlancesProcesses(object):
 
     def __init__(self, cache_timeout=60):
         """Init the class to collect stats about processes."""
-        # Add internals caches because psutil do not cache all the stats
-        # See: https://code.google.com/p/psutil/issues/detail?id=462
-        self.username_cache = {}
-        self.cmdline_cache = {}
-
-        # The internals caches will be cleaned each 'cache_timeout' seconds
+        # Processes table (internal state of the processes seen at the last
+        # update, dead processes are removed at each update)
+        # key = pid
+        # value = {'create_time': process creation time,
+        #          'static': {attributes read once per process (see
+        #                     static_attrs), because psutil do not cache
+        #                     them (see psutil issue #462)},
+        #          'io_old': [read_bytes_old, write_bytes_old] or None}
+        # A PID reused by a new process is detected with the creation time
+        self._table = {}
+
+        # The static attributes will be read again each 'cache_timeout'
+        # seconds (they can change, for example after an exec or a setuid)
         self.cache_timeout = cache_timeout
         self.cache_timer = Timer(self.cache_timeout)
 
-        # Init the io dict
-        # key = pid
-        # value = [ read_bytes_old, write_bytes_old ]
-        self.io_old = {}
-
         # Init stats
         self.auto_sort = True
         self._sort_key = 'cpu_percent'
-        self.processlist = []
+        self._proctable = GlancesProcessTable()
+        # Sorted processes lists (built on demand, see getlist)
+        self._sorted_lists = {}
         self.reset_processcount()
 
         # Tag to enable/disable the processes stats (to reduce the Glances CPU consumption)
@@ -62,6 +70,9 @@ class GlancesProcesses(object):
         # Extended stats for top process is enable by default
         self.disable_extended_tag = False
 
+        # Processes tree (subtrees and cgroups stats), disable by default
+        self.tree = None
+
         # Maximum number of processes showed in the UI (None if no limit)
         self._max_processes = None
 
@@ -71,6 +82,9 @@ class GlancesProcesses(object):
         # Whether or not to hide kernel threads
         self.no_kernel_threads = False
 
+        # Processes collector (None for psutil, see the collector property)
+        self._procfs = None
+
         # Store maximums values in a dict
         # Used in the UI to highlight the maximum value
         self._max_values_list = ('cpu_percent', 'memory_percent')
@@ -86,20 +100,30 @@ class GlancesProcesses(object):
                              'thread': 0,
                              'pid_max': None}
 
-    def update_processcount(self, plist):
-        """Update the global process count from the current processes list"""
-        # Update the maximum process ID (pid) number
-        self.processcount['pid_max'] = self.pid_max
-        # For each key in the processcount dict
-        # count the number of processes with the same status
-        for k in iterkeys(self.processcount):
-            self.processcount[k] = len(list(filter(lambda v: v['status'] is k,
-                                                   plist)))
-        # Compute thread
-        self.processcount['thread'] = sum(i['num_threads'] for i in plist
-                                          if i['num_threads'] is not None)
-        # Compute total
-        self.processcount['total'] = len(plist)
+    @property
+    def table_size(self):
+        """Return the number of processes in the internal table."""
+        return len(self._table)
+
+    @property
+    def collector(self):
+        """Get the processes collector name (psutil or procfs)."""
+        return 'psutil' if self._procfs is None else 'procfs'
+
+    @collector.setter
+    def collector(self, value):
+        """Set the processes collector.
+
+        procfs (Linux only) reads the /proc files directly, see
+        glances/procfs.py. psutil is used on the other systems.
+        """
+        self._procfs = None
+        if value == 'procfs':
+            from glances.procfs import get_collector
+            self._procfs = get_collector()
+        elif value != 'psutil':
+            logger.warning("Unknown processes collector {} (use psutil)".format(value))
+        logger.debug("Processes collector: {}".format(self.collector))
 
     def enable(self):
         """Enable process stats."""
@@ -119,6 +143,20 @@ class GlancesProcesses(object):
         """Disable extended process stats."""
         self.disable_extended_tag = True
 
+    def enable_tree(self):
+        """Enable the processes tree."""
+        if self.tree is None:
+            self.tree = GlancesProcessTree()
+            self.tree.update(self.getlist())
+
+    def disable_tree(self):
+        """Disable the processes tree."""
+        self.tree = None
+
+    def gettree(self):
+        """Get the processes tree (None if disabled)."""
+        return self.tree
+
     @property
     def pid_max(self):
         """
@@ -218,9 +256,15 @@ class GlancesProcesses(object):
             self._max_values[k] = 0.0
 
     def update(self):
-        """Update the processes stats."""
+        """Update the processes stats.
+
+        The processes stats are stored in a table (see
+        glances.proctable). The processes count and the max values are
+        computed on the table columns.
+        """
         # Reset the stats
-        self.processlist = []
+        self._proctable = GlancesProcessTable()
+        self._sorted_lists = {}
         self.reset_processcount()
 
         # Do not process if disable tag is set
@@ -232,135 +276,201 @@ class GlancesProcesses(object):
 
         # Grab standard stats
         #####################
-        standard_attrs = ['cmdline', 'cpu_percent', 'cpu_times', 'memory_info',
-                          'memory_percent', 'name', 'nice', 'pid', 'ppid',
-                          'status', 'username', 'status', 'num_threads']
+        # Attributes read at each update
+        standard_attrs = ['cpu_percent', 'cpu_times', 'memory_info',
+                          'memory_percent', 'nice', 'pid', 'ppid',
+                          'status', 'num_threads', 'create_time']
         # io_counters availability: Linux, BSD, Windows, AIX
         if not MACOS and not SUNOS:
             standard_attrs += ['io_counters']
+        # Attributes read only once per process (cached in the table)
+        static_attrs = ['cmdline', 'name', 'username']
         # gids availability: Unix
         if not WINDOWS:
-            standard_attrs += ['gids']
-
-        # and build the processes stats list (psutil>=5.3.0)
-        self.processlist = [p.info for p in psutil.process_iter(attrs=standard_attrs,
-                                                                ad_value=None)
-                            # OS-related processes filter
-                            if not (BSD and p.info['name'] == 'idle') and
-                            not (WINDOWS and p.info['name'] == 'System Idle Process') and
-                            not (MACOS and p.info['name'] == 'kernel_task') and
-                            # Kernel threads filter
-                            not (self.no_kernel_threads and LINUX and p.info['gids'].real == 0) and
-                            # User filter
-                            not (self._filter.is_filtered(p.info))]
-
-        # Sort the processes list by the current sort_key
-        self.processlist = sort_stats(self.processlist,
-                                      sortedby=self.sort_key,
-                                      reverse=True)
+            static_attrs += ['gids']
 
-        # Update the processcount
-        self.update_processcount(self.processlist)
-
-        # Loop over processes and add metadata
-        first = True
-        for proc in self.processlist:
-            # Get extended stats, only for top processes (see issue #403).
-            if first and not self.disable_extended_tag:
-                # - cpu_affinity (Linux, Windows, FreeBSD)
-                # - ionice (Linux and Windows > Vista)
-                # - num_ctx_switches (not available on Illumos/Solaris)
-                # - num_fds (Unix-like)
-                # - num_handles (Windows)
-                # - memory_maps (only swap, Linux)
-                #   https://www.cyberciti.biz/faq/linux-which-process-is-using-swap/
-                # - connections (TCP and UDP)
-                extended = {}
-                try:
-                    top_process = psutil.Process(proc['pid'])
-                    extended_stats = ['cpu_affinity', 'ionice',
-                                      'num_ctx_switches']
-                    if LINUX:
-                        # num_fds only avalable on Unix system (see issue #1351)
-                        extended_stats += ['num_fds']
-                    if WINDOWS:
-                        extended_stats += ['num_handles']
-
-                    # Get the extended stats
-                    extended = top_process.as_dict(attrs=extended_stats,
-                                                   ad_value=None)
-
-                    if LINUX:
-                        try:
-                            extended['memory_swap'] = sum([v.swap for v in top_process.memory_maps()])
-                        except psutil.NoSuchProcess:
-                            pass
-                        except (psutil.AccessDenied, NotImplementedError):
-                            # NotImplementedError: /proc/${PID}/smaps file doesn't exist
-                            # on kernel < 2.6.14 or CONFIG_MMU kernel configuration option
-                            # is not enabled (see psutil #533/glances #413).
-                            extended['memory_swap'] = None
-                    try:
-                        extended['tcp'] = len(top_process.connections(kind="tcp"))
-                        extended['udp'] = len(top_process.connections(kind="udp"))
-                    except (psutil.AccessDenied, psutil.NoSuchProcess):
-                        # Manage issue1283 (psutil.AccessDenied)
-                        extended['tcp'] = None
-                        extended['udp'] = None
-                except (psutil.NoSuchProcess, ValueError, AttributeError) as e:
-                    logger.error('Can not grab extended stats ({})'.format(e))
-                    extended['extended_stats'] = False
-                else:
-                    logger.debug('Grab extended stats for process {}'.format(proc['pid']))
-                    extended['extended_stats'] = True
-                proc.update(extended)
-            first = False
-            # /End of extended stats
+        # Read the static attributes again from time to time
+        refresh_static = self.cache_timer.finished()
+        if refresh_static:
+            self.cache_timer.reset()
+
+        # The /proc files are only read for the local system stats
+        if self._procfs is not None and datasource.get_source() is None:
+            process_iter = self._procfs.process_iter
+        else:
+            process_iter = psutil.process_iter
+
+        # and build the processes stats table (psutil>=5.3.0)
+        table = self._proctable
+        seen = set()
+        for p in process_iter(attrs=standard_attrs, ad_value=None):
+            info = p.info
+            seen.add(info['pid'])
+            entry = self._table.get(info['pid'])
+            if entry is None or entry['create_time'] != info['create_time']:
+                # New process (or PID reused by a new process)
+                entry = {'create_time': info['create_time'],
+                         'static': p.as_dict(attrs=static_attrs, ad_value=None),
+                         'io_old': None}
+                self._table[info['pid']] = entry
+            elif refresh_static:
+                entry['static'] = p.as_dict(attrs=static_attrs, ad_value=None)
+            info.update(entry['static'])
+            # OS-related processes filter
+            if (BSD and info['name'] == 'idle') or \
+               (WINDOWS and info['name'] == 'System Idle Process') or \
+               (MACOS and info['name'] == 'kernel_task'):
+                continue
+            # Kernel threads filter
+            if self.no_kernel_threads and LINUX and info['gids'].real == 0:
+                continue
+            # User filter
+            if self._filter.is_filtered(info):
+                continue
 
             # Time since last update (for disk_io rate computation)
-            proc['time_since_update'] = time_since_update
+            info['time_since_update'] = time_since_update
 
             # Process status (only keep the first char)
-            proc['status'] = str(proc['status'])[:1].upper()
+            status = info['status']
+            info['status'] = str(status)[:1].upper()
 
             # Process IO
             # procstat['io_counters'] is a list:
             # [read_bytes, write_bytes, read_bytes_old, write_bytes_old, io_tag]
             # If io_tag = 0 > Access denied or first time (display "?")
             # If io_tag = 1 > No access denied (display the IO rate)
-            if 'io_counters' in proc and proc['io_counters'] is not None:
-                io_new = [proc['io_counters'].read_bytes,
-                          proc['io_counters'].write_bytes]
+            if 'io_counters' in info and info['io_counters'] is not None:
+                io_new = [info['io_counters'].read_bytes,
+                          info['io_counters'].write_bytes]
                 # For IO rate computation
                 # Append saved IO r/w bytes
-                try:
-                    proc['io_counters'] = io_new + self.io_old[proc['pid']]
+                if entry['io_old'] is not None:
+                    info['io_counters'] = io_new + entry['io_old']
                     io_tag = 1
-                except KeyError:
-                    proc['io_counters'] = io_new + [0, 0]
+                else:
+                    info['io_counters'] = io_new + [0, 0]
                     io_tag = 0
                 # then save the IO r/w bytes
-                self.io_old[proc['pid']] = io_new
+                entry['io_old'] = io_new
             else:
-                proc['io_counters'] = [0, 0] + [0, 0]
+                info['io_counters'] = [0, 0] + [0, 0]
                 io_tag = 0
             # Append the IO tag (for display)
-            proc['io_counters'] += [io_tag]
+            info['io_counters'] += [io_tag]
+
+            # The full status is only used for the processes count
+            table.append(info, full_status=status)
+
+        # Remove the dead processes from the table
+        for pid in [pid for pid in self._table if pid not in seen]:
+            del self._table[pid]
+
+        # Update the processcount
+        for status in ('running', 'sleeping'):
+            self.processcount[status] = table.count('full_status', status)
+        self.processcount['thread'] = table.sum('num_threads')
+        self.processcount['total'] = len(table)
+        self.processcount['pid_max'] = self.pid_max
+        self.processcount['table_size'] = self.table_size
 
         # Compute the maximum value for keys in self._max_values_list: CPU, MEM
         # Usefull to highlight the processes with maximum values
         for k in self._max_values_list:
-            values_list = [i[k] for i in self.processlist if i[k] is not None]
-            if values_list != []:
-                self.set_max_values(k, max(values_list))
+            v = table.max(k)
+            if v is not None:
+                self.set_max_values(k, v)
+
+        # Get extended stats, only for the top process (see issue #403).
+        if len(table) and not self.disable_extended_tag:
+            top = table.argsort(sortedby=self.sort_key,
+                                reverse=self.sort_reverse, nb=1)[0]
+            table.set_extra(top, self.get_extended(table.column('pid')[top]))
+
+        # Update the processes tree
+        if self.tree is not None:
+            # The cgroups are only read for the local processes
+            self.tree.with_cgroups = LINUX and datasource.get_source() is None
+            self.tree.update(table.rows())
+
+    def get_extended(self, pid):
+        """Return the extended stats of the given process.
+
+        - cpu_affinity (Linux, Windows, FreeBSD)
+        - ionice (Linux and Windows > Vista)
+        - num_ctx_switches (not available on Illumos/Solaris)
+        - num_fds (Unix-like)
+        - num_handles (Windows)
+        - memory_maps (only swap, Linux)
+          https://www.cyberciti.biz/faq/linux-which-process-is-using-swap/
+        - connections (TCP and UDP)
+        """
+        extended = {}
+        try:
+            top_process = psutil.Process(int(pid))
+            extended_stats = ['cpu_affinity', 'ionice',
+                              'num_ctx_switches']
+            if LINUX:
+                # num_fds only avalable on Unix system (see issue #1351)
+                extended_stats += ['num_fds']
+            if WINDOWS:
+                extended_stats += ['num_handles']
+
+            # Get the extended stats
+            extended = top_process.as_dict(attrs=extended_stats,
+                                           ad_value=None)
+
+            if LINUX:
+                try:
+                    extended['memory_swap'] = sum([v.swap for v in top_process.memory_maps()])
+                except psutil.NoSuchProcess:
+                    pass
+                except (psutil.AccessDenied, NotImplementedError):
+                    # NotImplementedError: /proc/${PID}/smaps file doesn't exist
+                    # on kernel < 2.6.14 or CONFIG_MMU kernel configuration option
+                    # is not enabled (see psutil #533/glances #413).
+                    extended['memory_swap'] = None
+            try:
+                extended['tcp'] = len(top_process.connections(kind="tcp"))
+                extended['udp'] = len(top_process.connections(kind="udp"))
+            except (psutil.AccessDenied, psutil.NoSuchProcess):
+                # Manage issue1283 (psutil.AccessDenied)
+                extended['tcp'] = None
+                extended['udp'] = None
+        except (psutil.NoSuchProcess, ValueError, AttributeError) as e:
+            logger.error('Can not grab extended stats ({})'.format(e))
+            extended['extended_stats'] = False
+        else:
+            logger.debug('Grab extended stats for process {}'.format(pid))
+            extended['extended_stats'] = True
+        return extended
 
     def getcount(self):
         """Get the number of processes."""
         return self.processcount
 
+    @property
+    def processlist(self):
+        """Get the processes dicts (not sorted)."""
+        return self._proctable.rows()
+
     def getlist(self, sortedby=None):
-        """Get the processlist."""
-        return self.processlist
+        """Get the processlist.
+
+        The list is not sorted, unless sortedby is set. The sorted list
+        is only built once per update (and per sort key).
+        """
+        if sortedby is None:
+            return self.processlist
+        if sortedby not in self._sorted_lists:
+            rows = self._proctable.argsort(sortedby=sortedby,
+                                           reverse=sortedby not in ('name', 'username'))
+            self._sorted_lists[sortedby] = self._proctable.rows(rows)
+        return self._sorted_lists[sortedby]
+
+    def gettable(self):
+        """Get the processes stats table (see glances.proctable)."""
+        return self._proctable
 
     @property
     def sort_key(self):
@@ -408,6 +518,45 @@ def _sort_lambda(sortedby='cpu_percent',
     return ret
 
 
+def _sort_key(sortedby='cpu_percent',
+              sortedby_secondary='memory_percent'):
+    """Return the sort key function for the sortedby key."""
+    sort_lambda = _sort_lambda(sortedby=sortedby,
+                               sortedby_secondary=sortedby_secondary)
+    if sort_lambda is not None:
+        return sort_lambda
+    return lambda process: (weighted(process[sortedby]),
+                            weighted(process[sortedby_secondary]))
+
+
+def top_stats(stats,
+              nb,
+              sortedby='cpu_percent',
+              sortedby_secondary='memory_percent',
+              reverse=True):
+    """Return the nb first stats (dict) sorted by (sortedby).
+
+    Same result as sort_stats(stats, ...)[:nb] but the stats list is
+    neither sorted nor modified (heap selection).
+    Return all the stats (sorted) if nb is None.
+    """
+    if nb is None:
+        return sort_stats(list(stats), sortedby=sortedby,
+                          sortedby_secondary=sortedby_secondary,
+                          reverse=reverse)
+    if sortedby is None and sortedby_secondary is None:
+        return stats[:nb]
+    select = heapq.nlargest if reverse else heapq.nsmallest
+    try:
+        return select(nb, stats, key=_sort_key(sortedby=sortedby,
+                                               sortedby_secondary=sortedby_secondary))
+    except Exception:
+        # Use the sort_stats fallbacks
+        return sort_stats(list(stats), sortedby=sortedby,
+                          sortedby_secondary=sortedby_secondary,
+                          reverse=reverse)[:nb]
+
+
 def sort_stats(stats,
                sortedby='cpu_percent',
                sortedby_secondary='memory_percent',
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Processes tree.
+
+The processes are linked to their parent (ppid) and the CPU, memory and
+IO stats are rolled up to each subtree and to each cgroup.
+
+The tree is not rebuilt at each update: a process is identified by its
+PID generation (pid, create_time), so only the new, dead and reparented
+processes change the tree, and only the stats variations are propagated
+to the ancestors (and to the cgroup) of a process.
+"""
+
+import os
+
+from glances.compat import iteritems, itervalues, u
+from glances.globals import LINUX
+from glances.logger import logger
+
+# Rolled up stats (see ProcessNode.values)
+tree_fields = ['cpu_percent', 'memory_percent', 'memory_rss', 'io_read', 'io_write']
+
+
+def get_cgroup(pid, procfs_path='/proc'):
+    """Return the cgroup (path) of the given process, None if unknown.
+
+    The unified (v2) hierarchy is used if it exists, else the cpu
+    controller (v1) one.
+    """
+    try:
+        with open(os.path.join(procfs_path, str(pid), 'cgroup'), 'rb') as f:
+            lines = u(f.read()).splitlines()
+    except (IOError, OSError):
+        return None
+    ret = None
+    for line in lines:
+        # hierarchy-ID:controller-list:cgroup-path
+        fields = line.split(':', 2)
+        if len(fields) != 3:
+            continue
+        if fields[0] == '0' and fields[1] == '':
+            return fields[2]
+        if ret is None or 'cpu' in fields[1].split(','):
+            ret = fields[2]
+    return ret
+
+
+class ProcessNode(object):
+
+    """A process in the tree."""
+
+    __slots__ = ['key', 'pid', 'ppid', 'name', 'cgroup', 'parent',
+                 'children', 'values', 'totals', 'nprocs', 'process']
+
+    def __init__(self, key, cgroup=None):
+        # PID generation (pid, create_time)
+        self.key = key
+        self.pid = key[0]
+        self.ppid = None
+        self.name = None
+        self.cgroup = cgroup
+        self.parent = None
+        self.children = set()
+        # Process stats (tree_fields order)
+        self.values = [0] * len(tree_fields)
+        # Subtree stats (process and children)
+        self.totals = [0] * len(tree_fields)
+        # Number of processes in the subtree
+        self.nprocs = 1
+        # Last processes stats dict
+        self.process = None
+
+    def ancestors(self):
+        """Yield the parent, the parent of the parent..."""
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+
+class GlancesProcessTree(object):
+
+    """Processes tree, maintained across the updates."""
+
+    def __init__(self, with_cgroups=LINUX):
+        # Nodes by PID generation
+        self._nodes = {}
+        # Current node of each PID
+        self._by_pid = {}
+        # Nodes without parent
+        self._roots = set()
+        # Stats by cgroup {cgroup: {'nprocs': N, 'totals': [...]}}
+        self._cgroups = {}
+        # Read the cgroup of the new processes (local processes only)
+        self.with_cgroups = with_cgroups
+
+    def __len__(self):
+        return len(self._nodes)
+
+    @staticmethod
+    def process_values(p):
+        """Return the rolled up stats (tree_fields) of a processes stats dict.
+
+        io_read and io_write are the bytes read and written since the
+        last update.
+        """
+        memory_info = p.get('memory_info')
+        io = p.get('io_counters')
+        if io and io[4]:
+            io_read, io_write = io[0] - io[2], io[1] - io[3]
+        else:
+            io_read = io_write = 0
+        return [p.get('cpu_percent') or 0,
+                p.get('memory_percent') or 0,
+                memory_info[0] if memory_info else 0,
+                io_read,
+                io_write]
+
+    def update(self, processlist):
+        """Update the tree with the current processes stats (list of dict)."""
+        nodes = self._nodes
+        current = []
+        # Stats variations {node: delta}
+        deltas = {}
+        # New processes and stats variations
+        for p in processlist:
+            key = (p['pid'], p.get('create_time'))
+            node = nodes.get(key)
+            if node is None:
+                node = nodes[key] = ProcessNode(key,
+                                                get_cgroup(key[0]) if self.with_cgroups else None)
+                self._roots.add(node)
+                self._cgroup_stats(node.cgroup)['nprocs'] += 1
+                self._by_pid[key[0]] = node
+            node.ppid = p.get('ppid')
+            node.name = p.get('name')
+            node.process = p
+            current.append(node)
+            values = self.process_values(p)
+            if values != node.values:
+                delta = deltas[node] = [v - o for v, o in zip(values, node.values)]
+                node.values = values
+                cgroup = self._cgroups[node.cgroup]
+                cgroup['totals'] = [t + d for t, d in zip(cgroup['totals'], delta)]
+
+        # Dead processes (their children are linked again below)
+        if len(current) != len(nodes):
+            alive = set(node.key for node in current)
+            for key in [key for key in nodes if key not in alive]:
+                self._remove(nodes.pop(key))
+
+        # Parent of the processes
+        for node in current:
+            parent = self._by_pid.get(node.ppid)
+            if parent is node.parent:
+                continue
+            if parent is not None and (parent is node or
+                                       not self._can_be_parent(parent, node)):
+                parent = None
+            if parent is not node.parent:
+                self._detach(node)
+                self._attach(node, parent)
+
+        # Add the stats variations to the subtrees, one tree level at a
+        # time (an ancestor is updated once per level, not once per process)
+        while deltas:
+            parents = {}
+            for node, delta in iteritems(deltas):
+                node.totals = [t + d for t, d in zip(node.totals, delta)]
+                parent = node.parent
+                if parent is None:
+                    continue
+                if parent in parents:
+                    parents[parent] = [t + d for t, d in zip(parents[parent], delta)]
+                else:
+                    parents[parent] = delta
+            deltas = parents
+
+    def _can_be_parent(self, parent, node):
+        """Return True if parent can be the parent of node.
+
+        The parent PID can be reused by a process created after the child
+        and a node can not be the parent of one of its ancestors.
+        """
+        if parent.key[1] is not None and node.key[1] is not None and \
+           parent.key[1] > node.key[1]:
+            return False
+        return all(a is not node for a in parent.ancestors())
+
+    def _cgroup_stats(self, cgroup):
+        if cgroup not in self._cgroups:
+            self._cgroups[cgroup] = {'nprocs': 0, 'totals': [0] * len(tree_fields)}
+        return self._cgroups[cgroup]
+
+    def _add(self, node, delta, nprocs=0):
+        """Add the delta stats to the node subtree and to its ancestors."""
+        for n in [node] + list(node.ancestors()):
+            n.totals = [t + d for t, d in zip(n.totals, delta)]
+            n.nprocs += nprocs
+
+    def _detach(self, node):
+        """Remove the node subtree from its parent."""
+        parent = node.parent
+        if parent is None:
+            self._roots.discard(node)
+            return
+        self._add(parent, [-v for v in node.totals], -node.nprocs)
+        parent.children.discard(node)
+        node.parent = None
+
+    def _attach(self, node, parent):
+        """Add the node subtree to the parent (None for a root)."""
+        if parent is None:
+            self._roots.add(node)
+            return
+        node.parent = parent
+        parent.children.add(node)
+        self._add(parent, node.totals, node.nprocs)
+
+    def _remove(self, node):
+        """Remove a dead process from the tree."""
+        self._detach(node)
+        for child in node.children:
+            child.parent = None
+            self._roots.add(child)
+        node.children = set()
+        if self._by_pid.get(node.pid) is node:
+            del self._by_pid[node.pid]
+        cgroup = self._cgroups[node.cgroup]
+        cgroup['nprocs'] -= 1
+        cgroup['totals'] = [t - v for t, v in zip(cgroup['totals'], node.values)]
+        if not cgroup['nprocs']:
+            del self._cgroups[node.cgroup]
+
+    def node_stats(self, node, depth=0):
+        """Return the stats of a node (dict): the subtree stats."""
+        ret = {'pid': node.pid,
+               'ppid': node.ppid,
+               'name': node.name,
+               'depth': depth,
+               'nprocs': node.nprocs,
+               'children': len(node.children),
+               'cgroup': node.cgroup}
+        for k, v in zip(tree_fields, node.totals):
+            ret[k] = round(v, 2)
+        return ret
+
+    def _sort_key(self, sortedby):
+        """Return the function used to sort the children of a node."""
+        if sortedby in ('name', 'username'):
+            return lambda n: n.name or '~'
+        if sortedby == 'io_counters':
+            return lambda n: n.totals[3] + n.totals[4]
+        i = tree_fields.index(sortedby if sortedby in tree_fields else 'cpu_percent')
+        return lambda n: n.totals[i]
+
+    def walk(self, sortedby='cpu_percent', reverse=True, nb=None, parents_only=False):
+        """Yield (node, depth) for the nodes, parents before children.
+
+        The children are sorted by their subtree stats (sortedby).
+        Only the nb first nodes are returned if nb is set.
+        If parents_only is True, the processes without children are skipped.
+        """
+        key = self._sort_key(sortedby)
+        reverse = reverse and sortedby not in ('name', 'username')
+        stack = [(n, 0) for n in sorted(self._roots, key=key, reverse=not reverse)
+                 if n.children or not parents_only]
+        count = 0
+        while stack and (nb is None or count < nb):
+            node, depth = stack.pop()
+            yield node, depth
+            count += 1
+            if node.children:
+                stack.extend((n, depth + 1)
+                             for n in sorted(node.children, key=key, reverse=not reverse)
+                             if n.children or not parents_only)
+
+    def get_tree(self, sortedby='cpu_percent', reverse=True, nb=None, parents_only=False):
+        """Return the subtrees stats (list of dict), parents before children."""
+        return [self.node_stats(node, depth)
+                for node, depth in self.walk(sortedby, reverse, nb, parents_only)]
+
+    def get_cgroups(self):
+        """Return the cgroups stats (list of dict)."""
+        ret = []
+        for cgroup in sorted(c for c in self._cgroups if c is not None):
+            stats = {'cgroup': cgroup,
+                     'nprocs': self._cgroups[cgroup]['nprocs']}
+            for k, v in zip(tree_fields, self._cgroups[cgroup]['totals']):
+                stats[k] = round(v, 2)
+            ret.append(stats)
+        return ret
+
+    def check(self):
+        """Return True if the rolled up stats are the same as the ones
+        computed from scratch (for test purpose)."""
+        for node in itervalues(self._nodes):
+            totals = list(node.values)
+            nprocs = 1
+            stack = list(node.children)
+            while stack:
+                child = stack.pop()
+                totals = [t + v for t, v in zip(totals, child.values)]
+                nprocs += 1
+                stack.extend(child.children)
+            if nprocs != node.nprocs or \
+               any(abs(t - n) > 1e-6 for t, n in zip(totals, node.totals)):
+                logger.debug("Wrong subtree stats for process {}".format(node.pid))
+                return False
+        return True
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Linux processes collector reading the /proc files directly.
+
+GlancesProcfs.process_iter works like psutil.process_iter, but only the
+/proc files needed by the asked attributes are read (see attrs_files),
+without creating a psutil.Process object per process:
+- stat: pid, ppid, name, status, nice, num_threads, create_time,
+        cpu_times, cpu_percent, memory_percent
+- statm: memory_info
+- io: io_counters (not read again for the processes where it is denied)
+- status: username, gids
+- cmdline: cmdline (and name, if truncated in the stat file)
+"""
+
+import collections
+import errno
+import os
+import pwd
+from time import time
+
+import psutil
+
+from glances.compat import u
+from glances.globals import LINUX
+from glances.logger import logger
+
+# /proc files needed by each attribute
+attrs_files = {'pid': [],
+               'ppid': ['stat'],
+               'name': ['stat'],
+               'status': ['stat'],
+               'nice': ['stat'],
+               'num_threads': ['stat'],
+               'create_time': ['stat'],
+               'cpu_times': ['stat'],
+               'cpu_percent': ['stat'],
+               'memory_percent': ['stat'],
+               'memory_info': ['statm'],
+               'io_counters': ['io'],
+               'username': ['status'],
+               'gids': ['status'],
+               'cmdline': ['cmdline']}
+
+# Process status (see man 5 proc), same values as the psutil STATUS_* ones
+proc_statuses = {'R': 'running',
+                 'S': 'sleeping',
+                 'D': 'disk-sleep',
+                 'T': 'stopped',
+                 't': 'tracing-stop',
+                 'Z': 'zombie',
+                 'X': 'dead',
+                 'x': 'dead',
+                 'K': 'wake-kill',
+                 'W': 'waking',
+                 'I': 'idle',
+                 'P': 'parked'}
+
+# Same fields as the psutil ones (Linux)
+pcputimes = collections.namedtuple('pcputimes', ['user', 'system', 'children_user', 'children_system'])
+pmem = collections.namedtuple('pmem', ['rss', 'vms', 'shared', 'text', 'lib', 'data', 'dirty'])
+pio = collections.namedtuple('pio', ['read_count', 'write_count', 'read_bytes', 'write_bytes',
+                                     'read_chars', 'write_chars'])
+pgids = collections.namedtuple('pgids', ['real', 'effective', 'saved'])
+
+# Size of a read in a /proc file (stat, statm, io and status are smaller)
+read_size = 8192
+
+
+class NoSuchProcess(Exception):
+
+    """The process does not exist anymore."""
+
+    pass
+
+
+def read_file(path):
+    """Return the content (bytes) of a /proc file.
+
+    os.open/os.read are used instead of a Python file object (faster).
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, read_size)
+        if len(data) == read_size:
+            # Big file (cmdline)
+            chunks = [data]
+            while data:
+                data = os.read(fd, read_size)
+                chunks.append(data)
+            data = b''.join(chunks)
+        return data
+    finally:
+        os.close(fd)
+
+
+class GlancesProcfs(object):
+
+    """Processes collector using the Linux /proc files."""
+
+    def __init__(self, procfs_path='/proc'):
+        self.procfs_path = procfs_path
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.boot_time = psutil.boot_time()
+        # Internal state of the processes (for the cpu_percent and the
+        # io_counters access), removed when the process is dead
+        # key = pid
+        # value = {'create_time': process creation time,
+        #          'cpu': [cpu time, timestamp] of the last update,
+        #          'io_denied': True if the io file can not be read}
+        self._state = {}
+        # Username cache (key = uid)
+        self._usernames = {}
+        self.total_memory = None
+
+    @staticmethod
+    def is_available(procfs_path='/proc'):
+        """Return True if the /proc files can be used."""
+        return LINUX and os.path.exists(os.path.join(procfs_path, 'self', 'stat'))
+
+    def process_iter(self, attrs=None, ad_value=None):
+        """Yield a ProcfsProcess per running process (as psutil.process_iter).
+
+        The asked attributes are in the info dict of each process.
+        """
+        if attrs is None:
+            attrs = list(attrs_files)
+        self.total_memory = psutil.virtual_memory().total
+        seen = set()
+        for name in os.listdir(self.procfs_path):
+            if not name.isdigit():
+                continue
+            try:
+                p = ProcfsProcess(self, int(name))
+            except (NoSuchProcess, IOError, OSError, ValueError, IndexError):
+                continue
+            p.info = p.as_dict(attrs=attrs, ad_value=ad_value)
+            seen.add(p.pid)
+            yield p
+        # Remove the dead processes
+        for pid in [pid for pid in self._state if pid not in seen]:
+            del self._state[pid]
+
+    def state(self, pid, create_time):
+        """Return the internal state of a process."""
+        state = self._state.get(pid)
+        if state is None or state['create_time'] != create_time:
+            # New process (or PID reused by a new process)
+            state = self._state[pid] = {'create_time': create_time,
+                                        'cpu': None,
+                                        'io_denied': False}
+        return state
+
+    def username(self, uid):
+        """Return the user name of the given uid."""
+        if uid not in self._usernames:
+            try:
+                self._usernames[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._usernames[uid] = str(uid)
+        return self._usernames[uid]
+
+
+class ProcfsProcess(object):
+
+    """A process read from the /proc files.
+
+    Each file is only read once (cache), when an attribute needs it.
+    """
+
+    def __init__(self, collector, pid):
+        self.collector = collector
+        self.pid = pid
+        self.path = '{}/{}/'.format(collector.procfs_path, pid)
+        self.info = None
+        self._files = {}
+        # The stat file is always read (a process without stat is dead)
+        self._stat = self._parse_stat(self.read('stat'))
+        self._state = collector.state(pid, self._stat['create_time'])
+
+    def read(self, name):
+        """Return the content of the given /proc/<pid> file."""
+        if name not in self._files:
+            try:
+                self._files[name] = read_file(self.path + name)
+            except (IOError, OSError) as e:
+                if e.errno in (errno.ENOENT, errno.ESRCH):
+                    raise NoSuchProcess(self.pid)
+                raise
+        return self._files[name]
+
+    def _parse_stat(self, data):
+        # The name (comm) is between parenthesis and can contain spaces
+        left = data.find(b'(')
+        right = data.rfind(b')')
+        fields = data[right + 2:].split()
+        return {'name': u(data[left + 1:right]),
+                'status': proc_statuses.get(fields[0].decode(), '?'),
+                'ppid': int(fields[1]),
+                'utime': float(fields[11]) / self.collector.clock_ticks,
+                'stime': float(fields[12]) / self.collector.clock_ticks,
+                'cutime': float(fields[13]) / self.collector.clock_ticks,
+                'cstime': float(fields[14]) / self.collector.clock_ticks,
+                'nice': int(fields[16]),
+                'num_threads': int(fields[17]),
+                'create_time': self.collector.boot_time + float(fields[19]) / self.collector.clock_ticks,
+                'rss': int(fields[21]) * self.collector.page_size}
+
+    def as_dict(self, attrs=None, ad_value=None):
+        """Return the given attributes (as psutil.Process.as_dict)."""
+        if attrs is None:
+            attrs = list(attrs_files)
+        ret = {}
+        for attr in attrs:
+            try:
+                ret[attr] = getattr(self, '_get_' + attr)()
+            except (NoSuchProcess, IOError, OSError, ValueError, IndexError, AttributeError):
+                # Access denied, process ended (or unknown attribute)
+                ret[attr] = ad_value
+        return ret
+
+    def _get_pid(self):
+        return self.pid
+
+    def _get_ppid(self):
+        return self._stat['ppid']
+
+    def _get_name(self):
+        name = self._stat['name']
+        if len(name) >= 15:
+            # Name truncated by the kernel: use the command line
+            cmdline = self._get_cmdline()
+            if cmdline:
+                exe = os.path.basename(cmdline[0])
+                if exe.startswith(name):
+                    name = exe
+        return name
+
+    def _get_status(self):
+        return self._stat['status']
+
+    def _get_nice(self):
+        return self._stat['nice']
+
+    def _get_num_threads(self):
+        return self._stat['num_threads']
+
+    def _get_create_time(self):
+        return self._stat['create_time']
+
+    def _get_cpu_times(self):
+        return pcputimes(self._stat['utime'], self._stat['stime'],
+                         self._stat['cutime'], self._stat['cstime'])
+
+    def _get_cpu_percent(self):
+        """Same as psutil.Process.cpu_percent(interval=None)."""
+        cpu = [self._stat['utime'] + self._stat['stime'], time()]
+        last, self._state['cpu'] = self._state['cpu'], cpu
+        if last is None or cpu[1] <= last[1]:
+            return 0.0
+        return round((cpu[0] - last[0]) / (cpu[1] - last[1]) * 100, 1)
+
+    def _get_memory_percent(self):
+        return self._stat['rss'] / float(self.collector.total_memory) * 100
+
+    def _get_memory_info(self):
+        # size resident shared text lib data dt (in pages)
+        statm = [int(i) * self.collector.page_size for i in self.read('statm').split()[:7]]
+        return pmem(statm[1], statm[0], *statm[2:])
+
+    def _get_io_counters(self):
+        if self._state['io_denied']:
+            raise IOError(errno.EACCES, 'io file access denied')
+        try:
+            data = self.read('io')
+        except (IOError, OSError) as e:
+            if e.errno in (errno.EACCES, errno.EPERM):
+                # Do not try again for this process
+                self._state['io_denied'] = True
+            raise
+        # rchar, wchar, syscr, syscw, read_bytes, write_bytes, ...
+        io = [int(i) for i in data.split()[1:12:2]]
+        return pio(io[2], io[3], io[4], io[5], io[0], io[1])
+
+    def _status_ids(self, key):
+        for line in self.read('status').splitlines():
+            if line.startswith(key):
+                return [int(i) for i in line.split()[1:4]]
+        raise ValueError('{} not found'.format(key))
+
+    def _get_username(self):
+        return self.collector.username(self._status_ids(b'Uid:')[0])
+
+    def _get_gids(self):
+        return pgids(*self._status_ids(b'Gid:'))
+
+    def _get_cmdline(self):
+        """Same as psutil.Process.cmdline."""
+        data = u(self.read('cmdline'))
+        if not data:
+            return []
+        sep = '\x00' if data.endswith('\x00') else ' '
+        if data.endswith(sep):
+            data = data[:-1]
+        cmdline = data.split(sep)
+        if sep == '\x00' and len(cmdline) == 1 and ' ' in data:
+            # Some processes change their cmdline (with spaces)
+            cmdline = data.split(' ')
+        return cmdline
+
+
+def get_collector():
+    """Return a new GlancesProcfs collector (or None if not available)."""
+    if not GlancesProcfs.is_available():
+        logger.warning("The /proc files can not be used, psutil is used to grab the processes stats")
+        return None
+    return GlancesProcfs()
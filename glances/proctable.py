@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Processes table.
+
+The processes stats are stored as dicts (one per process, as given by
+the processes collector): the processlist plugin and the API use the
+whole list at each update. The columns needed by the sort and the
+aggregates (count, sum, max) are extracted from the dicts when they are
+asked (one pass per column, cached until the next update):
+- numeric stats are NumPy arrays (Python lists if NumPy is not installed)
+  so the sort and the aggregates are vectorized
+- io_counters ([read, write, read_old, write_old, tag]) is split in five
+  integer columns
+- cpu_times gives the cpu_time column (user + system)
+- other stats are Python lists
+
+The columns are a copy of the dicts values: they do not reduce the
+memory used by the processes stats. The processes dicts are not copied
+(see rows).
+"""
+
+from glances.logger import logger
+
+# NumPy is optional: used for the vectorized operations
+try:
+    import numpy as np
+except ImportError:
+    logger.debug("NumPy not found, processes table operations are done without it")
+    np = None
+
+# Typed columns
+int_columns = ['pid', 'ppid', 'nice', 'num_threads']
+float_columns = ['cpu_percent', 'memory_percent', 'create_time', 'time_since_update']
+io_columns = ['io_read', 'io_write', 'io_read_old', 'io_write_old', 'io_tag']
+
+
+class GlancesProcessTable(object):
+
+    """Processes table (see the module docstring)."""
+
+    def __init__(self):
+        # Processes stats (dicts)
+        self._rows = []
+        # Hidden columns (not in the processes dicts)
+        self._hidden = {}
+        # Columns (built on demand)
+        self._columns = {}
+        # For the int columns: positions of the None values
+        self._none = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def append(self, stats, **hidden):
+        """Add a process (stats dict) to the table.
+
+        hidden values are stored in columns which are not in the
+        processes dicts.
+        """
+        self._rows.append(stats)
+        for k in hidden:
+            self._hidden.setdefault(k, []).append(hidden[k])
+
+    def __contains__(self, name):
+        if name in io_columns:
+            name = 'io_counters'
+        elif name == 'cpu_time':
+            name = 'cpu_times'
+        return name in self._hidden or (len(self) > 0 and name in self._rows[0])
+
+    def column(self, name):
+        """Return the values of a column (NumPy array for numeric columns)."""
+        if name not in self._columns:
+            self._columns[name] = self._build(name)
+        return self._columns[name]
+
+    def _build(self, name):
+        if name in self._hidden:
+            return self._hidden[name]
+        if name in io_columns:
+            i = io_columns.index(name)
+            values = [p['io_counters'][i] if p.get('io_counters') else 0 for p in self._rows]
+        elif name == 'cpu_time':
+            values = [None if p.get('cpu_times') is None else p['cpu_times'][0] + p['cpu_times'][1]
+                      for p in self._rows]
+        else:
+            values = [p.get(name) for p in self._rows]
+        if np is None:
+            return values
+        if name in int_columns or name in io_columns:
+            none = [i for i, v in enumerate(values) if v is None]
+            if none:
+                self._none[name] = np.array(none, dtype=np.int64)
+                values = [0 if v is None else v for v in values]
+            return np.array(values, dtype=np.int64)
+        if name in float_columns or name == 'cpu_time':
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        return values
+
+    def set_extra(self, row, stats):
+        """Add some stats to the process of the given row."""
+        self._rows[row].update(stats)
+
+    def _numeric(self, name):
+        """Return the column as a float array, -inf for None (or None)."""
+        if np is None or name not in self:
+            return None
+        values = self.column(name)
+        if not isinstance(values, np.ndarray):
+            return None
+        ret = values.astype(np.float64)
+        if name in self._none:
+            ret[self._none[name]] = -np.inf
+        ret[np.isnan(ret)] = -np.inf
+        return ret
+
+    def count(self, name, value):
+        """Return the number of processes with the given column value."""
+        if name not in self:
+            return 0
+        return self.column(name).count(value)
+
+    def sum(self, name):
+        """Return the sum of a numeric column (None values are ignored)."""
+        if name not in self:
+            return 0
+        values = self.column(name)
+        if np is not None and isinstance(values, np.ndarray):
+            if values.dtype == np.int64:
+                # None values are stored as 0
+                return values.sum().item()
+            return np.nansum(values).item()
+        return sum(v for v in values if v is not None)
+
+    def max(self, name):
+        """Return the max of a numeric column (None if no value)."""
+        values = self._numeric(name)
+        if values is not None:
+            values = values[np.isfinite(values)]
+            if not values.size:
+                return None
+            ret = values.max().item()
+            return int(ret) if self.column(name).dtype == np.int64 else ret
+        if name not in self:
+            return None
+        values = [v for v in self.column(name) if v is not None]
+        return max(values) if values else None
+
+    def argsort(self, sortedby='cpu_percent',
+                sortedby_secondary='memory_percent',
+                reverse=True, nb=None):
+        """Return the rows sorted by (sortedby) (nb first ones if nb is set).
+
+        Same order as glances.processes.sort_stats on the processes dicts.
+        """
+        keys = None
+        if sortedby == 'io_counters' and 'io_read' in self:
+            if np is not None:
+                keys = [self._numeric('io_read') - self._numeric('io_read_old') +
+                        self._numeric('io_write') - self._numeric('io_write_old')]
+        elif sortedby == 'cpu_times' and 'cpu_time' in self:
+            keys = [self._numeric('cpu_time')]
+            if keys[0] is not None and np.isneginf(keys[0]).any():
+                # Same fallback as sort_stats
+                sortedby = 'cpu_percent'
+                keys = None
+        if keys is None and sortedby not in ('io_counters', 'cpu_times'):
+            keys = [self._numeric(sortedby), self._numeric(sortedby_secondary)]
+        if keys is None or any(k is None for k in keys):
+            ret = self._argsort_python(sortedby, sortedby_secondary, reverse)
+        else:
+            # Stable sort (np.lexsort uses the last key first)
+            if reverse:
+                keys = [-k for k in keys]
+            ret = np.lexsort(keys[::-1]).tolist()
+        return ret if nb is None else ret[:nb]
+
+    def _argsort_python(self, sortedby, sortedby_secondary, reverse):
+        """Python sort (non numeric columns or no NumPy)."""
+        rows = range(len(self))
+
+        def weighted(value):
+            return -float('inf') if value is None else value
+
+        def column(name):
+            return self.tolist(name) if name in self else [None] * len(self)
+
+        if sortedby == 'io_counters' and 'io_read' in self:
+            r, w, r_old, w_old = [column(c) for c in io_columns[:4]]
+            return sorted(rows, key=lambda i: r[i] - r_old[i] + w[i] - w_old[i],
+                          reverse=reverse)
+        if sortedby == 'cpu_times' and 'cpu_time' in self:
+            t = column('cpu_time')
+            try:
+                return sorted(rows, key=lambda i: t[i] + 0, reverse=reverse)
+            except TypeError:
+                sortedby = 'cpu_percent'
+        if sortedby not in self:
+            # Fallback to name
+            name = column('name')
+            return sorted(rows, key=lambda i: name[i] if name[i] is not None else '~')
+        first, second = column(sortedby), column(sortedby_secondary)
+        try:
+            return sorted(rows, key=lambda i: (weighted(first[i]), weighted(second[i])),
+                          reverse=reverse)
+        except TypeError:
+            # Fallback to name
+            name = column('name')
+            return sorted(rows, key=lambda i: name[i] if name[i] is not None else '~')
+
+    def tolist(self, name):
+        """Return a column as a list of Python values (None restored)."""
+        values = self.column(name)
+        if np is None or not isinstance(values, np.ndarray):
+            return list(values)
+        ret = values.tolist()
+        if name in self._none:
+            for i in self._none[name].tolist():
+                ret[i] = None
+        elif values.dtype == np.float64:
+            for i in np.flatnonzero(np.isnan(values)).tolist():
+                ret[i] = None
+        return ret
+
+    def rows(self, rows=None):
+        """Return the processes dicts (of the given rows, default is all)."""
+        if rows is None:
+            return self._rows
+        return [self._rows[i] for i in rows]
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Static registry of the Glances modules (plugins and export modules).
+
+The modules are described here (name, needed Python libs, capabilities)
+so they can be listed, and the disabled or unavailable ones skipped,
+without importing them.
+A new plugins/glances_<name>.py or exports/glances_<name>.py module
+should be added to this registry.
+"""
+
+import collections
+import sys
+
+from glances.compat import PY3
+
+
+def is_installed(lib):
+    """Return True if the Python lib can be imported (without importing it)."""
+    if lib in sys.modules:
+        return True
+    try:
+        if PY3:
+            from importlib.util import find_spec
+            return find_spec(lib) is not None
+        import imp
+        imp.find_module(lib)
+        return True
+    except (ImportError, ValueError):
+        return False
+
+
+class GlancesModule(object):
+
+    """A plugin or an export module of the registry."""
+
+    def __init__(self, name, requires=None, capabilities=None):
+        # Module name (glances_<name>.py)
+        self.name = name
+        self.module = 'glances_' + name
+        # Python libs needed by the module: it is not imported if one of
+        # them is not installed
+        self.requires = requires or []
+        # Capabilities:
+        # - config: the constructor needs the configuration
+        self.capabilities = capabilities or []
+        self._missing = None
+
+    def __repr__(self):
+        return 'GlancesModule({})'.format(self.name)
+
+    def missing(self):
+        """Return the list of the needed Python libs which are not installed."""
+        if self._missing is None:
+            self._missing = [lib for lib in self.requires if not is_installed(lib)]
+        return self._missing
+
+    def is_available(self):
+        """Return True if all the needed Python libs are installed."""
+        return not self.missing()
+
+
+def _registry(modules):
+    return collections.OrderedDict((m.name, m) for m in modules)
+
+
+# Plugins (glances/plugins/glances_<name>.py)
+plugins = _registry([
+    GlancesModule('alert'),
+    GlancesModule('amps', capabilities=['config']),
+    GlancesModule('batpercent'),
+    GlancesModule('cloud', requires=['urllib3']),
+    GlancesModule('core'),
+    GlancesModule('cpu'),
+    GlancesModule('diskio'),
+    GlancesModule('docker', requires=['docker']),
+    GlancesModule('folders', capabilities=['config']),
+    GlancesModule('fs'),
+    GlancesModule('gpu', requires=['pynvml']),
+    GlancesModule('hddtemp'),
+    GlancesModule('help', capabilities=['config']),
+    GlancesModule('ip', requires=['netifaces']),
+    GlancesModule('irq'),
+    GlancesModule('load'),
+    GlancesModule('mem'),
+    GlancesModule('memswap'),
+    GlancesModule('network'),
+    GlancesModule('now'),
+    GlancesModule('percpu'),
+    GlancesModule('ports', capabilities=['config']),
+    GlancesModule('processcount'),
+    GlancesModule('processlist'),
+    GlancesModule('processtree'),
+    GlancesModule('psutilversion'),
+    GlancesModule('quicklook'),
+    GlancesModule('raid', requires=['pymdstat']),
+    GlancesModule('sensors'),
+    GlancesModule('smart', requires=['pySMART']),
+    GlancesModule('system'),
+    GlancesModule('uptime'),
+    GlancesModule('wifi', requires=['wifi']),
+])
+
+# Export modules (glances/exports/glances_<name>.py)
+exports = _registry([
+    GlancesModule('cassandra', requires=['cassandra']),
+    GlancesModule('couchdb', requires=['couchdb']),
+    GlancesModule('csv'),
+    GlancesModule('elasticsearch', requires=['elasticsearch']),
+    GlancesModule('graph', requires=['pygal']),
+    GlancesModule('http', requires=['urllib3']),
+    GlancesModule('influxdb', requires=['influxdb']),
+    GlancesModule('json'),
+    GlancesModule('kafka', requires=['kafka']),
+    GlancesModule('mqtt', requires=['paho', 'requests']),
+    GlancesModule('opentsdb', requires=['potsdb']),
+    GlancesModule('prometheus', requires=['prometheus_client']),
+    GlancesModule('rabbitmq', requires=['pika']),
+    GlancesModule('restful', requires=['requests']),
+    GlancesModule('riemann', requires=['bernhard']),
+    GlancesModule('statsd', requires=['statsd']),
+    GlancesModule('zeromq', requires=['zmq']),
+])
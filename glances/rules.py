@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Compiled rules (lists of regular expressions) of the configuration file."""
+
+import re
+
+from glances.logger import logger
+
+# A back reference can not be combined with the other patterns
+# (the groups numbers change)
+_backref = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class GlancesRule(object):
+
+    """A list of regular expressions compiled once.
+
+    The patterns are combined in a single alternation (one regex run per
+    item) and the verdict is cached per item (the cache is cleared when
+    it is full).
+
+    mode is 'match' (pattern at the beginning of the item) or 'search'
+    (pattern anywhere in the item).
+    """
+
+    # Maximum number of cached verdicts
+    cache_size = 4096
+
+    def __init__(self, patterns, mode='match', lower=False):
+        self.patterns = list(patterns or [])
+        self.mode = mode
+        # Force the items to lower case before matching (see is_hide)
+        self.lower = lower
+        self._cache = {}
+        self._regexes = self._compile(self.patterns)
+
+    def _compile(self, patterns):
+        """Return the list of compiled regex (only one if possible)."""
+        compiled = []
+        for p in patterns:
+            try:
+                compiled.append(re.compile(p))
+            except (re.error, TypeError) as e:
+                logger.error("Invalid regular expression {} ({})".format(p, e))
+        if len(compiled) > 1 and not any(_backref.search(r.pattern) for r in compiled):
+            try:
+                return [re.compile('|'.join('(?:{})'.format(r.pattern) for r in compiled))]
+            except re.error:
+                # For example, global flags not at the start of a pattern
+                pass
+        return compiled
+
+    def __bool__(self):
+        return len(self._regexes) > 0
+
+    __nonzero__ = __bool__
+
+    def _check(self, value):
+        if self.lower:
+            value = value.lower()
+        if self.mode == 'search':
+            return any(r.search(value) is not None for r in self._regexes)
+        return any(r.match(value) is not None for r in self._regexes)
+
+    def match(self, value):
+        """Return True if the value matches one of the patterns."""
+        if not self._regexes:
+            return False
+        try:
+            return self._cache[value]
+        except KeyError:
+            pass
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        ret = self._cache[value] = self._check(value)
+        return ret
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Plugins update scheduler."""
+
+import threading
+from time import time
+
+from glances.compat import queue
+from glances.logger import logger
+
+
+def update_order(names, dependencies):
+    """Return the names list sorted according to the dependencies.
+
+    dependencies is a dict: {name: [names to update before name]}
+    Dependencies not in the names list are ignored.
+    """
+    ret = []
+    visited = set()
+
+    def visit(name):
+        if name in visited:
+            return
+        visited.add(name)
+        for d in dependencies.get(name, []):
+            if d in names:
+                visit(d)
+        ret.append(name)
+
+    for n in names:
+        visit(n)
+    return ret
+
+
+class GlancesScheduler(object):
+
+    """This class runs the plugins update on a bounded pool of threads.
+
+    Each job is a (name, function) couple. A job is only started when all
+    the jobs it depends on are terminated. If a job did not end timeout
+    seconds after a worker started it, it is flagged as stale: its
+    dependents are not run and it will not be started again until its
+    current run ends. Its worker is replaced (and ends with the job), so
+    the jobs which hang do not use up the pool.
+    """
+
+    def __init__(self, workers=4, timeout=5):
+        # Number of threads in the pool (0 means serial update)
+        self.workers = workers
+        # Maximum time (in seconds) to wait for a job
+        self.timeout = timeout
+
+        self._jobs = queue.Queue()
+        self._threads = []
+        # Jobs currently running (or waiting for a worker)
+        self._running = set()
+        # Workers of the running jobs {name: thread}
+        self._current = {}
+        self._lock = threading.Lock()
+
+    def _start(self):
+        """Start the workers (only once)."""
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def _worker(self):
+        """Worker loop: run jobs until a None job is received.
+
+        The (name, None) result is given when the job starts, the
+        (name, True or False) result when it ends.
+        """
+        me = threading.current_thread()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            name, fct, results = job
+            with self._lock:
+                self._current[name] = me
+            results.put((name, None))
+            ret = self._run_job(name, fct)
+            with self._lock:
+                self._running.discard(name)
+                self._current.pop(name, None)
+                replaced = me not in self._threads
+            results.put((name, ret))
+            if replaced:
+                # The job was too long: another worker took this place
+                break
+
+    def _replace(self, name):
+        """Replace the worker running the job name (too long)."""
+        with self._lock:
+            worker = self._current.get(name)
+            if worker in self._threads:
+                self._threads.remove(worker)
+        self._start()
+
+    def _run_job(self, name, fct):
+        """Run the job and return True if it ends without error."""
+        try:
+            fct()
+        except Exception as e:
+            logger.error("Error while updating the {} plugin ({})".format(name, e))
+            return False
+        return True
+
+    def run(self, jobs, dependencies=None):
+        """Run the jobs and wait for them (or for their timeout).
+
+        jobs is a dict: {name: function}
+        dependencies is a dict: {name: [names to run before name]}
+
+        Return the set of stale job names.
+        """
+        dependencies = dependencies or {}
+        order = update_order(list(jobs), dependencies)
+
+        if self.workers <= 0:
+            # Serial mode: no thread, no timeout
+            return set(n for n in order if not self._run_job(n, jobs[n]))
+
+        self._start()
+        results = queue.Queue()
+        # Jobs waiting for their dependencies
+        waiting = list(order)
+        # Jobs submitted during this run: {name: deadline}
+        # (the deadline is None until a worker starts the job)
+        submitted = {}
+        done = set()
+        stale = set()
+
+        while waiting or submitted:
+            # Submit the jobs whose dependencies are done
+            for n in list(waiting):
+                deps = [d for d in dependencies.get(n, []) if d in jobs]
+                if any(d in stale for d in deps):
+                    # A dependency failed: keep the previous stats
+                    waiting.remove(n)
+                    stale.add(n)
+                elif all(d in done for d in deps):
+                    waiting.remove(n)
+                    with self._lock:
+                        if n in self._running:
+                            # Previous run is not over yet
+                            stale.add(n)
+                            continue
+                        self._running.add(n)
+                    submitted[n] = None
+                    self._jobs.put((n, jobs[n], results))
+
+            if not submitted:
+                # Nothing can be run anymore (circular dependencies)
+                stale.update(waiting)
+                break
+
+            # Wait for the next result (or the next deadline)
+            deadlines = [d for d in submitted.values() if d is not None]
+            try:
+                name, ret = results.get(timeout=max(0, min(deadlines) - time()) if deadlines else None)
+            except queue.Empty:
+                now = time()
+                for n in [n for n in submitted if submitted[n] is not None and submitted[n] <= now]:
+                    logger.warning("Plugin {} update did not end in {} seconds".format(n, self.timeout))
+                    del submitted[n]
+                    stale.add(n)
+                    self._replace(n)
+            else:
+                if ret is None:
+                    # Started by a worker
+                    if name in submitted:
+                        submitted[name] = time() + self.timeout
+                elif name in submitted:
+                    del submitted[name]
+                    if ret:
+                        done.add(name)
+                    else:
+                        stale.add(name)
+
+        return stale
+
+    def end(self):
+        """Stop the workers."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        self._threads = []
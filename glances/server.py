@@ -22,14 +22,15 @@
 import json
 import socket
 import sys
+import threading
 from base64 import b64decode
+from functools import partial
 
 from glances import __version__
-from glances.compat import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer, Server
+from glances.compat import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer, Server, queue
 from glances.autodiscover import GlancesAutoDiscoverClient
 from glances.logger import logger
 from glances.stats_server import GlancesStatsServer
-from glances.timer import Timer
 
 
 class GlancesXMLRPCHandler(SimpleXMLRPCRequestHandler, object):
@@ -38,6 +39,10 @@ class GlancesXMLRPCHandler(SimpleXMLRPCRequestHandler, object):
 
     rpc_paths = ('/RPC2', )
 
+    # Client socket timeout (in seconds): a stalled client does not keep
+    # its server worker forever
+    timeout = 30
+
     def end_headers(self):
         # Hack to add a specific header
         # Thk to: https://gist.github.com/rca/4063325
@@ -73,6 +78,11 @@ class GlancesXMLRPCHandler(SimpleXMLRPCRequestHandler, object):
             return self.check_user(username, password)
 
     def check_user(self, username, password):
+        # The result is cached for each credential (the clients send
+        # the same credential on each request)
+        return self.server.check_credential(username, password, self._check_user)
+
+    def _check_user(self, username, password):
         # Check username and password in the dictionary
         if username in self.server.user_dict:
             from glances.password import GlancesPassword
@@ -98,12 +108,20 @@ class GlancesXMLRPCHandler(SimpleXMLRPCRequestHandler, object):
 
 class GlancesXMLRPCServer(SimpleXMLRPCServer, object):
 
-    """Init a SimpleXMLRPCServer instance (IPv6-ready)."""
+    """Init a SimpleXMLRPCServer instance (IPv6-ready).
+
+    The requests are served by a pool of workers threads, so a slow
+    client does not block the others (workers=0 to serve them serially).
+    """
 
     finished = False
 
+    # Maximum number of cached credentials (see check_credential)
+    auth_cache_size = 128
+
     def __init__(self, bind_address, bind_port=61209,
-                 requestHandler=GlancesXMLRPCHandler):
+                 requestHandler=GlancesXMLRPCHandler,
+                 workers=8):
 
         self.bind_address = bind_address
         self.bind_port = bind_port
@@ -115,20 +133,80 @@ class GlancesXMLRPCServer(SimpleXMLRPCServer, object):
 
         super(GlancesXMLRPCServer, self).__init__((bind_address, bind_port), requestHandler)
 
+        # Requests waiting for a worker
+        self.workers = workers
+        self._requests = queue.Queue()
+        self._threads = []
+
+        # Authentication results {(username, password): True/False}
+        self._auth_cache = {}
+        self._auth_lock = threading.Lock()
+
+    def check_credential(self, username, password, check):
+        """Return the (cached) result of check(username, password)."""
+        key = (username, password)
+        with self._auth_lock:
+            if key in self._auth_cache:
+                return self._auth_cache[key]
+        ret = check(username, password)
+        with self._auth_lock:
+            if len(self._auth_cache) >= self.auth_cache_size:
+                self._auth_cache.clear()
+            self._auth_cache[key] = ret
+        return ret
+
+    def clear_auth_cache(self):
+        """Clear the authentication results (users have changed)."""
+        with self._auth_lock:
+            self._auth_cache.clear()
+
+    def process_request(self, request, client_address):
+        """Give the request to the workers threads."""
+        if not self.workers:
+            return super(GlancesXMLRPCServer, self).process_request(request, client_address)
+        self._requests.put((request, client_address))
+
+    def _worker(self):
+        """Serve the requests of the queue (until a None request)."""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
     def end(self):
         """Stop the server"""
-        self.server_close()
         self.finished = True
+        for _ in self._threads:
+            self._requests.put(None)
+        self.server_close()
 
     def serve_forever(self):
         """Main loop"""
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
         while not self.finished:
             self.handle_request()
 
 
 class GlancesInstance(object):
 
-    """All the methods of this class are published as XML-RPC methods."""
+    """All the methods of this class are published as XML-RPC methods.
+
+    The stats are updated by a background thread and the calls are
+    served from the last stats: the responses (JSON strings) are built
+    once per stats generation (see _snapshot), never while the stats are
+    updated.
+    """
 
     def __init__(self,
                  config=None,
@@ -139,38 +217,102 @@ class GlancesInstance(object):
         # Initial update
         self.stats.update()
 
-        # cached_time is the minimum time interval between stats updates
+        # cached_time is the time interval between stats updates
         # i.e. XML/RPC calls will not retrieve updated info until the time
         # since last update is passed (will retrieve old cached info instead)
-        self.timer = Timer(0)
         self.cached_time = args.cached_time
 
+        # Responses of the current stats generation {key: JSON string}
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        # Held while the stats are updated or serialized
+        self._stats_lock = threading.Lock()
+        self._new_snapshots()
+
+        # Stats update thread
+        self._stopper = threading.Event()
+        self._thread = threading.Thread(target=self.__update__)
+        self._thread.daemon = True
+        self._thread.start()
+
     def __update__(self):
-        # Never update more than 1 time per cached_time
-        if self.timer.finished():
-            self.stats.update()
-            self.timer = Timer(self.cached_time)
+        # Update the stats every cached_time seconds (at least 1 second)
+        while not self._stopper.wait(max(self.cached_time, 1)):
+            try:
+                with self._stats_lock:
+                    self.stats.update()
+                    self._new_snapshots()
+            except Exception as e:
+                logger.error("Cannot update the stats ({})".format(e))
+
+    def _new_snapshots(self):
+        """Drop the responses of the previous stats generation.
+
+        Called with the stats lock held.
+        """
+        # Base of the deltas and all the stats (the most asked responses)
+        # are computed here, not in a client request
+        self.stats.store_delta_base()
+        snapshots = {'all': json.dumps(self.stats.getAll())}
+        with self._lock:
+            self._snapshots = snapshots
+
+    def _snapshot(self, key, fct):
+        """Return the (cached) JSON string returned by fct.
+
+        fct is called with the stats lock (the stats are not updated
+        meanwhile) but without the responses lock: a slow response does
+        not block the cached ones. If two requests compute it, the first
+        result is kept.
+        """
+        with self._lock:
+            snapshots = self._snapshots
+            if key in snapshots:
+                return snapshots[key]
+        with self._stats_lock:
+            with self._lock:
+                # Responses of the stats being serialized
+                snapshots = self._snapshots
+                if key in snapshots:
+                    return snapshots[key]
+            value = fct()
+            with self._lock:
+                return snapshots.setdefault(key, value)
+
+    def end(self):
+        """Stop the stats update thread."""
+        self._stopper.set()
+        self.stats.end()
 
     def init(self):
         # Return the Glances version
         return __version__
 
     def getAll(self):
-        # Update and return all the stats
-        self.__update__()
-        return json.dumps(self.stats.getAll())
+        # Return all the stats
+        return self._snapshot('all', lambda: json.dumps(self.stats.getAll()))
+
+    def getAllDelta(self, generation=-1):
+        # Return the stats changes since the given generation
+        # (all the stats if the generation is unknown)
+        return self._snapshot(('all/delta', generation),
+                              lambda: json.dumps(self.stats.getAllDelta(generation)))
+
+    def getSelfStats(self):
+        # Return the Glances self stats (latency histograms)
+        return json.dumps(self.stats.getSelfStats())
 
     def getAllPlugins(self):
         # Return the plugins list
-        return json.dumps(self.stats.getPluginsList())
+        return self._snapshot('pluginslist', lambda: json.dumps(self.stats.getPluginsList()))
 
     def getAllLimits(self):
         # Return all the plugins limits
-        return json.dumps(self.stats.getAllLimitsAsDict())
+        return self._snapshot('all/limits', lambda: json.dumps(self.stats.getAllLimitsAsDict()))
 
     def getAllViews(self):
         # Return all the plugins views
-        return json.dumps(self.stats.getAllViewsAsDict())
+        return self._snapshot('all/views', lambda: json.dumps(self.stats.getAllViewsAsDict()))
 
     def __getattr__(self, item):
         """Overwrite the getattr method in case of attribute is not found.
@@ -181,13 +323,13 @@ class GlancesInstance(object):
         # Check if the attribute starts with 'get'
         if item.startswith(header):
             try:
-                # Update the stat
-                self.__update__()
-                # Return the attribute
-                return getattr(self.stats, item)
+                # Get the attribute
+                fct = getattr(self.stats, item)
             except Exception:
                 # The method is not found for the plugin
                 raise AttributeError(item)
+            # Return the (cached) result of the attribute
+            return lambda *args: self._snapshot((item,) + args, partial(fct, *args))
         else:
             # Default behavior
             raise AttributeError(item)
@@ -204,9 +346,15 @@ class GlancesServer(object):
         # Args
         self.args = args
 
+        # Number of threads serving the requests (0 to serve them serially)
+        workers = 8
+        if hasattr(config, 'has_section') and config.has_section('global'):
+            workers = config.get_int_value('global', 'server_workers', default=workers)
+
         # Init the XML RPC server
         try:
-            self.server = GlancesXMLRPCServer(args.bind_address, args.port, requestHandler)
+            self.server = GlancesXMLRPCServer(args.bind_address, args.port, requestHandler,
+                                              workers=workers)
         except Exception as e:
             logger.critical("Cannot start Glances server: {}".format(e))
             sys.exit(2)
@@ -221,7 +369,8 @@ class GlancesServer(object):
 
         # Register functions
         self.server.register_introspection_functions()
-        self.server.register_instance(GlancesInstance(config, args))
+        self.instance = GlancesInstance(config, args)
+        self.server.register_instance(self.instance)
 
         if not self.args.disable_autodiscover:
             # Note: The Zeroconf service name will be based on the hostname
@@ -234,6 +383,7 @@ class GlancesServer(object):
         """Add an user to the dictionary."""
         self.server.user_dict[username] = password
         self.server.isAuth = True
+        self.server.clear_auth_cache()
 
     def serve_forever(self):
         """Call the main loop."""
@@ -248,3 +398,4 @@ class GlancesServer(object):
         if not self.args.disable_autodiscover:
             self.autodiscover_client.close()
         self.server.end()
+        self.instance.end()
@@ -22,6 +22,7 @@
 import sys
 import time
 
+from glances import registry
 from glances.globals import WINDOWS
 from glances.logger import logger
 from glances.processes import glances_processes
@@ -45,15 +46,15 @@ class GlancesStandalone(object):
         self._quiet = args.quiet
         self.refresh_time = args.time
 
-        # Init stats
-        self.stats = GlancesStats(config=config, args=args)
-
-        # Modules (plugins and exporters) are loaded at this point
-        # Glances can display the list if asked...
+        # Glances can display the modules (plugins and exporters) list
+        # if asked (without loading them, see glances.registry)...
         if args.modules_list:
             self.display_modules_list()
             sys.exit(0)
 
+        # Init stats
+        self.stats = GlancesStats(config=config, args=args)
+
         # If process extended stats is disabled by user
         if not args.enable_process_extended:
             logger.debug("Extended stats for top process are disabled")
@@ -102,9 +103,9 @@ class GlancesStandalone(object):
     def display_modules_list(self):
         """Display modules list"""
         print("Plugins list: {}".format(
-            ', '.join(sorted(self.stats.getPluginsList(enable=False)))))
+            ', '.join(sorted(registry.plugins))))
         print("Exporters list: {}".format(
-            ', '.join(sorted(self.stats.getExportsList(enable=False)))))
+            ', '.join(sorted(registry.exports))))
 
     def __serve_forever(self):
         """Main loop for the CLI.
@@ -20,23 +20,46 @@
 """The stats manager."""
 
 import collections
-import os
+import copy
 import sys
 import threading
 import traceback
-
-from glances.globals import exports_path, plugins_path, sys_path
+import uuid
+from functools import partial
+from time import time
+
+from glances import datasource
+from glances import registry
+from glances.compat import iteritems, itervalues
+from glances.delta import diff_stats
+from glances.exports.export_worker import GlancesExportWorker, GlancesStatsSnapshot
+from glances.globals import plugins_path, sys_path
 from glances.logger import logger
+from glances.processes import glances_processes
+from glances.scheduler import GlancesScheduler
+from glances.timings import glances_timings
 
 
 class GlancesStats(object):
 
     """This class stores, updates and gives stats."""
 
-    # Script header constant
-    header = "glances_"
+    # Plugins update dependencies
+    # {plugin: [plugins to update before plugin]}
+    # Note: the processes list is grabbed by the processcount plugin
+    plugins_dependencies = {'processlist': ['processcount'],
+                            'processtree': ['processcount'],
+                            'amps': ['processcount', 'processlist']}
+
+    # Number of stats generations kept to compute the deltas
+    delta_history_size = 10
 
-    def __init__(self, config=None, args=None):
+    def __init__(self, config=None, args=None, workers=None):
+        """Init the stats.
+
+        workers: number of threads used to update the plugins (0 to
+        update them serially), overwrite the update_workers option
+        """
         # Set the config instance
         self.config = config
 
@@ -49,6 +72,32 @@ class GlancesStats(object):
         # Load the limits (for plugins)
         self.load_limits(self.config)
 
+        # Set the processes collector
+        self.load_processes(self.config)
+
+        # Init the plugins update scheduler
+        self.load_scheduler(self.config, workers=workers)
+
+        # Run the deferred init of the plugins (in background)
+        self.init_plugins(self.config)
+
+        # Init the export workers (one thread per export module)
+        self.load_export_workers(self.config)
+
+        # Last update time of the plugins (see update)
+        self._last_update = {}
+
+        # Number of stats updates (used to know if the stats have changed)
+        self.generation = 0
+        # Id of this stats instance: the generations restart at 0 when
+        # Glances is restarted, the (epoch, generation) couple does not
+        self.epoch = uuid.uuid4().hex
+
+        # Stats of the last generations (used to compute the deltas)
+        # {generation: stats dict}
+        self._delta_bases = collections.OrderedDict()
+        self._delta_lock = threading.Lock()
+
     def __getattr__(self, item):
         """Overwrite the getattr method in case of attribute is not found.
 
@@ -61,7 +110,7 @@ class GlancesStats(object):
             # Get the plugin name
             plugname = item[len('getViews'):].lower()
             # Get the plugin instance
-            plugin = self._plugins[plugname]
+            plugin = self._plugins.get(plugname)
             if hasattr(plugin, 'get_json_views'):
                 # The method get_views exist, return it
                 return getattr(plugin, 'get_json_views')
@@ -72,7 +121,7 @@ class GlancesStats(object):
             # Get the plugin name
             plugname = item[len('get'):].lower()
             # Get the plugin instance
-            plugin = self._plugins[plugname]
+            plugin = self._plugins.get(plugname)
             if hasattr(plugin, 'get_stats'):
                 # The method get_stats exist, return it
                 return getattr(plugin, 'get_stats')
@@ -88,32 +137,37 @@ class GlancesStats(object):
 
         # Init the plugins dict
         # Active plugins dictionnary
-        self._plugins = collections.defaultdict(dict)
+        self._plugins = {}
         # Load the plugins
         self.load_plugins(args=args)
 
         # Init the export modules dict
         # Active exporters dictionnary
-        self._exports = collections.defaultdict(dict)
+        self._exports = {}
         # All available exporters dictionnary
-        self._exports_all = collections.defaultdict(dict)
+        self._exports_all = {}
         # Load the export modules
         self.load_exports(args=args)
 
         # Restoring system path
         sys.path = sys_path
 
-    def _load_plugin(self, plugin_script, args=None, config=None):
-        """Load the plugin (script), init it and add to the _plugin dict."""
+    def _load_plugin(self, module, args=None, config=None):
+        """Load the plugin (registry module), init it and add to the _plugin dict."""
         # The key is the plugin name
         # for example, the file glances_xxx.py
         # generate self._plugins_list["xxx"] = ...
-        name = plugin_script[len(self.header):-3].lower()
+        name = module.name
         try:
-            # Import the plugin
-            plugin = __import__(plugin_script[:-3])
+            # Import the plugin (the plugins path is removed from the
+            # sys.path once the modules are loaded, see load_modules)
+            sys.path.insert(1, plugins_path)
+            try:
+                plugin = __import__(module.module)
+            finally:
+                sys.path.remove(plugins_path)
             # Init and add the plugin to the dictionary
-            if name in ('help', 'amps', 'ports', 'folders'):
+            if 'config' in module.capabilities:
                 self._plugins[name] = plugin.Plugin(args=args, config=config)
             else:
                 self._plugins[name] = plugin.Plugin(args=args)
@@ -129,42 +183,68 @@ class GlancesStats(object):
             logger.error(traceback.format_exc())
 
     def load_plugins(self, args=None):
-        """Load all plugins in the 'plugins' folder."""
-        for item in os.listdir(plugins_path):
-            if (item.startswith(self.header) and
-                    item.endswith(".py") and
-                    item != (self.header + "plugin.py")):
+        """Load the plugins of the registry (see glances.registry).
+
+        A plugin whose needed Python libs are not installed is never
+        imported. A plugin disabled at startup is only imported when it is
+        enabled (see load_enabled_plugins).
+        """
+        # Plugins not loaded because they are disabled
+        self._plugins_unloaded = []
+        for module in itervalues(registry.plugins):
+            if not module.is_available():
+                logger.debug("Missing Python Lib ({}), {} plugin is not loaded".format(
+                    ', '.join(module.missing()), module.name))
+                if self.args is not None:
+                    setattr(self.args,
+                            'disable_' + module.name,
+                            getattr(self.args, 'disable_' + module.name, False))
+            elif getattr(args, 'disable_' + module.name, False):
+                self._plugins_unloaded.append(module)
+            else:
                 # Load the plugin
-                self._load_plugin(os.path.basename(item),
-                                  args=args, config=self.config)
+                self._load_plugin(module, args=args, config=self.config)
 
         # Log plugins list
         logger.debug("Active plugins list: {}".format(self.getPluginsList()))
 
+    def load_enabled_plugins(self):
+        """Load the plugins enabled since the startup (see load_plugins)."""
+        for module in [m for m in self._plugins_unloaded
+                       if not getattr(self.args, 'disable_' + m.name, False)]:
+            logger.debug("Load the {} plugin (enabled)".format(module.name))
+            self._load_plugin(module, args=self.args, config=self.config)
+            if module.name in self._plugins:
+                # Loaded (else tried again at the next update)
+                self._plugins_unloaded.remove(module)
+                self._plugins[module.name].load_limits(self.config)
+                self._start_init(module.name)
+
     def load_exports(self, args=None):
-        """Load all export modules in the 'exports' folder."""
+        """Load the export modules of the registry (see glances.registry).
+
+        Only the enabled export modules are imported.
+        """
         if args is None:
             return False
-        header = "glances_"
         # Build the export module available list
-        args_var = vars(locals()['args'])
-        for item in os.listdir(exports_path):
-            export_name = os.path.basename(item)[len(header):-3].lower()
-            if (item.startswith(header) and
-                    item.endswith(".py") and
-                    item != (header + "export.py") and
-                    item != (header + "history.py")):
-                self._exports_all[export_name] = os.path.basename(item)[:-3]
-                # Set the disable_<name> to False by default
-                setattr(self.args,
-                        'export_' + export_name,
-                        getattr(self.args, 'export_' + export_name, False))
+        for export_name in registry.exports:
+            self._exports_all[export_name] = registry.exports[export_name].module
+            # Set the export_<name> to False by default
+            setattr(self.args,
+                    'export_' + export_name,
+                    getattr(self.args, 'export_' + export_name, False))
 
         # Aim is to check if the export module should be loaded
         for export_name in self._exports_all:
             if getattr(self.args, 'export_' + export_name, False):
+                module = registry.exports[export_name]
+                if not module.is_available():
+                    logger.critical("Missing Python Lib ({}), {} export module is disabled".format(
+                        ', '.join(module.missing()), export_name))
+                    continue
                 # Import the export module
-                export_module = __import__(self._exports_all[export_name])
+                export_module = __import__(module.module)
                 # Add the export to the dictionary
                 # The key is the module name
                 # for example, the file glances_xxx.py
@@ -209,36 +289,203 @@ class GlancesStats(object):
         for p in self._plugins:
             self._plugins[p].load_limits(config)
 
+    def load_processes(self, config=None):
+        """Set the processes collector.
+
+        The [processlist] section of the configuration file can define:
+        - collector: psutil (default) or procfs (Linux only)
+        The processes are grabbed by the processcount plugin, so the
+        collector is used even if the processlist plugin is disabled.
+        """
+        collector = 'psutil'
+        if hasattr(config, 'has_section') and config.has_section('processlist'):
+            collector = config.get_value('processlist', 'collector', default=collector)
+        glances_processes.collector = collector
+
+    def load_scheduler(self, config=None, workers=None):
+        """Init the plugins update scheduler.
+
+        The [global] section of the configuration file can define:
+        - update_workers: number of threads used to update the plugins
+          (0 to update them serially)
+        - update_timeout: maximum time (in seconds) to wait for a plugin
+        The workers argument (if not None) overwrites update_workers.
+        """
+        default_workers = 4
+        timeout = 5
+        if hasattr(config, 'has_section') and config.has_section('global'):
+            default_workers = config.get_int_value('global', 'update_workers', default=default_workers)
+            timeout = config.get_float_value('global', 'update_timeout', default=timeout)
+        if workers is None:
+            workers = default_workers
+        logger.debug("Plugins update scheduler: {} workers, {} seconds timeout".format(workers, timeout))
+        self._scheduler = GlancesScheduler(workers=workers, timeout=timeout)
+
+    def init_plugins(self, config=None):
+        """Run the deferred init of the plugins (see GlancesPlugin.init_deferred).
+
+        One background thread per plugin with a deferred init: the plugins
+        are updated without waiting for them and fill in their stats when
+        their init is over.
+
+        The [global] section of the configuration file can define:
+        - init_timeout: time (in seconds) after which a plugin whose init
+          is not over is flagged as stale
+        """
+        self._init_timeout = 10
+        if hasattr(config, 'has_section') and config.has_section('global'):
+            self._init_timeout = config.get_float_value('global', 'init_timeout',
+                                                        default=self._init_timeout)
+        # Start time of the deferred inits
+        self._init_start = {}
+        # Plugins whose deferred init is not over after the timeout
+        self._init_late = set()
+        for p in self._plugins:
+            self._start_init(p)
+
+    def _start_init(self, p):
+        """Start the deferred init of the plugin p (if any)."""
+        if self._plugins[p].is_ready():
+            return
+        self._init_start[p] = time()
+        t = threading.Thread(target=self._init_plugin, args=(p,))
+        t.daemon = True
+        t.start()
+
+    def _init_plugin(self, p):
+        """Run the deferred init of the plugin p and store its timing."""
+        start = time()
+        try:
+            self._plugins[p].run_init_deferred()
+        except Exception as e:
+            logger.critical("Error while initializing the {} plugin ({})".format(p, e))
+            logger.error(traceback.format_exc())
+        glances_timings.add(p, 'init', time() - start)
+        logger.debug("Deferred init of the {} plugin done in {:.3f} seconds".format(p, time() - start))
+
+    def is_init_late(self, plugin_name, now=None):
+        """Return True if the deferred init of the plugin is not over after the init timeout."""
+        if self._plugins[plugin_name].is_ready():
+            return False
+        if now is None:
+            now = time()
+        if now - self._init_start.get(plugin_name, now) < self._init_timeout:
+            return False
+        if plugin_name not in self._init_late:
+            self._init_late.add(plugin_name)
+            logger.warning("The {} plugin is not initialized after {} seconds".format(plugin_name,
+                                                                                        self._init_timeout))
+        return True
+
+    def load_export_workers(self, config=None):
+        """Init one persistent worker per active export module.
+
+        The [global] section of the configuration file can define:
+        - export_queue_size: number of stats snapshots waiting to be
+          exported (per export module)
+        - export_policy: what to do if the queue is full
+          (coalesce: drop the oldest snapshot, drop: drop the new one)
+        """
+        queue_size = 1
+        policy = 'coalesce'
+        if hasattr(config, 'has_section') and config.has_section('global'):
+            queue_size = config.get_int_value('global', 'export_queue_size', default=queue_size)
+            policy = config.get_value('global', 'export_policy', default=policy)
+        self._export_workers = {}
+        for e in self._exports:
+            self._export_workers[e] = GlancesExportWorker(e, self._exports[e],
+                                                          queue_size=queue_size,
+                                                          policy=policy)
+
+    def is_refresh_needed(self, plugin_name, now=None):
+        """Return True if the refresh period of the plugin is elapsed."""
+        refresh = self._plugins[plugin_name].get_refresh()
+        if not refresh or plugin_name not in self._last_update:
+            return True
+        if now is None:
+            now = time()
+        # Tolerate a small drift of the main loop
+        return now - self._last_update[plugin_name] >= refresh * 0.9
+
     def update(self):
-        """Wrapper method to update the stats."""
+        """Wrapper method to update the stats.
+
+        Only the plugins whose refresh period is elapsed are updated
+        (see GlancesPlugin.get_refresh), others keep their stats.
+        Plugins are updated in parallel (see load_scheduler).
+        A plugin which does not end its update in time keeps its
+        previous stats and is flagged as stale (as a plugin whose
+        deferred init is too long, see init_plugins).
+        """
         # For standalone and server modes
-        # For each plugins, call the update method
+        # For each enabled plugins, call the update method
+        now = time()
+        # Plugins enabled since the startup
+        if self._plugins_unloaded:
+            self.load_enabled_plugins()
+        # New stats for the data source (see glances.datasource)
+        datasource.tick()
+        jobs = {}
         for p in self._plugins:
             if self._plugins[p].is_disable():
-                # If current plugin is disable
-                # then continue to next plugin
-                continue
-            # Update the stats...
-            self._plugins[p].update()
-            # ... the history
-            # self._plugins[p].update_stats_history()
-            # ... and the views
-            # self._plugins[p].update_views()
+                # Force the update when the plugin will be enabled
+                self._last_update.pop(p, None)
+            elif self.is_refresh_needed(p, now=now):
+                jobs[p] = partial(self._update_plugin, p)
+        stale = self._scheduler.run(jobs, self.plugins_dependencies)
+        for p in jobs:
+            self._plugins[p].stale = p in stale or self.is_init_late(p, now=now)
+            if p not in stale:
+                self._last_update[p] = now
+        self.generation += 1
+
+    def _update_plugin(self, p):
+        """Update the plugin p and store its timing (see glances.timings)."""
+        start = time()
+        self._plugins[p].update()
+        stats = self._plugins[p].get_raw()
+        glances_timings.add(p, 'update', time() - start,
+                            len(stats) if isinstance(stats, (list, dict)) else None)
 
     def export(self, input_stats=None):
         """Export all the stats.
 
-        Each export module is ran in a dedicated thread.
+        Each export module is ran in its own persistent thread (worker).
+        The workers get a frozen copy of the stats.
         """
-        # threads = []
-        input_stats = input_stats or {}
+        if not self._export_workers:
+            return
+        input_stats = input_stats or self
 
+        # Only copy the stats exported by (at least) one module
+        available = input_stats.getPluginsList(enable=False)
+        plugin_list = set()
         for e in self._exports:
+            plugin_list.update(p for p in self._exports[e].plugins_to_export()
+                               if p in available)
+        snapshot = GlancesStatsSnapshot(input_stats, plugin_list=plugin_list)
+
+        for e in self._export_workers:
             logger.debug("Export stats using the %s module" % e)
-            thread = threading.Thread(target=self._exports[e].update,
-                                      args=(input_stats,))
-            # threads.append(thread)
-            thread.start()
+            self._export_workers[e].put(snapshot)
+
+    def getSelfStats(self):
+        """Return the Glances self stats (dict).
+
+        {'timings': {function: {name: histogram}} (see glances.timings),
+         'exports': export workers metrics (see getExportsStats)}
+        """
+        return {'timings': glances_timings.get_histograms(),
+                'exports': self.getExportsStats()}
+
+    def getExportsStats(self):
+        """Return the export workers metrics (dict).
+
+        {export module: {'queue', 'queue_size', 'policy', 'exported',
+                         'dropped', 'errors', 'last_latency',
+                         'max_latency', 'mean_latency'}}
+        """
+        return {e: w.get_stats() for e, w in iteritems(self._export_workers)}
 
     def getAll(self):
         """Return all the stats (list)."""
@@ -248,6 +495,57 @@ class GlancesStats(object):
         """Return all the stats (dict)."""
         return {p: self._plugins[p].get_raw() for p in self._plugins}
 
+    def store_delta_base(self):
+        """Store a copy of the current stats, base of the next deltas.
+
+        Return the (generation, stats) couple.
+        """
+        with self._delta_lock:
+            current = self.generation
+            if current not in self._delta_bases:
+                self._delta_bases[current] = copy.deepcopy(
+                    {p: self._plugins[p].get_raw() for p in self.getPluginsList()})
+                while len(self._delta_bases) > self.delta_history_size:
+                    self._delta_bases.popitem(last=False)
+            return current, self._delta_bases[current]
+
+    def getAllDelta(self, generation=None):
+        """Return the enabled plugins stats as a delta (dict).
+
+        If the stats of the given generation are still known, return
+        only the changes since this generation (see glances.delta):
+        {'epoch': <stats instance id>,
+         'generation': <current generation>,
+         'base': <generation>,
+         'delta': <delta between base and current stats>}
+        else return all the stats:
+        {'epoch': <stats instance id>,
+         'generation': <current generation>,
+         'base': None,
+         'stats': <current stats>}
+
+        A delta only applies to stats of the same epoch.
+        """
+        current, stats = self.store_delta_base()
+        with self._delta_lock:
+            base = self._delta_bases.get(generation)
+
+        if base is None:
+            return {'epoch': self.epoch,
+                    'generation': current,
+                    'base': None,
+                    'stats': stats}
+
+        if generation == current:
+            delta = {'set': {}, 'del': []}
+        else:
+            delta = diff_stats(base, stats,
+                               keys={p: self._plugins[p].get_key() for p in stats})
+        return {'epoch': self.epoch,
+                'generation': current,
+                'base': generation,
+                'delta': delta}
+
     def getAllExports(self, plugin_list=None):
         """
         Return all the stats to be exported (list).
@@ -268,7 +566,7 @@ class GlancesStats(object):
         if plugin_list is None:
             # All plugins should be exported
             plugin_list = self._plugins
-        return {p: self._plugins[p].get_export() for p in plugin_list}
+        return {p: self._plugins[p].get_export() for p in plugin_list if p in self._plugins}
 
     def getAllLimits(self):
         """Return the plugins limits list."""
@@ -283,7 +581,7 @@ class GlancesStats(object):
         if plugin_list is None:
             # All plugins should be exported
             plugin_list = self._plugins
-        return {p: self._plugins[p].limits for p in plugin_list}
+        return {p: self._plugins[p].limits for p in plugin_list if p in self._plugins}
 
     def getAllViews(self):
         """Return the plugins views."""
@@ -304,11 +602,21 @@ class GlancesStats(object):
         else:
             return None
 
+    def getStalePluginsList(self):
+        """Return the list of plugins not updated during the last update."""
+        return [p for p in self._plugins if self._plugins[p].stale]
+
     def end(self):
         """End of the Glances stats."""
-        # Close export modules
+        # Stop the plugins update scheduler
+        self._scheduler.end()
+        # Stop the export workers then close export modules
+        for e in self._export_workers:
+            self._export_workers[e].end()
         for e in self._exports:
             self._exports[e].exit()
         # Close plugins
         for p in self._plugins:
             self._plugins[p].exit()
+        # Close the data source (end of the record file)
+        datasource.set_source(None)
@@ -21,9 +21,11 @@
 
 import sys
 
+from glances.delta import patch_stats
 from glances.stats import GlancesStats
 from glances.globals import sys_path
 from glances.logger import logger
+from glances.timings import glances_timings
 
 
 class GlancesStatsClient(GlancesStats):
@@ -40,6 +42,11 @@ class GlancesStatsClient(GlancesStats):
         # Init the arguments
         self.args = args
 
+        # Server stats epoch, generation and stats (see update_delta)
+        self.server_epoch = None
+        self.server_generation = -1
+        self.server_stats = {}
+
     def set_plugins(self, input_plugins):
         """Set the plugin list according to the Glances server."""
         header = "glances_"
@@ -64,7 +71,33 @@ class GlancesStatsClient(GlancesStats):
         """Update all the stats."""
         # For Glances client mode
         for p in input_stats:
+            if p not in self._plugins:
+                # Server plugin not loaded by the client (see set_plugins)
+                continue
             # Update plugin stats with items sent by the server
             self._plugins[p].set_stats(input_stats[p])
             # Update the views for the updated stats
-            self._plugins[p].update_views()
+            with glances_timings.timer(p, 'update_views'):
+                self._plugins[p].update_views()
+
+    def update_delta(self, input_delta):
+        """Update all the stats from a server delta (see GlancesStats.getAllDelta).
+
+        Return False if the delta does not apply to the current stats (the
+        server has been restarted): the full stats should be asked again.
+        """
+        if input_delta['base'] is None:
+            self.server_stats = input_delta['stats']
+        elif input_delta.get('epoch') != self.server_epoch:
+            # Generation of another server instance
+            self.server_epoch = None
+            self.server_generation = -1
+            return False
+        else:
+            self.server_stats = patch_stats(self.server_stats,
+                                            input_delta['delta'],
+                                            keys={p: self._plugins[p].get_key() for p in self._plugins})
+        self.server_epoch = input_delta.get('epoch')
+        self.server_generation = input_delta['generation']
+        self.update(self.server_stats)
+        return True
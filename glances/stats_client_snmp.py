@@ -24,6 +24,7 @@ import re
 from glances.stats import GlancesStats
 from glances.compat import iteritems
 from glances.logger import logger
+from glances.timings import glances_timings
 
 # SNMP OID regexp pattern to short system name dict
 oid_to_short_system_name = {'.*Linux.*': 'linux',
@@ -54,6 +55,9 @@ class GlancesStatsClientSNMP(GlancesStats):
         # Load AMPs, plugins and exports modules
         self.load_modules(self.args)
 
+        # Init the export workers (exports are loaded now)
+        self.load_export_workers(self.config)
+
     def check_snmp(self):
         """Chek if SNMP is available on the server."""
         # Import the SNMP client class
@@ -118,4 +122,5 @@ class GlancesStatsClientSNMP(GlancesStats):
                 # ... the history
                 self._plugins[p].update_stats_history()
                 # ... and the views
-                self._plugins[p].update_views()
+                with glances_timings.timer(p, 'update_views'):
+                    self._plugins[p].update_views()
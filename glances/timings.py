@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Glances.
+#
+# Copyright (C) 2019 Nicolargo <nicolas@nicolargo.com>
+#
+# Glances is free software; you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Glances is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Timings of the Glances internal functions (for example plugins update)."""
+
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from time import time
+
+
+class GlancesHistogram(object):
+
+    """Histogram of durations (in seconds).
+
+    The buckets are cumulative (as the Prometheus ones): the bucket 'le'
+    counts the durations lower or equal to le seconds.
+    """
+
+    buckets = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        # Last bucket is +Inf
+        self._counts = [0] * (len(self.buckets) + 1)
+
+    def add(self, duration):
+        self.count += 1
+        self.sum += duration
+        self.min = duration if self.min is None else min(self.min, duration)
+        self.max = duration if self.max is None else max(self.max, duration)
+        self._counts[bisect_left(self.buckets, duration)] += 1
+
+    def percentile(self, p):
+        """Return an estimation (the bucket upper bound) of the p percentile."""
+        if not self.count:
+            return None
+        rank = self.count * p / 100.0
+        total = 0
+        for le, c in zip(self.buckets, self._counts):
+            total += c
+            if total >= rank:
+                return min(le, self.max)
+        return self.max
+
+    def as_dict(self):
+        ret = {'count': self.count,
+               'sum': self.sum,
+               'mean': self.sum / self.count if self.count else None,
+               'min': self.min,
+               'max': self.max,
+               'p50': self.percentile(50),
+               'p95': self.percentile(95),
+               'buckets': []}
+        total = 0
+        for le, c in zip(self.buckets + ('+Inf',), self._counts):
+            total += c
+            ret['buckets'].append([le, total])
+        return ret
+
+
+class GlancesTimings(object):
+
+    """This class stores the last timings in a ring buffer.
+
+    A timing is a dict:
+    {'time': <end timestamp>,
+     'name': <plugin (or module) name>,
+     'function': <function name>,
+     'duration': <duration in seconds>,
+     'items': <number of items returned (or None)>}
+
+    All the timings are also added to a histogram per (function, name),
+    since Glances start.
+    """
+
+    def __init__(self, size=1000):
+        self._timings = deque(maxlen=size)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, function, duration, items=None):
+        """Add a timing."""
+        with self._lock:
+            self._timings.append((time(), name, function, duration, items))
+            key = (function, name)
+            if key not in self._histograms:
+                self._histograms[key] = GlancesHistogram()
+            self._histograms[key].add(duration)
+
+    @contextmanager
+    def timer(self, name, function):
+        """Context manager adding the timing of its block."""
+        start = time()
+        try:
+            yield
+        finally:
+            self.add(name, function, time() - start)
+
+    def get_histograms(self, function=None):
+        """Return the histograms (see GlancesHistogram.as_dict).
+
+        {function: {name: histogram}} or {name: histogram} for the given
+        function.
+        """
+        with self._lock:
+            ret = {}
+            for (f, n), h in self._histograms.items():
+                ret.setdefault(f, {})[n] = h.as_dict()
+        if function is not None:
+            return ret.get(function, {})
+        return ret
+
+    def get(self, name=None, function=None, nb=0):
+        """Return the last nb timings (all if nb=0), oldest first.
+
+        Filter on the name and function if they are not None.
+        """
+        with self._lock:
+            timings = list(self._timings)
+        ret = [{'time': t, 'name': n, 'function': f, 'duration': d, 'items': i}
+               for t, n, f, d, i in timings
+               if (name is None or n == name) and (function is None or f == function)]
+        return ret[-nb:] if nb > 0 else ret
+
+    def reset(self):
+        """Remove all the timings."""
+        with self._lock:
+            self._timings.clear()
+            self._histograms = {}
+
+
+glances_timings = GlancesTimings()
@@ -95,6 +95,7 @@ setup(
         'folders': ['scandir'],  # python_version<"3.5"
         'gpu': ['nvidia-ml-py3'],  # python_version=="2.7"
         'graph': ['pygal'],
+        'history': ['numpy'],
         'ip': ['netifaces'],
         'raid': ['pymdstat'],
         'smart': ['pySMART.smartx'],
@@ -217,6 +217,49 @@ class TestGlances(unittest.TestCase):
         self.assertIsInstance(req.json()['system'], list)
         self.assertTrue(len(req.json()['system']) > 1)
 
+    def test_011_history_query(self):
+        """History query (buckets)."""
+        method = "history"
+        print('INFO: [TEST_011] History query')
+        print("HTTP RESTful request: %s/cpu/%s?window=3600&resolution=60&percentiles=95" % (URL, method))
+        req = self.http_get("%s/cpu/%s?window=3600&resolution=60&percentiles=95" % (URL, method))
+        self.assertTrue(req.ok)
+        self.assertIsInstance(req.json(), dict)
+        for item in req.json().values():
+            self.assertEqual(len(item['time']), len(item['p95']))
+        print("HTTP RESTful request: %s/cpu/%s?resolution=foo" % (URL, method))
+        req = self.http_get("%s/cpu/%s?resolution=foo" % (URL, method))
+        self.assertEqual(req.status_code, 400)
+        print("HTTP RESTful request: %s/cpu/%s?resolution=60&percentiles=150" % (URL, method))
+        req = self.http_get("%s/cpu/%s?resolution=60&percentiles=150" % (URL, method))
+        self.assertEqual(req.status_code, 400)
+
+    def test_012_etag(self):
+        """ETag and If-None-Match."""
+        print('INFO: [TEST_012] ETag')
+        for p in ['all', 'cpu', 'cpu/limits', 'all/views']:
+            print("HTTP RESTful request: %s/%s" % (URL, p))
+            req = self.http_get("%s/%s" % (URL, p))
+            self.assertTrue(req.ok)
+            etag = req.headers['ETag']
+            req = requests.get("%s/%s" % (URL, p),
+                               headers={'If-None-Match': etag})
+            self.assertIn(req.status_code, (200, 304))
+            if req.status_code == 200:
+                # Stats have been updated in the meantime
+                self.assertNotEqual(req.headers['ETag'], etag)
+
+    def test_013_selfstats(self):
+        """Self stats."""
+        method = "selfstats"
+        print('INFO: [TEST_013] Self stats')
+        print("HTTP RESTful request: %s/%s" % (URL, method))
+        req = self.http_get("%s/%s" % (URL, method))
+        self.assertTrue(req.ok)
+        routes = req.json()['timings']['route']
+        self.assertIn('/api/%s/<plugin>' % API_VERSION, routes)
+        self.assertIn('p95', routes['/api/%s/<plugin>' % API_VERSION])
+
     def test_999_stop_server(self):
         """Stop the Glances Web Server."""
         print('INFO: [TEST_999] Stop the Glances Web Server')
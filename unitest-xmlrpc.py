@@ -190,6 +190,51 @@ class TestGlances(unittest.TestCase):
         req = json.loads(client.getViewsCpu())
         self.assertIsInstance(req, dict)
 
+    def test_014_all_delta(self):
+        """All delta."""
+        method = "getAllDelta()"
+        print('INFO: [TEST_014] Get all stats delta')
+        print("XML-RPC request: %s" % method)
+        req = json.loads(client.getAllDelta(-1))
+        self.assertIsNone(req['base'])
+        self.assertIsInstance(req['stats'], dict)
+        req = json.loads(client.getAllDelta(req['generation']))
+        self.assertIsNotNone(req['base'])
+        self.assertIsInstance(req['delta'], dict)
+
+    def test_015_selfstats(self):
+        """Self stats."""
+        method = "getSelfStats()"
+        print('INFO: [TEST_015] Get self stats')
+        print("XML-RPC request: %s" % method)
+        req = json.loads(client.getSelfStats())
+        self.assertIn('cpu', req['timings']['update'])
+        self.assertGreater(req['timings']['update']['cpu']['count'], 0)
+
+    def test_016_concurrent_clients(self):
+        """Concurrent clients."""
+        print('INFO: [TEST_016] Concurrent clients')
+        import threading
+        results = []
+
+        def get_all_delta():
+            results.append(json.loads(ServerProxy(URL).getAllDelta(-1)))
+        threads = [threading.Thread(target=get_all_delta) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+        self.assertEqual(len(results), 20)
+        for req in results:
+            self.assertIsInstance(req['stats'], dict)
+
+    def test_017_background_refresh(self):
+        """Stats refreshed without client request."""
+        print('INFO: [TEST_017] Background stats refresh')
+        generation = json.loads(client.getAllDelta(-1))['generation']
+        time.sleep(3)
+        self.assertGreater(json.loads(client.getAllDelta(-1))['generation'], generation)
+
     def test_999_stop_server(self):
         """Stop the Glances Web Server."""
         print('INFO: [TEST_999] Stop the Glances Server')
@@ -180,6 +180,10 @@ class TestGlances(unittest.TestCase):
         stats_grab = stats.get_plugin('processlist').get_raw()
         self.assertTrue(type(stats_grab) is list, msg='Process count stats is not a list')
         print('INFO: PROCESS list stats: %s items in the list' % len(stats_grab))
+        # The exported list is sorted by the current sort key (CPU by default)
+        stats_grab = stats.get_plugin('processlist').get_export()
+        cpu = [p['cpu_percent'] or 0 for p in stats_grab]
+        self.assertEqual(cpu, sorted(cpu, reverse=True))
         # Check if number of processes in the list equal counter
         # self.assertEqual(total, len(stats_grab))
 
@@ -194,6 +198,9 @@ class TestGlances(unittest.TestCase):
     def test_012_ip(self):
         """Check IP plugin."""
         print('INFO: [TEST_012] Check IP stats')
+        if stats.get_plugin('ip') is None:
+            print("INFO: [TEST_012] netifaces not found, not running IP plugin test")
+            return
         stats_grab = stats.get_plugin('ip').get_raw()
         self.assertTrue(type(stats_grab) is dict, msg='IP stats is not a dict')
         print('INFO: IP stats: %s' % stats_grab)
@@ -210,6 +217,9 @@ class TestGlances(unittest.TestCase):
     def test_013_gpu(self):
         """Check GPU plugin."""
         print('INFO: [TEST_014] Check GPU stats')
+        if stats.get_plugin('gpu') is None:
+            print("INFO: [TEST_014] pynvml not found, not running GPU plugin test")
+            return
         stats_grab = stats.get_plugin('gpu').get_raw()
         self.assertTrue(type(stats_grab) is list, msg='GPU stats is not a list')
         print('INFO: GPU stats: %s' % stats_grab)
@@ -256,11 +266,10 @@ class TestGlances(unittest.TestCase):
 
     def test_016_hddsmart(self):
         """Check hard disk SMART data plugin."""
-        try:
-            from glances.plugins.glances_smart import is_admin
-        except ImportError:
+        if stats.get_plugin('smart') is None:
             print("INFO: [TEST_016] pySMART not found, not running SMART plugin test")
             return
+        from glances.plugins.glances_smart import is_admin
 
         stat = 'DeviceName'
         print('INFO: [TEST_016] Check SMART stats: {}'.format(stat))
@@ -332,6 +341,19 @@ class TestGlances(unittest.TestCase):
         self.assertEqual(a.history_len(), 3)
         self.assertEqual(a.history_value()[1], 4)
         self.assertEqual(a.history_mean(nb=3), 4.5)
+        # Check the ring buffer order
+        a.value = 5
+        a.value = 6
+        self.assertEqual([v for _, v in a.history], [4, 5, 6])
+        self.assertEqual([v for _, v in a.history_raw(nb=2)], [5, 6])
+        # Int values are given back as int (as float once a float is added)
+        self.assertIsInstance(a.history_value()[1], int)
+        self.assertEqual(a.history_json()[-1][1], 6)
+        a.value = None
+        self.assertIsNone(a.history_value()[1])
+        self.assertIsInstance(a.history_value(pos=2)[1], int)
+        a.value = 7.5
+        self.assertIsInstance(a.history_value(pos=3)[1], float)
 
     def test_098_history(self):
         """Test GlancesHistory classe"""
@@ -372,6 +394,604 @@ class TestGlances(unittest.TestCase):
         bar.percent = 101
         self.assertGreaterEqual(bar.percent, bar.max_value)
 
+    def test_100_scheduler(self):
+        """Test GlancesScheduler class"""
+        print('INFO: [TEST_100] Test scheduler')
+        from glances.scheduler import GlancesScheduler
+        s = GlancesScheduler(workers=2, timeout=0.5)
+        done = []
+        jobs = {'a': lambda: done.append('a'),
+                'b': lambda: done.append('b'),
+                'slow': lambda: time.sleep(1),
+                'after_slow': lambda: done.append('after_slow')}
+        stale = s.run(jobs, {'a': ['b'], 'after_slow': ['slow']})
+        self.assertEqual(stale, set(['slow', 'after_slow']))
+        self.assertLess(done.index('b'), done.index('a'))
+        self.assertNotIn('after_slow', done)
+        # The slow job is still running: it should not be started again
+        self.assertIn('slow', s.run({'slow': lambda: None}))
+        s.end()
+        # The timeout starts when a worker starts the job
+        s = GlancesScheduler(workers=1, timeout=0.5)
+        self.assertEqual(s.run({'a': lambda: time.sleep(0.3), 'b': lambda: time.sleep(0.3)}), set())
+        # The workers of the jobs which hang are replaced
+        import threading
+        hang = threading.Event()
+        self.assertEqual(s.run({'hang': hang.wait}), set(['hang']))
+        self.assertEqual(s.run({'a': lambda: done.append('a2')}), set())
+        self.assertIn('a2', done)
+        hang.set()
+        s.end()
+        # The number of workers of the stats can be given (serial update)
+        scheduler = stats._scheduler
+        try:
+            stats.load_scheduler(core.get_config(), workers=0)
+            self.assertEqual(stats._scheduler.workers, 0)
+            stats.update()
+        finally:
+            stats._scheduler.end()
+            stats._scheduler = scheduler
+
+    def test_101_refresh(self):
+        """Test the plugins refresh period"""
+        print('INFO: [TEST_101] Test plugins refresh period')
+        self.assertEqual(stats.get_plugin('system').get_refresh(), 60)
+        self.assertIsNone(stats.get_plugin('cpu').get_refresh())
+        stats.update()
+        self.assertFalse(stats.is_refresh_needed('system'))
+        self.assertTrue(stats.is_refresh_needed('cpu'))
+
+    def test_102_history_query(self):
+        """Test the history query (buckets)"""
+        print('INFO: [TEST_102] Test history query')
+        from glances.attribute import GlancesAttribute
+        a = GlancesAttribute('a', history_max_size=10)
+        for i in range(12):
+            a.history_add((1000 + i * 10, i))
+        q = a.history_query(start=1030, end=1100, resolution=30, percentiles=[50])
+        self.assertEqual(q['count'], [3, 3, 2])
+        self.assertEqual(q['min'], [3, 6, 9])
+        self.assertEqual(q['max'], [5, 8, 10])
+        self.assertEqual(q['mean'], [4, 7, 9.5])
+        self.assertEqual(q['p50'], [4, 7, 9.5])
+        # Percentiles (linear interpolation), not a number values ignored
+        from glances import attribute
+        a = GlancesAttribute('a')
+        for i, v in enumerate([4, 1, float('nan'), 3, 2, 10, 20, 30, 40]):
+            a.history_add((1000 + i, v))
+        np = attribute.np
+        try:
+            # With and without NumPy
+            for lib in set([np, None]):
+                attribute.np = lib
+                q = a.history_query(resolution=5, percentiles=[0, 25, 95, 100])
+                self.assertEqual(q['count'], [4, 4])
+                self.assertEqual(q['min'], [1, 10])
+                self.assertEqual(q['max'], [4, 40])
+                self.assertEqual(q['mean'], [2.5, 25])
+                self.assertEqual(q['p0'], [1, 10])
+                self.assertEqual(q['p25'], [1.75, 17.5])
+                self.assertAlmostEqual(q['p95'][0], 3.85)
+                self.assertAlmostEqual(q['p95'][1], 38.5)
+                self.assertEqual(q['p100'], [4, 40])
+        finally:
+            attribute.np = np
+
+    def test_103_delta(self):
+        """Test the stats delta"""
+        print('INFO: [TEST_103] Test stats delta')
+        from glances.delta import diff_stats, patch_stats
+        keys = {'processlist': 'pid'}
+        old = {'cpu': {'user': 1.0, 'system': 2.0, 'steal': 0.0},
+               'processlist': [{'pid': 1, 'cpu': 1.0}, {'pid': 2, 'cpu': 2.0}],
+               'alert': []}
+        new = {'cpu': {'user': 1.5, 'system': 2.0},
+               'processlist': [{'pid': 3, 'cpu': 5.0}, {'pid': 1, 'cpu': 1.0}],
+               'load': {'min1': 0.5}}
+        delta = diff_stats(old, new, keys)
+        self.assertEqual(delta['del'], ['alert'])
+        self.assertEqual(delta['set']['cpu'], {'set': {'user': 1.5}, 'del': ['steal']})
+        self.assertEqual(delta['set']['processlist']['del'], [2])
+        self.assertEqual(patch_stats(old, delta, keys), new)
+        # The key is given by the patch (plugin unknown on the client side)
+        self.assertEqual(delta['set']['processlist']['key'], 'pid')
+        self.assertEqual(patch_stats(old, delta, {}), new)
+        # Server side
+        d = stats.getAllDelta()
+        self.assertIsNone(d['base'])
+        stats.update()
+        d = stats.getAllDelta(d['generation'])
+        self.assertEqual(d['base'], d['generation'] - 1)
+        self.assertIn('delta', d)
+        self.assertEqual(d['epoch'], stats.epoch)
+        # Client side: a delta of another server instance is not applied
+        from glances.stats_client import GlancesStatsClient
+        client = GlancesStatsClient(config=core.get_config(), args=core.get_args())
+        self.assertTrue(client.update_delta(stats.getAllDelta()))
+        self.assertEqual(client.server_epoch, stats.epoch)
+        d = stats.getAllDelta(client.server_generation)
+        self.assertTrue(client.update_delta(d))
+        d['epoch'] = 'restarted'
+        self.assertFalse(client.update_delta(d))
+        self.assertEqual(client.server_generation, -1)
+
+    def test_104_export_worker(self):
+        """Test the export worker"""
+        print('INFO: [TEST_104] Test export worker')
+        from glances.exports.export_worker import GlancesExportWorker, GlancesStatsSnapshot
+
+        class SlowExport(object):
+            exported = []
+
+            def update(self, snapshot):
+                time.sleep(0.2)
+                self.exported.append(snapshot.getAllExportsAsDict(['cpu'])['cpu'])
+
+        snapshot = GlancesStatsSnapshot(stats, plugin_list=['cpu'])
+        # The snapshot is a copy of the stats
+        self.assertIsNot(snapshot.getAllExportsAsDict(['cpu'])['cpu'],
+                         stats.getAllExportsAsDict(['cpu'])['cpu'])
+        # The live stats are not available (only the snapshotted getters)
+        self.assertRaises(AttributeError, getattr, snapshot, 'getAll')
+        self.assertEqual(snapshot.getPluginsList(enable=False), stats.getPluginsList(enable=False))
+        self.assertIs(snapshot.get_plugin('cpu'), stats.get_plugin('cpu'))
+        w = GlancesExportWorker('slow', SlowExport(), queue_size=1)
+        for i in range(5):
+            w.put(snapshot)
+        w.end()
+        m = w.get_stats()
+        self.assertEqual(m['exported'] + m['dropped'], 5)
+        self.assertGreater(m['dropped'], 0)
+        self.assertGreaterEqual(m['max_latency'], 0.2)
+
+    def test_105_processes_cache(self):
+        """Test the processes cache (static attributes)"""
+        print('INFO: [TEST_105] Test processes cache')
+        import os
+        from glances.processes import GlancesProcesses
+        p = GlancesProcesses()
+        p.update()
+        self.assertEqual(p.table_size, p.getcount()['table_size'])
+        self.assertIn(os.getpid(), p._table)
+        entry = p._table[os.getpid()]
+        self.assertIn('cmdline', entry['static'])
+        # Dead processes are removed from the table
+        p._table[-1] = {'create_time': 0, 'static': {}, 'io_old': None}
+        p.update()
+        self.assertNotIn(-1, p._table)
+        # The static attributes are not read again
+        self.assertIs(p._table[os.getpid()]['static'], entry['static'])
+
+    def test_106_trend(self):
+        """Test the history trend"""
+        print('INFO: [TEST_106] Test history trend')
+        from glances.attribute import GlancesAttribute
+        a = GlancesAttribute('a', history_max_size=4)
+        for i in range(3):
+            a.history_add((1000 + i, i))
+        self.assertIsNone(a.history_trend(nb=4))
+        a.history_add((1003, 9))
+        self.assertEqual(a.history_trend(nb=4), 9 - 1)
+        # The running sum follows the new values
+        for i, v in enumerate([2, 4, 6, 'x', 8, 10, 12, 14]):
+            a.history_add((1004 + i, v))
+        self.assertEqual(a.history_trend(nb=4), 14 - 10)
+        self.assertEqual(a.history_trend(nb=3), 14 - 11)
+        a.history_add((1012, 'x'))
+        self.assertIsNone(a.history_trend(nb=4))
+
+    def test_107_rules(self):
+        """Test the compiled rules (hide and alias)"""
+        print('INFO: [TEST_107] Test compiled rules')
+        from glances.rules import GlancesRule
+        r = GlancesRule(['sda2', 'loop.*', '(a)\\1', '['], lower=True)
+        self.assertTrue(r.match('LOOP0'))
+        self.assertTrue(r.match('sda2'))
+        self.assertTrue(r.match('aa'))
+        self.assertFalse(r.match('sda1'))
+        self.assertFalse(r.match('xloop0'))
+        self.assertTrue(GlancesRule(['loop'], mode='search').match('xloop0'))
+        self.assertFalse(GlancesRule([]).match('sda1'))
+        # The rules follow the limits
+        plugin = stats.get_plugin('diskio')
+        limits = dict(plugin.limits)
+        plugin.limits = dict(limits, diskio_hide=['sd.*'], diskio_sda_alias=['system'])
+        self.assertTrue(plugin.is_hide('SDA'))
+        self.assertEqual(plugin.has_alias('sda'), 'system')
+        plugin.limits = dict(limits, diskio_hide=['nvme.*'])
+        self.assertFalse(plugin.is_hide('SDA'))
+        self.assertIsNone(plugin.has_alias('sda'))
+        plugin.limits = limits
+
+    def test_108_timings(self):
+        """Test the plugins update timings"""
+        print('INFO: [TEST_108] Test timings')
+        from glances.timings import glances_timings, GlancesTimings
+        stats.update()
+        t = glances_timings.get(name='cpu', function='update', nb=1)
+        self.assertEqual(len(t), 1)
+        self.assertGreaterEqual(t[0]['duration'], 0)
+        self.assertEqual(t[0]['items'], len(stats.get_plugin('cpu').get_raw()))
+        # Ring buffer
+        timings = GlancesTimings(size=3)
+        for i in range(5):
+            timings.add('p', 'update', i)
+        self.assertEqual([i['duration'] for i in timings.get()], [2, 3, 4])
+        # Histograms (since start)
+        h = timings.get_histograms('update')['p']
+        self.assertEqual(h['count'], 5)
+        self.assertEqual(h['max'], 4)
+        self.assertEqual(h['buckets'][-1], ['+Inf', 5])
+
+    def test_109_datasource(self):
+        """Test the data sources (record, replay and generate)"""
+        print('INFO: [TEST_109] Test data sources')
+        import os
+        import tempfile
+        from glances import datasource
+        from glances.datasource import psutil
+        from glances.processes import GlancesProcesses
+        path = os.path.join(tempfile.mkdtemp(), 'glances.rec.gz')
+        datasource.set_source(datasource.PsutilRecorder(path))
+        mem = psutil.virtual_memory()
+        p = GlancesProcesses()
+        p.update()
+        pids = [i['pid'] for i in p.getlist()]
+        datasource.set_source(None)
+        # Replay
+        datasource.set_source(datasource.PsutilReplay(path, scale=2))
+        self.assertEqual(psutil.virtual_memory(), mem)
+        p = GlancesProcesses()
+        p.update()
+        self.assertEqual(len(p.getlist()), 2 * len(pids))
+        self.assertIn(os.getpid(), [i['pid'] for i in p.getlist()])
+        # Generate (same seed, same stats)
+        datasource.set_source(datasource.PsutilGenerator(processes=100, seed=1))
+        first = [i.info for i in psutil.process_iter(attrs=['pid', 'name'])]
+        self.assertEqual(len(first), 100)
+        datasource.set_source(datasource.PsutilGenerator(processes=100, seed=1))
+        self.assertEqual([i.info for i in psutil.process_iter(attrs=['pid', 'name'])], first)
+        datasource.set_source(None)
+        self.assertIsNone(datasource.get_source())
+        os.remove(path)
+
+    def test_110_top_stats(self):
+        """Test the top processes selection"""
+        print('INFO: [TEST_110] Test top processes')
+        from glances.processes import GlancesProcesses, sort_stats, top_stats
+        p = GlancesProcesses()
+        p.update()
+        plist = p.getlist()
+        for key in ['cpu_percent', 'memory_percent', 'name', 'io_counters', 'cpu_times']:
+            reverse = key != 'name'
+            top = top_stats(plist, 5, sortedby=key, reverse=reverse)
+            self.assertEqual([i['pid'] for i in top],
+                             [i['pid'] for i in sort_stats(list(plist), sortedby=key, reverse=reverse)[:5]])
+        # The processes list is not modified
+        self.assertEqual(p.getlist(), plist)
+        self.assertEqual(p.getlist(sortedby='name')[0]['pid'],
+                         top_stats(plist, 1, sortedby='name', reverse=False)[0]['pid'])
+        # Processes count (single pass)
+        count = p.getcount()
+        self.assertEqual(count['total'], len(plist))
+        self.assertEqual(count['thread'], sum(i['num_threads'] for i in plist if i['num_threads'] is not None))
+        self.assertEqual(count['running'], len([i for i in plist if i['status'] == 'R']))
+
+    def test_111_procfs(self):
+        """Test the /proc processes collector"""
+        print('INFO: [TEST_111] Test procfs collector')
+        if not LINUX:
+            print('INFO: [TEST_111] Only available on Linux')
+            return
+        import os
+        import psutil
+        from glances.processes import GlancesProcesses
+        from glances.procfs import GlancesProcfs
+        attrs = ['pid', 'ppid', 'name', 'cmdline', 'username', 'gids', 'nice',
+                 'num_threads', 'memory_info', 'cpu_times', 'status']
+        me = [p for p in GlancesProcfs().process_iter(attrs=attrs) if p.pid == os.getpid()][0]
+        ref = psutil.Process().as_dict(attrs=attrs)
+        for k in ['pid', 'ppid', 'name', 'cmdline', 'username', 'nice', 'status']:
+            self.assertEqual(me.info[k], ref[k])
+        self.assertEqual(tuple(me.info['gids']), tuple(ref['gids']))
+        self.assertEqual(me.info['memory_info'].vms, ref['memory_info'].vms)
+        # Only the asked attributes are read
+        self.assertEqual(list(me.as_dict(attrs=['ppid'])), ['ppid'])
+        # Processes stats with the procfs collector
+        p = GlancesProcesses()
+        p.collector = 'procfs'
+        self.assertEqual(p.collector, 'procfs')
+        p.update()
+        self.assertIn(os.getpid(), [i['pid'] for i in p.getlist()])
+        p.collector = 'psutil'
+        self.assertEqual(p.collector, 'psutil')
+        # The collector is set from the configuration by the stats (even
+        # if the processlist plugin is disabled)
+        from glances.config import Config
+        from glances.processes import glances_processes
+        config = Config()
+        if not config.parser.has_section('processlist'):
+            config.parser.add_section('processlist')
+        config.parser.set('processlist', 'collector', 'procfs')
+        try:
+            stats.load_processes(config)
+            self.assertEqual(glances_processes.collector, 'procfs')
+        finally:
+            stats.load_processes(core.get_config())
+        self.assertEqual(glances_processes.collector, 'psutil')
+
+    def test_112_proctable(self):
+        """Test the processes table columns"""
+        print('INFO: [TEST_112] Test processes table columns')
+        from glances import proctable
+        from glances.processes import sort_stats
+        plist = [{'pid': 1, 'name': 'b', 'cpu_percent': 2.0, 'memory_percent': None,
+                  'num_threads': 3, 'io_counters': [10, 0, 5, 0, 1]},
+                 {'pid': 2, 'name': 'a', 'cpu_percent': None, 'memory_percent': 1.0,
+                  'num_threads': None, 'io_counters': [0, 0, 0, 0, 0]},
+                 {'pid': 3, 'name': 'c', 'cpu_percent': 2.0, 'memory_percent': 3.0,
+                  'num_threads': 1, 'io_counters': [1, 1, 0, 0, 1]}]
+        np = proctable.np
+        try:
+            # With and without NumPy
+            for lib in set([np, None]):
+                proctable.np = lib
+                table = proctable.GlancesProcessTable()
+                for p in plist:
+                    table.append(dict(p), full_status='running')
+                # max and sum ignore the None values
+                self.assertEqual(table.sum('num_threads'), 4)
+                self.assertEqual(table.sum('cpu_percent'), 4.0)
+                self.assertEqual(table.max('cpu_percent'), 2.0)
+                self.assertEqual(table.max('memory_percent'), 3.0)
+                self.assertEqual(table.max('num_threads'), 3)
+                self.assertIsNone(table.max('nice'))
+                self.assertEqual(table.tolist('num_threads'), [3, None, 1])
+                for key in ['cpu_percent', 'memory_percent', 'io_counters', 'name']:
+                    reverse = key != 'name'
+                    order = [p['pid'] for p in sort_stats(list(plist), key, reverse=reverse)]
+                    self.assertEqual([plist[i]['pid'] for i in table.argsort(key, reverse=reverse)], order)
+                    self.assertEqual([plist[i]['pid'] for i in table.argsort(key, reverse=reverse, nb=2)],
+                                     order[:2])
+                # The dicts are not copied
+                table.set_extra(2, {'extended_stats': True})
+                top = table.rows(table.argsort('cpu_percent', nb=1))
+                self.assertEqual(top, [dict(plist[2], extended_stats=True)])
+                self.assertIs(table.rows()[2], top[0])
+                self.assertEqual(table.rows()[:2], plist[:2])
+        finally:
+            proctable.np = np
+
+    def test_113_processtree(self):
+        """Test the processes tree"""
+        print('INFO: [TEST_113] Test processes tree')
+        from glances.processtree import GlancesProcessTree
+
+        def process(pid, ppid, cpu, create_time=0):
+            return {'pid': pid, 'ppid': ppid, 'name': 'p{}'.format(pid),
+                    'create_time': create_time, 'cpu_percent': cpu,
+                    'memory_percent': 1.0, 'memory_info': None,
+                    'io_counters': [10, 20, 4, 8, 1]}
+        tree = GlancesProcessTree(with_cgroups=False)
+        # 1 > 2 > (3, 4)
+        plist = [process(4, 2, 4.0), process(3, 2, 3.0), process(2, 1, 2.0), process(1, 0, 1.0)]
+        tree.update(plist)
+        top = tree.get_tree()
+        self.assertEqual([(p['pid'], p['depth']) for p in top], [(1, 0), (2, 1), (4, 2), (3, 2)])
+        self.assertEqual(top[0]['cpu_percent'], 10.0)
+        self.assertEqual(top[0]['nprocs'], 4)
+        self.assertEqual(top[1]['io_read'], 18)
+        self.assertEqual([p['pid'] for p in tree.get_tree(parents_only=True)], [1, 2])
+        self.assertEqual(tree.get_tree(nb=1)[0]['pid'], 1)
+        # 2 is dead (3 and 4 are reparented to 1) and the PID 3 is reused
+        plist = [process(4, 1, 1.0), process(3, 4, 5.0, create_time=1), process(1, 0, 1.0)]
+        tree.update(plist)
+        self.assertTrue(tree.check())
+        self.assertEqual(len(tree), 3)
+        top = tree.get_tree()
+        self.assertEqual([(p['pid'], p['depth']) for p in top], [(1, 0), (4, 1), (3, 2)])
+        self.assertEqual(top[0]['cpu_percent'], 7.0)
+        self.assertEqual(top[1]['nprocs'], 2)
+        # A parent created after the child is not its parent (PID reuse)
+        plist = [process(4, 1, 1.0), process(1, 4, 1.0, create_time=2)]
+        tree.update(plist)
+        self.assertTrue(tree.check())
+        self.assertEqual([p['pid'] for p in tree.get_tree()], [4, 1])
+        # The export has the same shape as the stats
+        plugin = stats.get_plugin('processtree')
+        plugin.stats = {'processes': tree.get_tree(), 'cgroups': []}
+        try:
+            export = plugin.get_export()
+            self.assertEqual(sorted(export), sorted(plugin.get_raw()))
+            self.assertEqual([p['key'] for p in export['processes']], ['pid', 'pid'])
+            self.assertNotIn('key', plugin.get_raw()['processes'][0])
+        finally:
+            plugin.reset()
+
+    def test_114_docker_stats_pool(self):
+        """Test the Docker containers stats pool"""
+        print('INFO: [TEST_114] Test Docker stats pool')
+        import threading
+        from glances.plugins.glances_docker import DockerStatsPool
+
+        class Container(object):
+            def __init__(self, i):
+                self.id = str(i)
+                self.grabbed = 0
+
+            def stats(self, stream=True, one_shot=False):
+                self.grabbed += 1
+                self.one_shot = one_shot
+                return {'id': self.id}
+        containers = [Container(i) for i in range(10)]
+        before = threading.active_count()
+        pool = DockerStatsPool(workers=2, refresh=60)
+        self.assertEqual(threading.active_count(), before + 2)
+        pool.set_containers(containers)
+        for i in range(50):
+            if all(pool.get(c.id) for c in containers):
+                break
+            time.sleep(0.1)
+        self.assertEqual([pool.get(c.id) for c in containers], [{'id': c.id} for c in containers])
+        # Only grabbed once per refresh time
+        self.assertEqual([c.grabbed for c in containers], [1] * 10)
+        self.assertTrue(all(c.one_shot for c in containers))
+        pool.set_containers(containers[:5])
+        self.assertEqual(pool.get(containers[9].id), {})
+        # A container removed then added again is only queued once
+        pool.set_containers(containers)
+        self.assertLessEqual(len(pool._queue), 10)
+        # The threads sleep until a container is due (woken up on stop)
+        pool.stop()
+        for t in pool._threads:
+            t.join(1)
+            self.assertFalse(t.is_alive())
+
+    def test_115_cgroups(self):
+        """Test the cgroups stats reader"""
+        print('INFO: [TEST_115] Test cgroups stats reader')
+        import os
+        import shutil
+        import tempfile
+        from glances.cgroups import GlancesCgroups
+        # The cgroups paths are cached by process (PID and start time)
+        tmp = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmp, 'cgroup'))
+            open(os.path.join(tmp, 'cgroup', 'cgroup.controllers'), 'w').close()
+            os.makedirs(os.path.join(tmp, 'proc', '42'))
+
+            def process(start_time, cgroup):
+                with open(os.path.join(tmp, 'proc', '42', 'stat'), 'w') as f:
+                    f.write('42 (a b) S' + ' 0' * 18 + ' {} 0 0\n'.format(start_time))
+                with open(os.path.join(tmp, 'proc', '42', 'cgroup'), 'w') as f:
+                    f.write('0::/{}\n'.format(cgroup))
+            reader = GlancesCgroups(cgroup_path=os.path.join(tmp, 'cgroup'),
+                                    procfs_path=os.path.join(tmp, 'proc'))
+            process(100, 'a')
+            self.assertEqual(reader.paths(42), {'': os.path.join(tmp, 'cgroup', 'a')})
+            process(100, 'b')
+            self.assertEqual(reader.paths(42), {'': os.path.join(tmp, 'cgroup', 'a')})
+            # PID reused by another process
+            process(200, 'b')
+            self.assertEqual(reader.paths(42), {'': os.path.join(tmp, 'cgroup', 'b')})
+        finally:
+            shutil.rmtree(tmp)
+        if not GlancesCgroups.is_available():
+            print('INFO: [TEST_115] cgroups not available')
+            return
+        reader = GlancesCgroups()
+        self.assertIn(reader.version, (1, 2))
+        stats_grab = reader.read(os.getpid())
+        self.assertIsNotNone(stats_grab)
+        for key in ['time', 'cpu', 'memory', 'io', 'network']:
+            self.assertIn(key, stats_grab)
+        if stats_grab['memory'] is not None:
+            self.assertGreater(stats_grab['memory']['limit'], 0)
+        self.assertIsNone(reader.read(2 ** 30))
+
+    def test_116_deferred_init(self):
+        """Test the deferred init of the plugins"""
+        print('INFO: [TEST_116] Test plugins deferred init')
+        import threading
+        release = threading.Event()
+
+        class SlowPlugin(GlancesPlugin):
+            def init_deferred(self):
+                release.wait(10)
+                self.initialized = True
+
+            def update(self):
+                self.stats = {'initialized': getattr(self, 'initialized', False)}
+                return self.stats
+
+        self.assertTrue(GlancesPlugin().is_ready())
+        plugin = SlowPlugin()
+        self.assertFalse(plugin.is_ready())
+        stats._plugins['slow'] = plugin
+        try:
+            stats.init_plugins(core.get_config())
+            # The update does not wait for the deferred init
+            stats.update()
+            self.assertEqual(plugin.get_raw(), {'initialized': False})
+            self.assertFalse(stats.is_init_late('slow'))
+            self.assertTrue(stats.is_init_late('slow', now=time.time() + 3600))
+            release.set()
+            self.assertTrue(plugin.wait_ready(10))
+            self.assertFalse(stats.is_init_late('slow', now=time.time() + 3600))
+            stats.update()
+            self.assertEqual(plugin.get_raw(), {'initialized': True})
+            self.assertFalse(plugin.stale)
+        finally:
+            release.set()
+            del stats._plugins['slow']
+
+    def test_117_registry(self):
+        """Test the plugins and export modules registry"""
+        print('INFO: [TEST_117] Test modules registry')
+        import copy
+        import os
+        from glances import registry
+        from glances.globals import exports_path, plugins_path
+
+        def modules(path, excluded):
+            return sorted(f[len('glances_'):-3] for f in os.listdir(path)
+                          if f.startswith('glances_') and f.endswith('.py') and f not in excluded)
+        self.assertEqual(list(registry.plugins),
+                         modules(plugins_path, ['glances_plugin.py']))
+        self.assertEqual(list(registry.exports),
+                         modules(exports_path, ['glances_export.py', 'glances_export_bulk.py']))
+        self.assertTrue(registry.is_installed('psutil'))
+        self.assertFalse(registry.is_installed('glances_not_a_lib'))
+        # Unavailable plugins are not loaded (nor exported)
+        from glances.exports.glances_export import GlancesExport
+        export_list = GlancesExport(args=core.get_args()).plugins_to_export(stats)
+        for module in registry.plugins.values():
+            if not module.is_available():
+                self.assertIsNone(stats.get_plugin(module.name))
+                self.assertNotIn(module.name, export_list)
+                self.assertEqual(stats.getAllExportsAsDict(plugin_list=[module.name]), {})
+                self.assertNotIn(module.name, stats.getPluginsList(enable=False))
+        # Disabled plugins are loaded when they are enabled
+        import sys
+        args = copy.copy(core.get_args())
+        args.disable_uptime = True
+        disabled_stats = GlancesStats(config=core.get_config(), args=args)
+        # Not imported yet (the plugins path is not in the sys.path anymore)
+        uptime_module = sys.modules.pop('glances_uptime', None)
+        try:
+            self.assertIsNone(disabled_stats.get_plugin('uptime'))
+            args.disable_uptime = False
+            disabled_stats.update()
+            self.assertIsNotNone(disabled_stats.get_plugin('uptime'))
+            self.assertNotEqual(disabled_stats.get_plugin('uptime').get_raw(), {})
+            self.assertNotIn(plugins_path, sys.path)
+        finally:
+            disabled_stats.end()
+            if uptime_module is not None:
+                sys.modules['glances_uptime'] = uptime_module
+
+    def test_118_server_auth_cache(self):
+        """Test the XML-RPC server authentication cache"""
+        print('INFO: [TEST_118] Test XML-RPC server authentication cache')
+        from glances.server import GlancesXMLRPCServer
+        server = GlancesXMLRPCServer('127.0.0.1', 0, workers=0)
+        calls = []
+
+        def check(username, password):
+            calls.append(username)
+            return password == 'secret'
+        try:
+            for _ in range(3):
+                self.assertTrue(server.check_credential('glances', 'secret', check))
+                self.assertFalse(server.check_credential('glances', 'wrong', check))
+            self.assertEqual(len(calls), 2)
+            server.clear_auth_cache()
+            self.assertTrue(server.check_credential('glances', 'secret', check))
+            self.assertEqual(len(calls), 3)
+        finally:
+            server.end()
+
     def test_999_the_end(self):
         """Free all the stats"""
         print('INFO: [TEST_999] Free the stats')